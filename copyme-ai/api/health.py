@@ -1,8 +1,32 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 @router.get("/", status_code=200, summary="Health check")
 def health():
-    return jsonable_encoder({"status": "ok", "message": "API is running"})
\ No newline at end of file
+    return jsonable_encoder({"status": "ok", "message": "API is running"})
+
+@router.get("/ready", status_code=200, summary="Readiness check, OK once the models are warmed up")
+def ready(request: Request):
+    app = request.app
+    if not getattr(app, "ready", False):
+        error = getattr(app, "warmup_error", None)
+        if error:
+            return JSONResponse(status_code=503, content={"status": "warmup_failed", "message": f"Model warm-up failed, retrying: {error}"})
+        return JSONResponse(status_code=503, content={"status": "warming_up", "message": "Models are warming up"})
+    pool = getattr(app, "inference_pool", None)
+    return jsonable_encoder({
+        "status": "ready",
+        "warmup_timings": getattr(app, "warmup_timings", {}),
+        "inference": pool.stats() if pool else {},
+    })
+
+@router.get("/llm-cache", status_code=200, summary="Hit/miss counters of the generated feedback cache")
+def llm_cache(request: Request):
+    analyzer = getattr(request.app, "analyzer", None)
+    rephraser = getattr(analyzer, "mistral", None)
+    if not hasattr(rephraser, "stats"):
+        return jsonable_encoder({"enabled": False})
+    return jsonable_encoder({"enabled": True, **rephraser.stats()})
@@ -1,12 +1,18 @@
 from fastapi import FastAPI, File,  UploadFile, Form, HTTPException, Request, Depends, APIRouter, Body
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, Annotated, List, Dict
-from yolov8_basketball.tools.utils import get_database, get_yolomodel, save_uploaded_file
+from fastapi.responses import JSONResponse
+from yolov8_basketball.tools.utils import FileType, check_fileType, get_analyzer, get_database, get_yolomodel, get_inference_pool, get_job_runner, save_uploaded_file, upload_destination
+from yolov8_basketball.tools.streaming import StreamingUpload, UploadTooLargeError
+from yolov8_basketball.inference_pool import InferencePool, PoolFullError
+from yolov8_basketball.jobs import JobQueueFullError, JobRunner, JobStatus
+import asyncio
 from recommendation_engine import analyze_phase
 import logging
 from config.setting import get_variables
 from yolov8_basketball.phase_detection import PhaseDetection
-from config.db_models import ProcessedImage, DatabaseManager, FrameData
+from config.db_models import ProcessedImage, DatabaseManager, FrameData, FrameDataResponse
+from config.serializers import build_process_response, build_processed_document, pack_frame, serialize_frames
 from datetime import datetime, date
 from uuid import uuid4
 import json
@@ -24,11 +30,15 @@ from .basketball_analysis_model import BasketballAnalysisDB, BasketballAnalysisM
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
+# sérialisé en JSON directement par pydantic (response_model), les NaN/inf sont déjà remplacés par serialize_frames
 class ProcessResponse(BaseModel):
-    _id: str
-    frames: List[FrameData]
+    id: str = Field(alias="_id")
+    frames: List[FrameDataResponse]
     created_at: datetime
     version: int
+    original_path: Optional[str] = None
+    # frames passed to the pose model or skipped by the sampler, to size the worker pools
+    sampling_stats: Optional[Dict[str, int]] = None
     
     class Config:
         # S'assurer que tous les champs sont inclus dans les réponses JSON
@@ -62,171 +72,246 @@ async def process(
     userId: str = Form(...),
     exercise_id: str = Form(...),
     allow_training: Optional[bool] = Form(False),
+    async_mode: Optional[bool] = Form(False),
 ) -> ProcessResponse:
     """
     Traite une vidéo ou une image pour l'analyse de mouvements de basket.
     Met à jour un document existant si processedDataId est fourni, sinon en crée un nouveau.
+    En mode asynchrone (async_mode), retourne tout de suite un job à suivre via /ai/jobs/{job_id}.
     """
 
     # Initialiser les settings ici au lieu du niveau module
     settings = get_variables()
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
 
     yolo_basket: PhaseDetection = get_yolomodel(request)
     db_model: DatabaseManager = get_database(request)
+    inference_pool: InferencePool = get_inference_pool(request)
+
+    # Récupération du chemin original à partir du formulaire
+    form_data = await request.form()
+    url = form_data.get("url")
+    original_path = form_data.get("original_path")
+    if original_path:
+        logging.info(f"Chemin original reçu: {original_path}")
+    else:
+        logging.info("Aucun chemin original reçu, utilisation du chemin par défaut")
+
+    if async_mode:
+        job_runner: JobRunner = get_job_runner(request)
+        file_path = None
+        try:
+            if job_runner.full():
+                raise JobQueueFullError("Job queue full")
+            file_path = await asyncio.to_thread(save_uploaded_file, files, settings.UPLOAD_DIR, True, max_bytes)
+            session = yolo_basket.new_session(str(file_path))
+
+            async def job():
+                results = await inference_pool.run(yolo_basket.run, session=session)
+                logging.info("YOLO processing completed.")
+                return await create_processed_entry(
+                    db_model, results, url, original_path or str(file_path), userId, exercise_id, allow_training,
+                    session.sampling_stats,
+                )
+
+            job_id = await job_runner.submit(job, session)
+        except JobQueueFullError as e:
+            logging.warning(str(e))
+            # la file s'est remplie pendant l'upload, le fichier ne sera jamais traité
+            if file_path is not None:
+                file_path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=503,
+                detail="Job queue is full, please retry later.",
+                headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER)},
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": JobStatus.QUEUED.value})
+
+    # la copie du fichier et l'inférence tournent dans le pool pour ne pas bloquer la boucle asyncio
+    def save_and_run():
+        saved_path = save_uploaded_file(files, settings.UPLOAD_DIR, True, max_bytes)
+        session = yolo_basket.new_session(str(saved_path))
+        return saved_path, session, yolo_basket.run(session=session)
 
-    file_path = save_uploaded_file(files, settings.UPLOAD_DIR, True)
-    results: List[FrameData] = yolo_basket.run(str(file_path))
+    try:
+        file_path, session, results = await inference_pool.run(save_and_run)
+    except PoolFullError as e:
+        logging.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Inference queue is full, please retry later.",
+            headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER)},
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     logging.info("YOLO processing completed.")
 
-    # Sanitize frames correctement pour la base de données - une seule conversion
-    frames_data = [sanitize_float_values(sanitize_frame(f)) for f in results]
+    try:
+        response_content = await create_processed_entry(
+            db_model, results, url, original_path or str(file_path), userId, exercise_id, allow_training,
+            session.sampling_stats,
+        )
+        return response_content
+    except Exception as e:
+        logging.error(f"Database operation error: {str(e)}")
+        # Si l'ID n'a pas été généré, on lève une exception
+        raise HTTPException(status_code=500, detail=f"Failed to process video: {str(e)}")
 
-    # Créer des objets FrameData propres pour la réponse - ne pas appeler sanitize_frame à nouveau
-    clean_frames = [create_clean_frame_data(f) for f in frames_data]
+async def receive_upload(upload: StreamingUpload, request: Request):
+    """Écrit le corps de la requête sur disque par morceaux, l'analyse lit le fichier pendant qu'il grossit."""
+    try:
+        await upload.write_from(request.stream())
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-    logging.info("Creating new document...")
+@router.post("/process/stream", response_model=ProcessResponse)
+async def process_stream(
+    request: Request,
+    userId: str,
+    exercise_id: str,
+    filename: str = "upload.mp4",
+    allow_training: bool = False,
+    async_mode: bool = False,
+    url: Optional[str] = None,
+    original_path: Optional[str] = None,
+) -> ProcessResponse:
+    """
+    Variante de /process où le corps de la requête est la vidéo brute (pas de multipart), les champs passent en query.
+    La vidéo est écrite sur disque au fil de l'eau et le décodage démarre pendant que l'upload continue.
+    """
+    settings = get_variables()
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    # seules les vidéos se décodent pendant l'upload, une image doit passer par /process
+    if check_fileType(filename.lower()) != FileType.VIDEO:
+        raise HTTPException(status_code=415, detail="Only video uploads (mp4, avi, mov) can be streamed, use /process for images.")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
 
-    try:
-        created_at = datetime.combine(date.today(), datetime.min.time())
-
-        # Préparation des frames pour MongoDB
-        mongo_ready_frames = []
-        for frame in frames_data:
-            # Si c'est déjà un dictionnaire, utiliser directement
-            if isinstance(frame, dict):
-                mongo_ready_frame = frame
-            # Sinon, convertir en dictionnaire
-            elif hasattr(frame, "model_dump"):
-                mongo_ready_frame = frame.model_dump()
-            else:
-                # Fallback
-                mongo_ready_frame = sanitize_frame(frame)
-
-            # S'assurer que tous les objets sont sérialisables
-            # Pour les énumérations, on préserve leur valeur numérique
-            def serialize_custom(obj):
-                # Gestion spécifique pour les objets Direction
-                if obj.__class__.__name__ == 'Direction':
-                    if hasattr(obj, "value"):
-                        return obj.value
-                    elif hasattr(obj, "name"):
-                        if obj.name == "LEFT":
-                            return 1
-                        elif obj.name == "RIGHT":
-                            return 2
-                        elif obj.name == "INCREASE":
-                            return "increase"
-                        elif obj.name == "DECREASE":
-                            return "decrease"
-                        elif obj.name == "UNKNOWN":
-                            return "unknown"
-                        else:
-                            return str(obj.name).lower()
-                    return "unknown"
-                # Gestion générique pour les autres énumérations
-                if hasattr(obj, "value"):
-                    return obj.value
-                elif hasattr(obj, "name") and obj.name in ["LEFT", "RIGHT"]:
-                    return 1 if obj.name == "LEFT" else 2
-                return str(obj)
-
-            # Sérialiser en JSON puis recharger pour garantir la compatibilité
-            mongo_ready_frame = json.loads(json.dumps(mongo_ready_frame, default=serialize_custom))
-            mongo_ready_frames.append(mongo_ready_frame)
-
-        # Récupération du chemin original à partir du formulaire
-        original_path = None
-        try:
-            form_data = await request.form()
-            original_path = form_data.get("original_path")
-            if original_path:
-                logging.info(f"Chemin original reçu: {original_path}")
-            else:
-                logging.info("Aucun chemin original reçu, utilisation du chemin par défaut")
-                original_path = str(file_path)
-        except Exception as e:
-            logging.error(f"Erreur lors de la récupération du chemin original: {e}")
-            original_path = str(file_path)
-        
-        collection_insert = ProcessedImage(
-            url=form_data.get("url"),
-            original_path=original_path,  # Ajouter le chemin original
-            frames=mongo_ready_frames,  # Utiliser les frames préparées pour MongoDB
-            userId=userId,
-            is_reference=False,  # Par défaut, on ne crée pas de référence
-            exercise_id=exercise_id,
-            allow_training=allow_training,
-            created_at=created_at,
-            version=1,
-        )
+    yolo_basket: PhaseDetection = get_yolomodel(request)
+    db_model: DatabaseManager = get_database(request)
+    inference_pool: InferencePool = get_inference_pool(request)
 
-        # Convertir l'objet Pydantic en dictionnaire pour l'insertion dans MongoDB
-        insert_data = collection_insert.model_dump()
-        # Utiliser la même fonction de sérialisation personnalisée
-        insert_data = json.loads(json.dumps(insert_data, default=serialize_custom))
-        insert_result = await db_model.insert_new_entry(insert_data)
-
-        # Extraire l'ID du résultat d'insertion MongoDB
-        if hasattr(insert_result, 'inserted_id'):
-            id_str = str(insert_result.inserted_id)
-        else:
-            # Fallback au cas où la structure du résultat n'est pas celle attendue
-            id_str = str(insert_result)
-
-        logging.info(f"Document created with ID: {id_str}")
-
-        # Créer la réponse DIRECTEMENT sans utiliser le constructeur ProcessResponse
-        # pour éviter toute transformation silencieuse par Pydantic
-        direct_response = {
-            "_id": id_str,
-            "frames": clean_frames,
-            "created_at": created_at,
-            "version": 1
-        }
+    file_path = upload_destination(filename, settings.UPLOAD_DIR, True)
+    upload = StreamingUpload(str(file_path), max_bytes)
+    session = yolo_basket.new_session(str(file_path))
+    session.upload = upload
+    original_path = original_path or str(file_path)
+
+    if async_mode:
+        job_runner: JobRunner = get_job_runner(request)
+
+        async def job():
+            results = await inference_pool.run(yolo_basket.run, session=session)
+            logging.info("YOLO processing completed.")
+            return await create_processed_entry(db_model, results, url, original_path, userId, exercise_id, allow_training,
+                                                session.sampling_stats)
 
-        # Log détaillé pour débogage
-        logging.debug(f"ProcessResponse data: _id={id_str}, frames={len(clean_frames)} items")
-        
-        # Retourner la réponse directement au lieu de la passer par ProcessResponse
-        # FastAPI la convertira quand même en JSON, mais sans les transformations de Pydantic
-        from fastapi.responses import JSONResponse
-        
-        # Convertir les frames en dictionnaires et nettoyer les valeurs problématiques
-        frames_json = []
-        for frame in clean_frames:
-            if hasattr(frame, 'model_dump'):
-                frame_dict = frame.model_dump()
-            else:
-                frame_dict = frame
-            
-            # Sanitize special objects like Direction
-            frame_dict = json.loads(json.dumps(frame_dict, default=serialize_custom))
-            frames_json.append(frame_dict)
-            
-        response_content = {
-            "_id": id_str,  # Inclure l'ID directement à la racine
-            "frames": frames_json,
-            "created_at": created_at.isoformat(),
-            "version": 1,
-            "original_path": original_path  # Ajouter le chemin original à la réponse
-        }
-        
-        # S'assurer que la réponse est sérialisable en JSON
         try:
-            # Test de sérialisation pour détecter les erreurs
-            json_test = json.dumps(response_content)
-            logging.debug(f"Response JSON serialization successful: {len(json_test)} bytes")
-        except Exception as json_err:
-            logging.error(f"JSON serialization error: {str(json_err)}")
-            # Rechercher et corriger les valeurs problématiques
-            response_content = sanitize_float_values(response_content)
-            
-        return JSONResponse(content=response_content)
+            job_id = await job_runner.submit(job, session)
+        except JobQueueFullError as e:
+            logging.warning(str(e))
+            file_path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=503,
+                detail="Job queue is full, please retry later.",
+                headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER)},
+            )
+        await receive_upload(upload, request)
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": JobStatus.QUEUED.value})
+
+    try:
+        analysis = inference_pool.submit(yolo_basket.run, session=session)
+    except PoolFullError as e:
+        logging.warning(str(e))
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=503,
+            detail="Inference queue is full, please retry later.",
+            headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER)},
+        )
+    try:
+        await receive_upload(upload, request)
+    except Exception:
+        # le décodeur s'arrête sur l'upload en échec, on l'attend avant de répondre
+        await asyncio.gather(analysis, return_exceptions=True)
+        raise
+    results = await analysis
+    logging.info("YOLO processing completed.")
+
+    try:
+        response_content = await create_processed_entry(db_model, results, url, original_path, userId, exercise_id, allow_training,
+                                                        session.sampling_stats)
+        return response_content
     except Exception as e:
         logging.error(f"Database operation error: {str(e)}")
-        # Si l'ID n'a pas été généré, on lève une exception
         raise HTTPException(status_code=500, detail=f"Failed to process video: {str(e)}")
 
+async def create_processed_entry(
+    db_model: DatabaseManager,
+    results: List[FrameData],
+    url: Optional[str],
+    original_path: str,
+    userId: str,
+    exercise_id: str,
+    allow_training: bool,
+    sampling_stats: Optional[Dict[str, int]] = None,
+) -> Dict:
+    """Enregistre les frames analysées dans MongoDB et retourne le contenu de la réponse /process."""
+    # Une seule sérialisation : la réponse garde keypoints_positions, MongoDB stocke les keypoints compactés
+    frames = serialize_frames(results)
+    stored_frames = [pack_frame(frame_dict, frame) for frame_dict, frame in zip(frames, results)]
+
+    logging.info("Creating new document...")
+    created_at = datetime.combine(date.today(), datetime.min.time())
+    document = build_processed_document(
+        stored_frames,
+        url=url,
+        original_path=original_path,
+        userId=userId,
+        exercise_id=exercise_id,
+        allow_training=allow_training,
+        created_at=created_at,
+    )
+    insert_result = await db_model.insert_new_entry(document)
+
+    # Extraire l'ID du résultat d'insertion MongoDB
+    if hasattr(insert_result, 'inserted_id'):
+        id_str = str(insert_result.inserted_id)
+    else:
+        # Fallback au cas où la structure du résultat n'est pas celle attendue
+        id_str = str(insert_result)
+
+    logging.info(f"Document created with ID: {id_str}")
+    logging.debug(f"ProcessResponse data: _id={id_str}, frames={len(frames)} items")
+
+    # les frames sont déjà nettoyées (NaN/inf à 0, enums en valeur), ProcessResponse les sérialise en JSON
+    return build_process_response(id_str, frames, created_at, original_path, sampling_stats=sampling_stats)
+
+@router.get("/jobs/{job_id}")
+async def job_status(request: Request, job_id: str):
+    """Statut d'un traitement asynchrone et sa progression (frames traitées / total)."""
+    job_runner: JobRunner = get_job_runner(request)
+    record = await job_runner.status(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return record
+
+@router.get("/jobs/{job_id}/result", response_model=ProcessResponse)
+async def job_result(request: Request, job_id: str):
+    """Résultat d'un traitement asynchrone, identique à la réponse de /process en mode synchrone."""
+    job_runner: JobRunner = get_job_runner(request)
+    record = await job_runner.status(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if record["status"] == JobStatus.FAILED.value:
+        raise HTTPException(status_code=500, detail=f"Failed to process video: {record.get('error')}")
+    if record["status"] != JobStatus.DONE.value:
+        # pas encore terminé : le client continue de poller
+        return JSONResponse(status_code=202, content=record)
+    return await job_runner.result(job_id)
 
 class AnalysisRequest(BaseModel):
     email: EmailStr = Field(..., examples=["email@exemple.com"])
@@ -254,7 +339,7 @@ async def analyze_movement(request: Request, analysis_data: AnalysisRequest = Bo
     Analyse un mouvement en comparant des frames capturées avec des références et fournit des recommandations.
     """
     try:
-        analyser = BasketballAPIAnalyzer()
+        analyser: BasketballAPIAnalyzer = get_analyzer(request)
         result = await analyser.analyze_basketball_sequence_api(analysis_data.video_id)
 
         # Vérifier si le backend IA a retourné une erreur
@@ -336,110 +421,6 @@ async def analyze_movement(request: Request, analysis_data: AnalysisRequest = Bo
         logging.error(f"Error during movement analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-def sanitize_float_values(data: Any) -> Any:
-    if isinstance(data, dict):
-        return {k: sanitize_float_values(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_float_values(item) for item in data]
-    elif isinstance(data, float):
-        if math.isnan(data) or math.isinf(data):
-            return 0.0
-        return data
-    else:
-        return data
-
-def sanitize_frame(frame: FrameData) -> Dict:
-    """Convertit un objet FrameData en dictionnaire nettoyé pour MongoDB."""
-    frame_dict = frame.model_dump() if hasattr(frame, 'model_dump') else frame
-
-    # Nettoyer les angles
-    for angle in frame_dict.get("angles", []):
-        if angle.get("angle") is None or math.isnan(angle.get("angle")) or math.isinf(angle.get("angle")):
-            angle["angle"] = 0.0
-
-        # Convertir les objets Direction en valeur numérique
-        if isinstance(angle.get("angle_name"), tuple) and len(angle.get("angle_name")) == 2:
-            angle_type, direction = angle.get("angle_name")
-            
-            # Convertir l'objet Direction en sa valeur appropriée
-            if hasattr(direction, "__class__") and direction.__class__.__name__ == 'Direction':
-                if hasattr(direction, "value"):
-                    direction_value = direction.value
-                elif hasattr(direction, "name"):
-                    if direction.name == "LEFT":
-                        direction_value = 1
-                    elif direction.name == "RIGHT":
-                        direction_value = 2
-                    else:
-                        direction_value = str(direction.name).lower()
-                else:
-                    direction_value = "unknown"
-            # Ou si c'est déjà un objet simple
-            elif hasattr(direction, "name") and direction.name == "LEFT":
-                direction_value = 1
-            elif hasattr(direction, "name") and direction.name == "RIGHT":
-                direction_value = 2
-            else:
-                # Cas de fallback - utiliser l'objet tel quel
-                direction_value = direction
-                
-            angle["angle_name"] = (angle_type, direction_value)
-
-    # S'assurer que feedback est un dict
-    if not isinstance(frame_dict.get("feedback"), dict):
-        frame_dict["feedback"] = {}
-
-    # Puis on nettoie récursivement les float "louches" partout
-    frame_dict = sanitize_float_values(frame_dict)
-
-    return frame_dict
-
-def create_clean_frame_data(frame_data: Any) -> FrameData:
-    """
-    Crée un objet FrameData propre à partir d'un dictionnaire nettoyé ou d'un objet FrameData
-    """
-    try:
-        # Si c'est déjà un dictionnaire, on l'utilise directement
-        if isinstance(frame_data, dict):
-            clean_dict = frame_data
-        # Si c'est un objet FrameData, on le convertit en dictionnaire
-        elif hasattr(frame_data, "model_dump"):
-            clean_dict = frame_data.model_dump()
-        else:
-            # Fallback - tenter une conversion en dictionnaire
-            clean_dict = sanitize_frame(frame_data)
-        
-        # S'assurer que les champs requis existent
-        if 'frame_number' not in clean_dict:
-            clean_dict['frame_number'] = 0
-        if 'timestamp' not in clean_dict:
-            clean_dict['timestamp'] = 0.0
-        if 'keypoints_positions' not in clean_dict:
-            clean_dict['keypoints_positions'] = {}
-        if 'angles' not in clean_dict:
-            clean_dict['angles'] = []
-        if 'class_name' not in clean_dict:
-            clean_dict['class_name'] = 'unknown'
-        if 'feedback' not in clean_dict:
-            clean_dict['feedback'] = {}
-        # Ajout du champ url_path_frame qui est requis par FrameData
-        if 'url_path_frame' not in clean_dict:
-            clean_dict['url_path_frame'] = clean_dict.get('url_path_frame', f"frames/frame_{clean_dict.get('frame_number', 0)}.jpg")
-            
-        return FrameData(**clean_dict)
-    except Exception as e:
-        logging.warning(f"Erreur lors de la création d'un FrameData propre: {e}")
-        # Retourner un objet minimal en cas d'erreur
-        return FrameData(
-            frame_number=0,
-            timestamp=0.0,
-            keypoints_positions={},
-            angles=[],
-            class_name='unknown',
-            feedback={},
-            url_path_frame="frames/default_frame.jpg"  # Ajouter le champ requis
-        )
-
 @router.get("/image")
 def serve_image_with_param():
     return {"status": "success", "message": "Image processed successfully."}
@@ -1,11 +1,13 @@
 from __future__ import annotations
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, date
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional, Dict, Tuple, Hashable, Any
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, PlainSerializer, WithJsonSchema, model_validator
+from typing import Annotated, List, Optional, Dict, Tuple, Hashable, Any, Sequence, Callable
 from enum import Enum
 from uuid import UUID, uuid4
 import logging
+import numpy as np
+from yolov8_basketball.tools.keypoint import KEYPOINT_COUNT, as_keypoint_array, keypoints_from_dict, keypoints_to_dict, pack_keypoints, unpack_keypoints
 
 from typing import TYPE_CHECKING
 
@@ -27,20 +29,57 @@ class AngleData(BaseModel):
     angle: float
     angle_name: Tuple[str, Direction]
 
+# (17, 3) float32 keypoints: x, y, confidence in KEYPOINT_ORDER, a list of [x, y, confidence] in JSON
+KeypointArray = Annotated[
+    np.ndarray,
+    PlainSerializer(lambda keypoints: np.asarray(keypoints).tolist(), return_type=List[List[float]], when_used="json"),
+    WithJsonSchema({
+        "type": "array",
+        "items": {"type": "array", "items": {"type": "number"}, "minItems": 3, "maxItems": 3},
+        "minItems": KEYPOINT_COUNT,
+        "maxItems": KEYPOINT_COUNT,
+    }),
+]
+
 # Model to represent a frame (analyzed image)
 class FrameData(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     class_name: str
     url_path_frame: str
     frame_number: int
-    keypoints_positions: Dict[str, float]  # List of keypoint positions [x, y]
+    keypoints: KeypointArray
     angles: List[AngleData]
     feedback: Optional[Dict] = None
 
+    @model_validator(mode="before")
+    @classmethod
+    def load_keypoints(cls, data: Any) -> Any:
+        # accepte le champ binaire de MongoDB, un tableau, ou l'ancien dict keypoints_positions
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        keypoints = data.get("keypoints")
+        if isinstance(keypoints, (bytes, bytearray)):
+            data["keypoints"] = unpack_keypoints(bytes(keypoints))
+        elif keypoints is not None:
+            data["keypoints"] = as_keypoint_array(keypoints)
+        elif isinstance(data.get("keypoints_positions"), dict):
+            data["keypoints"] = keypoints_from_dict(data.pop("keypoints_positions"))
+        return data
+
+    @property
+    def keypoints_positions(self) -> Dict[str, float]:
+        return keypoints_to_dict(self.keypoints)
+
+# Frame as returned by the API (see serializers.serialize_frame), the keypoints as a dict
 class FrameDataResponse(BaseModel):
     class_name: str
     url_path_frame: str
+    frame_number: Optional[int] = None
     keypoints_positions: Dict[str, float]
     angles: List[AngleData]
+    feedback: Optional[Dict] = None
 
 # Main model representative a image
 class ProcessedImage(BaseModel):
@@ -78,6 +117,8 @@ def frame_to_dict(frame: Any) -> dict:
     if hasattr(frame, "model_dump"):
         try:
             frame_dict = frame.model_dump()
+            if isinstance(frame_dict.get("keypoints"), np.ndarray):
+                frame_dict["keypoints"] = pack_keypoints(frame_dict["keypoints"])
             for angle in frame_dict.get("angles", []):
                 name, direction = angle.get("angle_name", ("", ""))
                 if hasattr(direction, "name"):
@@ -114,13 +155,25 @@ class DatabaseManager:
             from config.setting import get_variables
             settings = get_variables()
             mongo_url = settings.MONGO_URI
-            self.client = AsyncIOMotorClient(mongo_url)
+            self.client = AsyncIOMotorClient(mongo_url, maxPoolSize=settings.MONGO_MAX_POOL_SIZE, minPoolSize=settings.MONGO_MIN_POOL_SIZE)
             self.collection = self.client["CopyMe"]["processed_data"]
             self.analysis_collection = self.client["CopyMe"]["analysis_results"]
         else:
             self.client = client
             self.collection = self.client["processed_data"]
             self.analysis_collection = self.client["analysis_results"]
+        # appelés quand un document de référence est inséré ou modifié (ex: ReferenceCache.invalidate)
+        self.reference_listeners: List[Callable[[], None]] = []
+
+    def add_reference_listener(self, listener: Callable[[], None]):
+        self.reference_listeners.append(listener)
+
+    def _notify_reference_change(self):
+        for listener in self.reference_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logging.error(f"Reference listener failed: {e}")
 
     async def insert_new_entry(self, image_data: Dict):
         """
@@ -151,17 +204,87 @@ class DatabaseManager:
             logging.debug("Frames converties en dictionnaires")
         else:
             logging.debug("Frames déjà en format dictionnaire, pas de conversion nécessaire")
-            
-        return await self.collection.insert_one(image_dict)
+
+        result = await self.collection.insert_one(image_dict)
+        if image_dict.get("is_reference"):
+            self._notify_reference_change()
+        return result
 
     async def count_documents(self, capture_index: str) -> int:
         return await self.collection.count_documents({"url": capture_index})
 
-    async def get_by_id(self, id_str: str) -> Dict:
-        """Récupère un document par son ID"""
+    @staticmethod
+    def frames_expression(
+        fields: Optional[Sequence[str]] = None,
+        phases: Optional[Sequence[str]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Any:
+        """
+        Expression d'agrégation qui réduit le tableau `frames` côté MongoDB :
+        filtre par phase (class_name), découpe [skip, skip + limit) puis ne garde que `fields`.
+        """
+        frames: Any = "$frames"
+        if phases is not None:
+            frames = {"$filter": {"input": frames, "as": "frame", "cond": {"$in": ["$$frame.class_name", list(phases)]}}}
+        if limit is not None and limit <= 0:
+            # MongoDB refuse un nombre d'éléments nul ou négatif dans $slice
+            frames = {"$literal": []}
+        elif skip or limit is not None:
+            # au moins 1 : $size vaut 0 pour un tableau vide
+            count = limit if limit is not None else {"$max": [{"$size": frames}, 1]}
+            frames = {"$slice": [frames, skip, count]}
+        if fields is not None:
+            frames = {"$map": {"input": frames, "as": "frame", "in": {field: f"$$frame.{field}" for field in fields}}}
+        return frames
+
+    async def find_frames(
+        self,
+        match: Dict,
+        fields: Optional[Sequence[str]] = None,
+        phases: Optional[Sequence[str]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort: Optional[Dict[str, int]] = None,
+        document_fields: Sequence[str] = (),
+    ) -> Optional[Dict]:
+        """
+        Premier document correspondant à `match`, avec ses frames réduites par frames_expression.
+        Seuls `_id`, `document_fields` et les frames demandées sont transférés et décodés.
+        """
+        pipeline: List[Dict] = [{"$match": match}]
+        if sort:
+            pipeline.append({"$sort": sort})
+        pipeline.append({"$limit": 1})
+        projection = {field: 1 for field in document_fields}
+        projection["frames"] = self.frames_expression(fields, phases, skip, limit)
+        pipeline.append({"$project": projection})
+        documents = await self.collection.aggregate(pipeline).to_list(length=1)
+        return documents[0] if documents else None
+
+    async def get_metadata(self, id_str: str) -> Optional[Dict]:
+        """Récupère un document sans ses frames"""
         from bson.objectid import ObjectId
         try:
-            return await self.collection.find_one({"_id": ObjectId(id_str)})
+            return await self.collection.find_one({"_id": ObjectId(id_str)}, projection={"frames": 0})
+        except Exception as e:
+            logging.error(f"Error retrieving document metadata: {e}")
+            return None
+
+    async def get_by_id(
+        self,
+        id_str: str,
+        fields: Optional[Sequence[str]] = None,
+        phases: Optional[Sequence[str]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Dict:
+        """Récupère un document par son ID, entier ou avec ses frames réduites (voir find_frames)"""
+        from bson.objectid import ObjectId
+        try:
+            if fields is None and phases is None and not skip and limit is None:
+                return await self.collection.find_one({"_id": ObjectId(id_str)})
+            return await self.find_frames({"_id": ObjectId(id_str)}, fields, phases, skip, limit)
         except Exception as e:
             logging.error(f"Error retrieving document by ID: {e}")
             return None
@@ -177,13 +300,23 @@ class DatabaseManager:
             logging.error(f"Error retrieving latest document by email: {e}")
             return None
 
-    async def get_reference_data(self) -> Dict:
+    async def get_reference_data(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        phases: Optional[Sequence[str]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Dict:
         """Récupère les données de référence (le document le plus récent marqué comme référence)"""
         try:
-            return await self.collection.find_one(
-                {"is_reference": True},
-                sort=[("created_at", -1)]
-            ) or await self.collection.find_one(sort=[("created_at", -1)])
+            if fields is None and phases is None and not skip and limit is None:
+                return await self.collection.find_one(
+                    {"is_reference": True},
+                    sort=[("created_at", -1)]
+                ) or await self.collection.find_one(sort=[("created_at", -1)])
+            sort = {"created_at": -1}
+            return (await self.find_frames({"is_reference": True}, fields, phases, skip, limit, sort=sort)
+                    or await self.find_frames({}, fields, phases, skip, limit, sort=sort))
         except Exception as e:
             logging.error(f"Error retrieving reference data: {e}")
             return None
@@ -211,6 +344,8 @@ class DatabaseManager:
                 {"_id": ObjectId(id_str)},
                 {"$set": update_data}
             )
+            if "is_reference" in update_data or "frames" in update_data:
+                self._notify_reference_change()
             return result.modified_count > 0
         except Exception as e:
             logging.error(f"Error updating document: {e}")
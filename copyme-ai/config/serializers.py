@@ -0,0 +1,93 @@
+from datetime import datetime
+from enum import Enum
+import math
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from yolov8_basketball.tools.keypoint import keypoints_to_dict, pack_keypoints
+from .db_models import AngleData, FrameData
+
+# One pass from the pydantic models to plain, JSON-safe dicts: NaN/inf floats
+# become 0.0 and enums their value. The frame dicts returned by /process are
+# stored in MongoDB as is, except for the keypoints which are packed (see
+# pack_frame), nothing is dumped or round-tripped twice.
+
+def clean_float(value: float) -> float:
+    return 0.0 if math.isnan(value) or math.isinf(value) else value
+
+def encode_value(value: Any) -> Any:
+    """Encode an arbitrary value (feedback payloads...) recursively."""
+    if isinstance(value, float):
+        return clean_float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    return value
+
+def serialize_angle(angle: AngleData) -> Dict:
+    angle_type, direction = angle.angle_name
+    return {
+        "start_point": angle.start_point,
+        "end_point": angle.end_point,
+        "third_point": angle.third_point,
+        "angle": clean_float(angle.angle),
+        "angle_name": [angle_type, direction.value if isinstance(direction, Enum) else direction],
+    }
+
+def serialize_frame(frame: FrameData) -> Dict:
+    return {
+        "class_name": frame.class_name,
+        "url_path_frame": frame.url_path_frame,
+        "frame_number": frame.frame_number,
+        "keypoints_positions": {name: clean_float(value) for name, value in keypoints_to_dict(frame.keypoints).items()},
+        "angles": [serialize_angle(angle) for angle in frame.angles],
+        "feedback": encode_value(frame.feedback) if isinstance(frame.feedback, dict) else {},
+    }
+
+def serialize_frames(frames: List[FrameData]) -> List[Dict]:
+    return [serialize_frame(frame) for frame in frames]
+
+def pack_frame(frame_dict: Dict, frame: FrameData) -> Dict:
+    """MongoDB form of a serialized frame: the keypoints dict is replaced by the packed float32 array."""
+    stored = {key: value for key, value in frame_dict.items() if key != "keypoints_positions"}
+    stored["keypoints"] = pack_keypoints(frame.keypoints)
+    return stored
+
+def build_processed_document(
+    frames: List[Dict],
+    url: Optional[str],
+    original_path: Optional[str],
+    userId: str,
+    exercise_id: str,
+    allow_training: bool,
+    created_at: datetime,
+    version: int = 1,
+    is_reference: bool = False,
+) -> Dict:
+    """ProcessedImage document as stored in MongoDB (uuid and created_at kept as strings)."""
+    return {
+        "uuid": str(uuid4()),
+        "url": url,
+        "is_reference": is_reference,
+        "original_path": original_path,
+        "frames": frames,
+        "exercise_id": exercise_id,
+        "userId": userId,
+        "allow_training": allow_training,
+        "created_at": str(created_at),
+        "version": version,
+    }
+
+def build_process_response(document_id: str, frames: List[Dict], created_at: datetime, original_path: Optional[str], version: int = 1,
+                           sampling_stats: Optional[Dict[str, int]] = None) -> Dict:
+    return {
+        "_id": document_id,
+        "frames": frames,
+        "created_at": created_at.isoformat(),
+        "version": version,
+        "original_path": original_path,
+        # analysed/skipped frames of a video, None for an image
+        "sampling_stats": sampling_stats or None,
+    }
@@ -20,6 +20,26 @@ class Settings(BaseSettings):
     MONGO_URI: str
     UPLOAD_DIR: str
     MISTRAL_API_KEY: str
+    WARMUP_ITERATIONS: int = 2
+    WARMUP_RETRY_DELAY: float = 5
+    WARMUP_MAX_RETRY_DELAY: float = 300
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_QUEUE_SIZE: int = 4
+    INFERENCE_RETRY_AFTER: int = 30
+    JOBS_DIR: str = "jobs"
+    JOB_QUEUE_SIZE: int = 32
+    JOB_RETENTION_HOURS: float = 24
+    MAX_UPLOAD_SIZE_MB: int = 500
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 5
+    LLM_BACKEND: str = "mistral"
+    LLM_CONCURRENCY: int = 4
+    LLM_STUB_LATENCY: float = 0.0
+    LLM_CACHE_SIZE: int = 1024
+    LLM_CACHE_DIR: str = ""
+    LLM_CACHE_MAX_AGE_HOURS: float = 168
+    LLM_CACHE_MAX_FILES: int = 10000
+    FEEDBACK_MODE: str = "llm"
 
     class Config:
         env_file = get_environment()
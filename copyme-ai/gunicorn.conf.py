@@ -0,0 +1,12 @@
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+workers = int(os.getenv("WORKERS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+keepalive = 2
+
+# Import the app, and load the YOLO weights, in the master process:
+# the workers are forked afterwards and share the weights copy-on-write.
+preload_app = True
+os.environ.setdefault("PRELOAD_MODELS", "1")
@@ -11,6 +11,14 @@ if __name__ == "__main__":
     parser.add_argument("-i", "--input", type=str, default="../assets/sample_video.mp4", help="path to image or video")
     parser.add_argument("-o", "--output", type=str, default="../feedback", help="path to output directory")
     parser.add_argument("-m", "--mode", type=str, default="debug", help="mode to run the model")
+    parser.add_argument("-b", "--batch-size", type=int, default=1, help="number of video frames per inference batch")
+    parser.add_argument("-p", "--pipeline", action="store_true", help="overlap decoding, inference and post-processing")
+    parser.add_argument("-q", "--queue-size", type=int, default=8, help="depth of the pipeline queues")
+    parser.add_argument("-r", "--roi", action="store_true", help="run pose estimation on the detected player crop")
+    parser.add_argument("-s", "--stride", type=int, default=1, help="run the pose model on every k-th frame outside phase transitions (phase detection runs on every frame)")
+    parser.add_argument("--motion-threshold", type=float, default=None, help="analyse frames whose motion score exceeds this value (0-1)")
+    parser.add_argument("--frame-storage", type=str, default="memory", choices=["memory", "disk", "top_k"], help="how analysed frames are kept until the end of the run")
+    parser.add_argument("--top-k", type=int, default=5, help="frames kept per phase with --frame-storage top_k")
     args = parser.parse_args()
     # Set up logging
     setup_logging()
@@ -24,6 +32,14 @@ if __name__ == "__main__":
         model_path=args.model,
         kalman_filter=True,
         temporal_smoothing=True,
+        batch_size=args.batch_size,
+        pipelined=args.pipeline,
+        queue_size=args.queue_size,
+        pose_roi=args.roi,
+        frame_stride=args.stride,
+        motion_threshold=args.motion_threshold,
+        frame_storage=args.frame_storage,
+        top_k=args.top_k,
         verbose=False
     )
     results = yolo.run()
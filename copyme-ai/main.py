@@ -2,18 +2,28 @@ from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from config.setting import get_variables
 from api import router as APIRouter
+import os
 import time
 import sys
 from config.exception_class import  SettingsException
 from config.db_models import DatabaseManager
 # import for fast api lifespan
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from logging_setup import setup_logging
 from motor.motor_asyncio import AsyncIOMotorClient
 
 # Class Yolov8 model
-from yolov8_basketball.phase_detection import PhaseDetection
+from yolov8_basketball.phase_detection import PhaseDetection, DEFAULT_KEYPOINT_MODEL_PATH
+from yolov8_basketball.registry import preload_models
+from yolov8_basketball.inference_pool import InferencePool
+from yolov8_basketball.jobs import JobRunner, JobStore
+from yolov8_basketball.comparaison import BasketballAPIAnalyzer
+from mistral.mistral import create_rephraser
+from mistral.cache import CachedRephraser, FeedbackCache
+
+MODEL_PATH = "model/v1.1.3.pt"
 
 try:
     settings = get_variables()
@@ -31,7 +41,14 @@ origins = [
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await startup_db_client(app)
+    # warm up in the background: the API is live while readiness stays false until the models can serve
+    app.warmup_task = asyncio.create_task(warmup_models(app))
     yield
+    app.warmup_task.cancel()
+    try:
+        await app.warmup_task
+    except asyncio.CancelledError:
+        pass
     await shutdown_db_client(app)
 
 async def startup_db_client(app):
@@ -40,18 +57,70 @@ async def startup_db_client(app):
         os.makedirs(UPLOAD_FOLDER, exist_ok=True)
         app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER"""
 
-        app.mongodb_client = AsyncIOMotorClient(settings.MONGO_URI, uuidRepresentation='standard')
+        app.mongodb_client = AsyncIOMotorClient(
+            settings.MONGO_URI,
+            uuidRepresentation='standard',
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        )
         app.db = DatabaseManager(app.mongodb_client["CopyMe"])
         logging.info("Logged successful to the mongodb database")
 
+        # one analyzer per worker: shares the Motor pool and keeps the Mistral HTTP client alive
+        rephraser = create_rephraser(settings.LLM_BACKEND, api_key=settings.MISTRAL_API_KEY, stub_latency=settings.LLM_STUB_LATENCY)
+        if settings.LLM_CACHE_SIZE > 0:
+            rephraser = CachedRephraser(rephraser, FeedbackCache(
+                settings.LLM_CACHE_SIZE,
+                settings.LLM_CACHE_DIR,
+                max_age=settings.LLM_CACHE_MAX_AGE_HOURS * 3600,
+                max_files=settings.LLM_CACHE_MAX_FILES,
+            ))
+        app.analyzer = BasketballAPIAnalyzer(
+            db_manager=app.db,
+            mistral=rephraser,
+            llm_concurrency=settings.LLM_CONCURRENCY,
+            feedback_mode=settings.FEEDBACK_MODE,
+        )
+
         logging.info("Loading YOLOv8 model...")
-        app.yolo = PhaseDetection(model_path="model/v1.1.3.pt", kalman_filter=True, temporal_smoothing=True)
+        app.ready = False
+        app.warmup_timings = {}
+        app.warmup_error = None
+        app.inference_pool = InferencePool(workers=settings.INFERENCE_WORKERS, queue_size=settings.INFERENCE_QUEUE_SIZE)
+        app.yolo = PhaseDetection(model_path=MODEL_PATH, kalman_filter=True, temporal_smoothing=True, frame_storage="disk")
+        app.job_runner = JobRunner(
+            JobStore(settings.JOBS_DIR),
+            workers=settings.INFERENCE_WORKERS,
+            queue_size=settings.JOB_QUEUE_SIZE,
+            retention=settings.JOB_RETENTION_HOURS * 3600,
+        )
+        await app.job_runner.start()
     except Exception as e:
         logging.critical(e)
         sys.exit(84)
     logging.info("MongoDB connected.")
 
+async def warmup_models(app):
+    # retry with exponential backoff: a transient failure must not keep /ready at 503 forever
+    delay = settings.WARMUP_RETRY_DELAY
+    attempt = 1
+    while True:
+        try:
+            app.warmup_timings = await asyncio.to_thread(app.yolo.warmup, settings.WARMUP_ITERATIONS)
+            break
+        except Exception as e:
+            app.warmup_error = str(e)
+            logging.critical(f"Model warm-up failed (attempt {attempt}): {e}, retrying in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, settings.WARMUP_MAX_RETRY_DELAY)
+        attempt += 1
+    app.warmup_error = None
+    app.ready = True
+    logging.info(f"Models warmed up after {attempt} attempt(s), ready to serve.")
+
 async def shutdown_db_client(app):
+    await app.job_runner.stop()
+    app.inference_pool.shutdown()
     app.mongodb_client.close()
     logging.info("Database disconnected.")
 
@@ -85,4 +154,9 @@ setup_logging()
 logger = logging.getLogger(__name__)
 
 app = create_application()
+
+# under gunicorn (preload_app) the weights are loaded once here, before the workers fork
+if os.getenv("PRELOAD_MODELS", "0") == "1":
+    logging.info("Preloading models before fork...")
+    preload_models([MODEL_PATH, DEFAULT_KEYPOINT_MODEL_PATH])
 # uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,276 @@
+import asyncio
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_SIZE = 1024
+# floats are rounded before hashing so that near-identical payloads share an entry
+FLOAT_PRECISION = 1
+# bounds of the disk tier: entries expire after a week, at most DEFAULT_MAX_FILES files are kept
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_MAX_FILES = 10000
+# the disk tier is pruned on the first write and then every PRUNE_INTERVAL writes
+PRUNE_INTERVAL = 256
+
+def canonicalize(value: Any) -> Any:
+    """Payload in a stable form: floats rounded, enums by value, dict keys sorted when dumped."""
+    if isinstance(value, float):
+        return round(value, FLOAT_PRECISION)
+    if isinstance(value, Enum):
+        return canonicalize(value.value)
+    if isinstance(value, dict):
+        return {str(key): canonicalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    if hasattr(value, 'model_dump'):
+        return canonicalize(value.model_dump())
+    return value
+
+def cache_key(model: str, instruction: str, payload: Any) -> str:
+    canonical = json.dumps([model, instruction, canonicalize(payload)], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class FeedbackCache:
+    """
+    Content-addressed cache of generated texts, keyed by cache_key().
+
+    Entries live in an in-memory LRU of `max_entries` items. When `directory` is
+    set, they are also written there, one file per key, so they survive restarts
+    and are shared by the workers of a host. Files older than `max_age` seconds
+    are ignored and removed, and the oldest files beyond `max_files` are pruned.
+
+    lookup()/remember() only touch memory, load()/store() do the disk I/O.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, directory: Optional[str] = None,
+                 max_age: Optional[float] = DEFAULT_MAX_AGE, max_files: Optional[int] = DEFAULT_MAX_FILES):
+        self.max_entries = max(1, max_entries)
+        self.directory = directory or None
+        self.max_age = max_age if max_age and max_age > 0 else None
+        self.max_files = max_files if max_files and max_files > 0 else None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stores = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _remember(self, key: str, value: str):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _expired(self, mtime: float) -> bool:
+        return self.max_age is not None and time.time() - mtime > self.max_age
+
+    def lookup(self, key: str) -> Optional[str]:
+        """In-memory entry, without counting a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def load(self, key: str) -> Optional[str]:
+        """Entry from the disk tier (blocking), counts a miss when there is none."""
+        value = None
+        if self.directory:
+            path = self._path(key)
+            try:
+                if self._expired(os.path.getmtime(path)):
+                    os.remove(path)
+                else:
+                    with open(path, encoding='utf-8') as f:
+                        value = f.read()
+            except OSError:
+                value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self._remember(key, value)
+            self.disk_hits += 1
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.lookup(key)
+        return value if value is not None else self.load(key)
+
+    def remember(self, key: str, value: str):
+        with self._lock:
+            self._remember(key, value)
+
+    def store(self, key: str, value: str):
+        """Write the entry to the disk tier (blocking), pruning it every PRUNE_INTERVAL writes."""
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not persist feedback cache entry {key}: {e}")
+        with self._lock:
+            prune = self._stores % PRUNE_INTERVAL == 0
+            self._stores += 1
+        if prune:
+            self.prune()
+
+    def set(self, key: str, value: str):
+        self.remember(key, value)
+        self.store(key, value)
+
+    def invalidate(self, key: str):
+        """Forget an entry, in memory and on disk (blocking)."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def prune(self) -> int:
+        """Remove the expired files and the oldest ones beyond max_files, return how many were removed."""
+        if not self.directory:
+            return 0
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith('.txt'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        files.sort(reverse=True)
+        removed = 0
+        for index, (mtime, path) in enumerate(files):
+            if self._expired(mtime) or (self.max_files is not None and index >= self.max_files):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "persistent": self.directory is not None,
+        }
+
+@dataclass
+class InflightRequest:
+    """LLM call shared by the concurrent requests for the same key."""
+    task: asyncio.Task
+    waiters: int = 0
+
+class CachedRephraser:
+    """
+    Rephraser wrapper that answers repeated (model, instruction, payload) requests from a FeedbackCache.
+
+    Concurrent async requests for the same key wait for a single LLM call. The
+    call runs in its own task: a cancelled request only stops waiting, the call
+    itself is cancelled once no request waits for it any more. The async path
+    does the disk I/O of the cache in a thread, off the event loop.
+
+    Callers that cannot use an answer (e.g. invalid JSON) drop it with invalidate(),
+    so that the next request asks the LLM again.
+    """
+
+    def __init__(self, rephraser, cache: FeedbackCache):
+        self.rephraser = rephraser
+        self.cache = cache
+        self._inflight: Dict[str, InflightRequest] = {}
+        self.coalesced = 0
+
+    @property
+    def model(self) -> str:
+        return self.rephraser.model
+
+    def rephrase(self, original_sentence, instruction: str) -> str:
+        key = cache_key(self.model, instruction, original_sentence)
+        value = self.cache.get(key)
+        if value is None:
+            value = self.rephraser.rephrase(original_sentence, instruction)
+            self.cache.set(key, value)
+        return value
+
+    async def rephrase_async(self, original_sentence, instruction: str) -> str:
+        key = cache_key(self.model, instruction, original_sentence)
+        value = self.cache.lookup(key)
+        if value is None:
+            value = await asyncio.to_thread(self.cache.load, key) if self.cache.directory else self.cache.load(key)
+        if value is not None:
+            return value
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = InflightRequest(asyncio.create_task(self._fetch(key, original_sentence, instruction)))
+            self._inflight[key] = inflight
+            inflight.task.add_done_callback(lambda task: self._finish(key, inflight))
+        else:
+            self.coalesced += 1
+        inflight.waiters += 1
+        try:
+            return await asyncio.shield(inflight.task)
+        finally:
+            inflight.waiters -= 1
+            if inflight.waiters == 0 and not inflight.task.done():
+                # every request gave up, nobody needs the answer any more
+                inflight.task.cancel()
+
+    async def _fetch(self, key: str, original_sentence, instruction: str) -> str:
+        value = await self.rephraser.rephrase_async(original_sentence, instruction)
+        self.cache.remember(key, value)
+        if self.cache.directory:
+            await asyncio.to_thread(self.cache.store, key, value)
+        return value
+
+    async def invalidate(self, original_sentence, instruction: str):
+        """Drop the cached answer to this request."""
+        key = cache_key(self.model, instruction, original_sentence)
+        if self.cache.directory:
+            await asyncio.to_thread(self.cache.invalidate, key)
+        else:
+            self.cache.invalidate(key)
+
+    def _finish(self, key: str, inflight: InflightRequest):
+        if self._inflight.get(key) is inflight:
+            del self._inflight[key]
+        if not inflight.task.cancelled():
+            # the waiters get the exception, do not warn about it being unretrieved
+            inflight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "coalesced": self.coalesced}
+
+    def set_model(self, model: str):
+        self.rephraser.set_model(model)
+
+    def is_api_key_valid(self) -> bool:
+        return self.rephraser.is_api_key_valid()
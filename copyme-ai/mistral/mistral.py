@@ -2,6 +2,7 @@ from mistralai import Mistral, models
 import os
 from dotenv import load_dotenv
 import json
+from typing import Dict, List
 
 load_dotenv()
 
@@ -13,26 +14,44 @@ class MistralRephraser:
         self.model = model
         self.client = Mistral(api_key=self.api_key)
 
-    def rephrase(self, original_sentence, instruction: str) -> str:
-        """
-        Rephrase a sentence or a JSON object according to the instruction.
-        :param original_sentence: str or dict (JSON-like)
-        :param instruction: str
-        :return: str
-        """
+    @staticmethod
+    def _messages(original_sentence, instruction: str) -> List[Dict[str, str]]:
         if isinstance(original_sentence, dict):
             original_sentence_str = json.dumps(original_sentence, ensure_ascii=False, indent=2)
         else:
             original_sentence_str = str(original_sentence)
 
-        messages = [
+        return [
             {"role": "system", "content": instruction},
             {"role": "user", "content": original_sentence_str}
         ]
+
+    def rephrase(self, original_sentence, instruction: str) -> str:
+        """
+        Rephrase a sentence or a JSON object according to the instruction.
+        :param original_sentence: str or dict (JSON-like)
+        :param instruction: str
+        :return: str
+        """
         try:
             response = self.client.chat.complete(
                 model=self.model,
-                messages=messages
+                messages=self._messages(original_sentence, instruction)
+            )
+            return response.choices[0].message.content.strip()
+        except models.SDKError as e:
+            raise RuntimeError(f"Mistral API error: {e.message}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error: {str(e)}") from e
+
+    async def rephrase_async(self, original_sentence, instruction: str) -> str:
+        """
+        Same as rephrase, without blocking the event loop.
+        """
+        try:
+            response = await self.client.chat.complete_async(
+                model=self.model,
+                messages=self._messages(original_sentence, instruction)
             )
             return response.choices[0].message.content.strip()
         except models.SDKError as e:
@@ -56,3 +75,18 @@ class MistralRephraser:
         except Exception:
             return False
 
+
+LLM_BACKEND_MISTRAL = "mistral"
+LLM_BACKEND_STUB = "stub"
+LLM_BACKENDS = (LLM_BACKEND_MISTRAL, LLM_BACKEND_STUB)
+
+def create_rephraser(backend: str = LLM_BACKEND_MISTRAL, api_key: str = None, stub_latency: float = 0.0):
+    """
+    Build the rephraser for `backend`: the Mistral API, or the offline stub used for load tests.
+    """
+    if backend == LLM_BACKEND_STUB:
+        from .stub import StubRephraser
+        return StubRephraser(latency=stub_latency)
+    if backend != LLM_BACKEND_MISTRAL:
+        raise ValueError(f"Unknown LLM backend '{backend}', expected one of {LLM_BACKENDS}")
+    return MistralRephraser(api_key=api_key)
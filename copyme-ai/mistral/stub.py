@@ -0,0 +1,52 @@
+import asyncio
+import json
+import time
+
+class StubRephraser:
+    """
+    Offline stand-in for MistralRephraser, selected with LLM_BACKEND=stub.
+
+    It answers instantly (or after `latency` seconds, to mimic the API) with
+    deterministic text built from the input, so the analysis pipeline can be
+    load-tested without network access or API costs.
+    """
+
+    def __init__(self, model: str = "stub", latency: float = 0.0):
+        self.model = model
+        self.latency = latency
+
+    @staticmethod
+    def _answer(original_sentence, instruction: str) -> str:
+        # batched prompts send {"items": [{"id": ..}, ..]} and expect a JSON object keyed by id
+        if isinstance(original_sentence, dict) and isinstance(original_sentence.get("items"), list):
+            return json.dumps({
+                str(item.get("id")): {
+                    "feedback": f"Adjust {len(item.get('improvements', []))} angle(s) for this phase.",
+                    "recommendations": ["Keep your elbow under the ball", "Bend your knees before the release"],
+                }
+                for item in original_sentence["items"]
+            })
+        # the global summary of template mode expects {"feedback": .., "recommendations": [..]}
+        if isinstance(original_sentence, dict) and "improvements" in original_sentence and "analysis" in original_sentence:
+            return json.dumps({
+                "feedback": f"Adjust {len(original_sentence['improvements'])} angle(s) across the shot.",
+                "recommendations": ["Focus on a consistent release", "Keep your balance on landing"],
+            })
+        size = len(json.dumps(original_sentence, default=str))
+        return f"Stub feedback ({size} characters of input).\nFocus on a consistent release.\nKeep your balance on landing."
+
+    def rephrase(self, original_sentence, instruction: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._answer(original_sentence, instruction)
+
+    async def rephrase_async(self, original_sentence, instruction: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._answer(original_sentence, instruction)
+
+    def set_model(self, model: str):
+        self.model = model
+
+    def is_api_key_valid(self) -> bool:
+        return True
@@ -0,0 +1,23 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# settings required by config.setting, see .env.example
+TEST_ENVIRONMENT = {
+    "APP_NAME": "copyme-ai",
+    "APP_VERSION": "test",
+    "FRONTEND_URL": "http://localhost:3000",
+    "MONGO_ROOT_USERNAME": "admin",
+    "MONGO_ROOT_PASSWORD": "password",
+    "MONGO_PORT": "27017",
+    "MONGO_HOST": "localhost",
+    "MONGO_ARGS": "",
+    "MONGO_URI": "mongodb://localhost:27017/CopyMe",
+    "UPLOAD_DIR": "uploads",
+    "MISTRAL_API_KEY": "test",
+}
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from yolov8_basketball.comparaison.advanced_comparison import AdvancedComparison
+
+FRAMES = 64
+
+@pytest.fixture
+def comparison():
+    return AdvancedComparison()
+
+@pytest.fixture
+def sequences():
+    rng = np.random.default_rng(0)
+    # keypoints are stored as float32, as read from MongoDB
+    current = rng.uniform(0, 640, (FRAMES, 17, 2)).astype(np.float32)
+    reference = np.clip(current + rng.normal(0, 30, current.shape), 0, None).astype(np.float32)
+    # undetected points
+    current[1] = 0
+    reference[2, 9:] = 0
+    # null vectors in the stability angles
+    current[3, 7] = current[3, 5]
+    current[4, 13] = current[4, 11]
+    # zero reference shoulder and hip widths
+    reference[5, 6, 0] = reference[5, 5, 0]
+    reference[6, 11, 0] = reference[6, 12, 0]
+    # zero mean distance on a limb
+    current[7, [5, 7, 9]] = reference[7, [5, 7, 9]]
+    return current, reference
+
+def per_frame(comparison, current, reference):
+    return [comparison.compare_poses_advanced(current[t].tolist(), reference[t].tolist()) for t in range(len(current))]
+
+def test_sequence_matches_per_frame(comparison, sequences):
+    current, reference = sequences
+    assert comparison.compare_sequences_advanced(current, reference) == per_frame(comparison, current, reference)
+
+def test_sequence_of_lists_matches_per_frame(comparison, sequences):
+    current, reference = sequences
+    current_lists = [frame.tolist() for frame in current]
+    reference_lists = [frame.tolist() for frame in reference]
+    assert comparison.compare_sequences_advanced(current_lists, reference_lists) == per_frame(comparison, current, reference)
+
+def test_invalid_frames_get_default_result(comparison, sequences):
+    current, reference = sequences
+    current_lists = [frame.tolist() for frame in current[:3]]
+    reference_lists = [frame.tolist() for frame in reference[:3]]
+    current_lists[1] = current_lists[1][:16]
+    results = comparison.compare_sequences_advanced(current_lists, reference_lists)
+    assert results[1] == comparison._get_default_result()
+    assert results[0] == comparison.compare_poses_advanced(current_lists[0], reference_lists[0])
+    assert results[2] == comparison.compare_poses_advanced(current_lists[2], reference_lists[2])
+
+def test_empty_sequence(comparison):
+    assert comparison.compare_sequences_advanced(np.zeros((0, 17, 2)), np.zeros((0, 17, 2))) == []
+
+def test_non_finite_metrics_are_zero(comparison, sequences):
+    import json
+    current, reference = sequences
+    current = current.astype(np.float64)
+    current[10] = np.nan
+    current[11, 5] = np.inf
+    results = comparison.compare_sequences_advanced(current, reference)
+    json.dumps(results, allow_nan=False)
+    # finite frames keep the per-frame values
+    assert results[12:] == per_frame(comparison, current[12:], reference[12:])
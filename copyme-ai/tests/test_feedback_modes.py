@@ -0,0 +1,39 @@
+import asyncio
+from config.db_models import DatabaseManager
+from config.setting import Settings
+from mistral.stub import StubRephraser
+from yolov8_basketball.comparaison import BasketballAPIAnalyzer
+from yolov8_basketball.comparaison.enums import Direction, PriorityLevel
+from yolov8_basketball.comparaison.feedback_templates import FEEDBACK_MODE_LLM, FEEDBACK_MODE_TEMPLATE
+from yolov8_basketball.comparaison.models import Improvement
+
+class CountingRephraser(StubRephraser):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def rephrase_async(self, original_sentence, instruction: str) -> str:
+        self.calls += 1
+        return await super().rephrase_async(original_sentence, instruction)
+
+def frame_results():
+    improvement = Improvement(angle_index=0, target_angle=90.0, direction=Direction.INCREASE, magnitude=20.0,
+                              priority=PriorityLevel.HIGH, class_name="elbow")
+    return [{'frame_index': i, 'phase': 'shot_release', 'improvements': [improvement]} for i in range(3)]
+
+def test_llm_mode_is_the_default():
+    assert Settings.model_fields["FEEDBACK_MODE"].default == FEEDBACK_MODE_LLM
+
+def test_template_mode_global_summary_is_a_single_request():
+    rephraser = CountingRephraser()
+    analyzer = BasketballAPIAnalyzer(db_manager=DatabaseManager(), mistral=rephraser, feedback_mode=FEEDBACK_MODE_TEMPLATE)
+    calculated_results = frame_results()
+    advanced_results = [{'technical_score': 72.0, 'pose_quality': {'balance': 0.8}} for _ in calculated_results]
+    summary = analyzer.create_analysis_summary(advanced_results, calculated_results)
+
+    feedback, recommendations = asyncio.run(analyzer.generate_global_summary(
+        calculated_results, calculated_results, calculated_results, summary, advanced_results))
+
+    assert rephraser.calls == 1
+    assert feedback.startswith("Adjust 3 angle(s)")
+    assert recommendations == ["Focus on a consistent release", "Keep your balance on landing"]
@@ -0,0 +1,70 @@
+import json
+import numpy as np
+from config.db_models import FrameData
+from yolov8_basketball.tools.keypoint import KEYPOINT_SHAPE, pack_keypoints
+
+def make_frame(**fields) -> FrameData:
+    keypoints = np.arange(np.prod(KEYPOINT_SHAPE), dtype=np.float32).reshape(KEYPOINT_SHAPE)
+    data = {
+        "class_name": "shot_release",
+        "url_path_frame": "frames/0.jpg",
+        "frame_number": 0,
+        "keypoints": keypoints,
+        "angles": [],
+    }
+    data.update(fields)
+    return FrameData(**data)
+
+def test_frame_data_dumps_to_json():
+    frame = make_frame()
+    dumped = json.loads(frame.model_dump_json())
+    assert dumped["keypoints"] == frame.keypoints.tolist()
+    # the JSON form validates back to the same array
+    assert np.array_equal(FrameData(**dumped).keypoints, frame.keypoints)
+
+def test_frame_data_python_dump_keeps_array():
+    frame = make_frame(keypoints=pack_keypoints(make_frame().keypoints))
+    assert isinstance(frame.model_dump()["keypoints"], np.ndarray)
+
+def test_frame_data_json_schema():
+    schema = FrameData.model_json_schema(mode="serialization")
+    assert schema["properties"]["keypoints"]["type"] == "array"
+
+def test_openapi_schema_builds():
+    from main import app
+
+    schema = app.openapi()
+    assert "/api/v1/ai/process" in schema["paths"]
+    assert "/api/v1/ai/process/stream" in schema["paths"]
+
+def test_frames_expression_slice_count_is_positive():
+    from config.db_models import DatabaseManager
+
+    expression = DatabaseManager.frames_expression(skip=5)
+    count = expression["$slice"][2]
+    # $size vaut 0 pour un tableau vide, MongoDB refuse un $slice de 0 éléments
+    assert count == {"$max": [{"$size": "$frames"}, 1]}
+    assert DatabaseManager.frames_expression(skip=5, limit=3) == {"$slice": ["$frames", 5, 3]}
+    assert DatabaseManager.frames_expression(limit=0, fields=["keypoints"])["$map"]["input"] == {"$literal": []}
+    assert DatabaseManager.frames_expression() == "$frames"
+
+def test_process_response_is_serialized_by_its_response_model():
+    from datetime import datetime
+    from fastapi.routing import APIRoute
+    from fastapi.datastructures import DefaultPlaceholder
+    from api.v1.model import ProcessResponse, router
+    from config.serializers import build_process_response, serialize_frames
+
+    frame = make_frame(keypoints=np.full(KEYPOINT_SHAPE, np.nan, dtype=np.float32))
+    content = build_process_response("abc", serialize_frames([frame]), datetime(2026, 1, 2), "uploads/a.mp4",
+                                     sampling_stats={"analysed": 10, "skipped": 30})
+    dumped = json.loads(ProcessResponse.model_validate(content).model_dump_json(by_alias=True))
+    assert dumped["_id"] == "abc" and dumped["original_path"] == "uploads/a.mp4"
+    assert dumped["sampling_stats"] == {"analysed": 10, "skipped": 30}
+    assert set(dumped["frames"][0]["keypoints_positions"].values()) == {0.0}
+
+    # no custom response class: FastAPI dumps the response model to JSON in pydantic-core
+    routes = {route.path: route for route in router.routes if isinstance(route, APIRoute)}
+    for path in ("/ai/process", "/ai/process/stream", "/ai/jobs/{job_id}/result", "/ai/analyze"):
+        assert isinstance(routes[path].response_class, DefaultPlaceholder)
+        assert routes[path].response_model is not None
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+from yolov8_basketball.jobs import JobRunner, JobStatus, JobStore
+
+def dead_owner() -> str:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{socket.gethostname()}:{process.pid}"
+
+def test_start_only_fails_orphaned_jobs(tmp_path):
+    store = JobStore(str(tmp_path))
+    other_worker = store.create(f"{socket.gethostname()}:{os.getppid()}")
+    orphan = store.create(dead_owner())
+
+    async def start_and_stop():
+        runner = JobRunner(store)
+        await runner.start()
+        await runner.stop()
+
+    asyncio.run(start_and_stop())
+    assert store.get(other_worker["job_id"])["status"] == JobStatus.QUEUED.value
+    assert store.get(orphan["job_id"])["status"] == JobStatus.FAILED.value
+
+def test_progress_is_shared_through_the_store(tmp_path):
+    store = JobStore(str(tmp_path))
+    job_id = store.create("elsewhere:1")["job_id"]
+    store.update(job_id, status=JobStatus.RUNNING.value, frames_processed=12, frames_total=40)
+    # a worker without the session reads the progress written by the owner
+    record = asyncio.run(JobRunner(store).status(job_id))
+    assert (record["frames_processed"], record["frames_total"]) == (12, 40)
+
+def test_purge_deletes_old_finished_jobs(tmp_path):
+    store = JobStore(str(tmp_path))
+    old = store.create()["job_id"]
+    store.update(old, status=JobStatus.DONE.value)
+    store.save_result(old, {"frames": []})
+    store._write(store._path(old), dict(store.get(old), updated_at=(datetime.utcnow() - timedelta(days=2)).isoformat()))
+    recent = store.create()["job_id"]
+    store.update(recent, status=JobStatus.DONE.value)
+    running = store.create()["job_id"]
+
+    assert store.purge(24 * 3600) == 1
+    assert store.get(old) is None and store.get_result(old) is None
+    assert store.get(recent) is not None and store.get(running) is not None
+
+def test_store_is_used_off_the_event_loop(tmp_path):
+    store = JobStore(str(tmp_path))
+    on_loop = []
+    for name in ("create", "get", "update", "save_result", "get_result", "purge", "unfinished"):
+        method = getattr(store, name)
+
+        def record(*args, method=method, name=name, **kwargs):
+            on_loop.append((name, threading.current_thread() is threading.main_thread()))
+            return method(*args, **kwargs)
+        setattr(store, name, record)
+
+    async def scenario():
+        runner = JobRunner(store)
+        await runner.start()
+
+        async def job():
+            return {"frames": [{"class_name": "shot_release"}] * 3}
+
+        job_id = await runner.submit(job)
+        await runner.queue.join()
+        status = await runner.status(job_id)
+        result = await runner.result(job_id)
+        await runner.stop()
+        return status, result
+
+    status, result = asyncio.run(scenario())
+    assert status["status"] == JobStatus.DONE.value
+    assert len(result["frames"]) == 3
+    assert {name for name, _ in on_loop} >= {"create", "get", "update", "save_result", "get_result", "purge", "unfinished"}
+    assert [name for name, main_thread in on_loop if main_thread] == []
+
+def test_status_reports_sampling_stats(tmp_path):
+    from yolov8_basketball.session import DetectionSession
+    from yolov8_basketball.tools.sampling import FrameSampler
+
+    store = JobStore(str(tmp_path))
+    session = DetectionSession(input="video.mp4", sampler=FrameSampler(stride=2), kalman_filter=None)
+
+    async def scenario():
+        runner = JobRunner(store)
+        await runner.start()
+
+        async def job():
+            for i in range(4):
+                session.sampler.should_analyse(i)
+            return {"frames": []}
+
+        job_id = await runner.submit(job, session)
+        await runner.queue.join()
+        await runner.stop()
+        return await runner.status(job_id)
+
+    record = asyncio.run(scenario())
+    assert record["status"] == JobStatus.DONE.value
+    assert record["sampling_stats"] == {"analysed": 2, "skipped": 2}
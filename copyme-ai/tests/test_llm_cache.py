@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from mistral.cache import CachedRephraser, FeedbackCache
+
+class SlowRephraser:
+    """Rephraser double whose answers wait for `release`."""
+    model = "test"
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def rephrase_async(self, original_sentence, instruction: str) -> str:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"answer to {original_sentence}"
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def scenario():
+        rephraser = SlowRephraser()
+        cached = CachedRephraser(rephraser, FeedbackCache(8))
+        leader = asyncio.create_task(cached.rephrase_async("elbow", "rephrase"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cached.rephrase_async("elbow", "rephrase"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        rephraser.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await waiter == "answer to elbow"
+        assert (rephraser.calls, rephraser.cancelled, cached.coalesced) == (1, 0, 1)
+
+    asyncio.run(scenario())
+
+def test_shared_call_cancelled_when_every_request_gave_up():
+    async def scenario():
+        rephraser = SlowRephraser()
+        cached = CachedRephraser(rephraser, FeedbackCache(8))
+        requests = [asyncio.create_task(cached.rephrase_async("knee", "rephrase")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for request in requests:
+            request.cancel()
+        await asyncio.gather(*requests, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert rephraser.cancelled == 1
+        assert cached._inflight == {}
+        # the next request starts a new call
+        rephraser.release.set()
+        assert await cached.rephrase_async("knee", "rephrase") == "answer to knee"
+        assert rephraser.calls == 2
+
+    asyncio.run(scenario())
+
+class AnswerRephraser:
+    """Rephraser double returning the queued answers in order."""
+    model = "test"
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    async def rephrase_async(self, original_sentence, instruction: str) -> str:
+        self.calls += 1
+        return self.answers.pop(0)
+
+def test_unparsable_answer_is_not_kept(tmp_path):
+    from config.db_models import DatabaseManager
+    from yolov8_basketball.comparaison import BasketballAPIAnalyzer
+
+    rephraser = AnswerRephraser("not json", '{"0": {"feedback": "Bend your knees"}}')
+    cache = FeedbackCache(8, str(tmp_path))
+    analyzer = BasketballAPIAnalyzer(db_manager=DatabaseManager(), mistral=CachedRephraser(rephraser, cache))
+    payload = {"phase": "shot_release", "items": []}
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await analyzer._rephrase_json(payload, "instruction")
+        assert cache.stats()["entries"] == 0
+        assert not list(tmp_path.rglob("*.txt"))
+        # the next request asks the LLM again instead of replaying the bad answer
+        assert await analyzer._rephrase_json(payload, "instruction") == {"0": {"feedback": "Bend your knees"}}
+        assert await analyzer._rephrase_json(payload, "instruction") == {"0": {"feedback": "Bend your knees"}}
+
+    asyncio.run(scenario())
+    assert rephraser.calls == 2
+
+def test_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+    cache = FeedbackCache(8, str(tmp_path))
+    loop_threads = []
+    for name in ("load", "store"):
+        method = getattr(cache, name)
+
+        def record(*args, method=method):
+            loop_threads.append(threading.current_thread() is threading.main_thread())
+            return method(*args)
+        monkeypatch.setattr(cache, name, record)
+
+    async def scenario():
+        cached = CachedRephraser(AnswerRephraser("answer"), cache)
+        assert await cached.rephrase_async("elbow", "rephrase") == "answer"
+
+    asyncio.run(scenario())
+    assert loop_threads == [False, False]
+
+def test_disk_tier_expires_and_prunes(tmp_path):
+    import os
+    import time
+    cache = FeedbackCache(8, str(tmp_path), max_age=3600, max_files=2)
+    for key in ("aa1", "bb2", "cc3"):
+        cache.store(key, key)
+    old = time.time() - 7200
+    os.utime(cache._path("aa1"), (old, old))
+    # expired: ignored and removed
+    assert cache.load("aa1") is None
+    assert not os.path.exists(cache._path("aa1"))
+    cache.store("dd4", "dd4")
+    os.utime(cache._path("bb2"), (old + 3700, old + 3700))
+    assert cache.prune() == 1
+    assert sorted(p.name for p in tmp_path.rglob("*.txt")) == ["cc3.txt", "dd4.txt"]
@@ -0,0 +1,75 @@
+import numpy as np
+import supervision as sv
+from yolov8_basketball.phase_detection import PhaseDetection
+from yolov8_basketball.session import DetectionSession
+from yolov8_basketball.tools.sampling import FrameSampler
+
+PHASES = {0: "shot_preparation", 1: "shot_release"}
+
+class RecordingPoseModel:
+    """Pose model double recording the frames it is run on."""
+
+    def __init__(self):
+        self.frames = []
+
+    def crop_roi(self, frame, roi):
+        return frame
+
+    def _infer_batch(self, frames):
+        self.frames.extend(int(frame[0, 0, 0]) for frame in frames)
+        return [None for _ in frames]
+
+def make_detector(phase_ids, confidences=None):
+    confidences = confidences or [0.9] * len(phase_ids)
+    detector = object.__new__(PhaseDetection)
+    detector.CLASS_NAMES_DICT = PHASES
+    detector.conf_threshold = 0.5
+    detector.pose_roi = False
+    detector.verbose = False
+    detector.keypoint_model = RecordingPoseModel()
+    detector.phase_frames = []
+
+    def infer_batch(frames):
+        indices = [int(frame[0, 0, 0]) for frame in frames]
+        detector.phase_frames.extend(indices)
+        return [sv.Detections(xyxy=np.array([[0., 0., 1., 1.]]), confidence=np.array([confidences[i]]), class_id=np.array([phase_ids[i]]))
+                for i in indices]
+
+    detector._infer_batch = infer_batch
+    detector._detect = lambda result: result
+    return detector
+
+def decoded_frames(count):
+    return [(i, np.full((2, 2, 3), i, dtype=np.uint8), i / 30, 0.0) for i in range(count)]
+
+def test_transition_on_skipped_frame_forces_pose_inference():
+    # stride 4: frames 0 and 4 are sampled, the phase changes on frame 3
+    phase_ids = [0, 0, 0, 1, 1, 1, 1, 1]
+    detector = make_detector(phase_ids)
+    session = DetectionSession(input="video.mp4", sampler=FrameSampler(stride=4, dense_window=1), kalman_filter=None)
+
+    inferred = detector._infer_frames(session, decoded_frames(len(phase_ids)))
+
+    assert detector.phase_frames == list(range(len(phase_ids)))
+    assert detector.keypoint_model.frames == [0, 3, 4]
+    assert [item[0] for item in inferred] == [0, 3, 4]
+
+def test_pose_model_skipped_when_no_frame_is_sampled():
+    detector = make_detector([0, 0, 0, 0])
+    session = DetectionSession(input="video.mp4", sampler=FrameSampler(stride=4), kalman_filter=None)
+
+    assert detector._infer_frames(session, decoded_frames(4)[1:]) == []
+    assert detector.phase_frames == [1, 2, 3]
+    assert detector.keypoint_model.frames == []
+
+def test_low_confidence_flicker_is_not_a_transition():
+    # frames 2 and 5 flicker to another class at low confidence, below conf_threshold
+    phase_ids = [0, 0, 1, 0, 0, 1, 0, 0]
+    confidences = [0.9, 0.9, 0.3, 0.9, 0.9, 0.5, 0.9, 0.9]
+    detector = make_detector(phase_ids, confidences)
+    session = DetectionSession(input="video.mp4", sampler=FrameSampler(stride=4, dense_window=2), kalman_filter=None)
+
+    inferred = detector._infer_frames(session, decoded_frames(len(phase_ids)))
+
+    assert [item[0] for item in inferred] == [0, 4]
+    assert session.sampler.stats() == {"analysed": 2, "skipped": 6}
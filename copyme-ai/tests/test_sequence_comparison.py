@@ -0,0 +1,79 @@
+import math
+import numpy as np
+import pytest
+from yolov8_basketball.comparaison.angles import AngleUtils
+from yolov8_basketball.comparaison.keypoints import KeypointUtils
+from yolov8_basketball.comparaison.sequence_comparison import SequenceComparison
+
+FRAMES = 120
+ANGLE_NAMES = ["elbow", "knee", "shoulder", "hip", "wrist"]
+
+def assert_close(actual, expected, path="result"):
+    """Same structure and strings, floats equal up to rounding (x ** 2 goes through pow in the per-frame path)."""
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_close(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_close(a, e, f"{path}[{i}]")
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9), path
+    else:
+        assert actual == expected, path
+
+@pytest.fixture
+def keypoint_sequences():
+    rng = np.random.default_rng(0)
+    current = rng.uniform(-20, 400, (FRAMES, 17, 2))
+    reference = current + rng.normal(0, 25, current.shape)
+    # frames without any valid point, and with a single one
+    current[5] = 0
+    current[6, 1:] = 0
+    return current, reference
+
+@pytest.fixture
+def angle_sequences():
+    rng = np.random.default_rng(1)
+    current, targets = [], []
+    for _ in range(FRAMES):
+        names = list(rng.permutation(ANGLE_NAMES)[:4])
+        current.append([{"angle_name": [name, "left"], "angle": float(rng.uniform(0, 180))} for name in names])
+        targets.append({name: {"ref": float(rng.uniform(0, 180)), "tolerance": float(rng.uniform(2, 10))}
+                        for name in ANGLE_NAMES[:3]})
+    return current, targets
+
+def test_compare_keypoints_matches_per_frame(keypoint_sequences):
+    current, reference = keypoint_sequences
+    results = SequenceComparison.compare_keypoints(current, reference)
+    for t in range(FRAMES):
+        assert_close(results[t], KeypointUtils.compare_keypoints(current[t].tolist(), reference[t].tolist()), f"frame {t}")
+
+def test_compare_angles_matches_per_frame(angle_sequences):
+    current, targets = angle_sequences
+    improvements = SequenceComparison.compare_angles(current, targets)
+    assert improvements == [AngleUtils.compare_angles(angles, target) for angles, target in zip(current, targets)]
+
+def test_compare_angles_accepts_dict_form(angle_sequences):
+    current, targets = angle_sequences
+    current = [{entry["angle_name"][0]: entry["angle"] for entry in angles} for angles in current]
+    improvements = SequenceComparison.compare_angles(current, targets)
+    assert any(improvements)
+    assert improvements == [AngleUtils.compare_angles(angles, target) for angles, target in zip(current, targets)]
+
+def test_empty_sequences():
+    assert SequenceComparison.compare_keypoints(np.zeros((0, 17, 2)), np.zeros((0, 17, 2))) == []
+    assert SequenceComparison.compare_angles([None, "invalid"], [{}, {"elbow": {"ref": 90, "tolerance": 5}}]) == [[], []]
+
+def test_non_finite_keypoints_give_finite_metrics():
+    import json
+    current = np.full((2, 17, 2), 100.0)
+    current[0, 3] = np.nan
+    current[1, 4] = np.inf
+    reference = current + 5.0
+    results = SequenceComparison.compare_keypoints(current, reference)
+    # allow_nan=False: every metric is a finite JSON number
+    json.dumps(results, allow_nan=False)
+    # the NaN and inf points count as undetected
+    assert len(results[0]['distances']) == len(results[1]['distances']) == 16
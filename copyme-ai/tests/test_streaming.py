@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+from yolov8_basketball.tools.streaming import MIN_OPEN_BYTES, GrowingFileCapture, StreamingUpload
+
+FRAMES = 30
+
+def write_video(path, frames=FRAMES):
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 30, (320, 240))
+    for _ in range(frames):
+        writer.write(rng.integers(0, 255, (240, 320, 3), dtype=np.uint8))
+    writer.release()
+
+def test_frame_count_unknown_until_upload_complete(tmp_path):
+    source = tmp_path / "source.mp4"
+    write_video(source)
+    data = source.read_bytes()
+    assert len(data) >= MIN_OPEN_BYTES
+
+    upload = StreamingUpload(str(tmp_path / "upload.mp4"))
+    with open(upload.path, "ab") as f:
+        f.write(data)
+    cap = GrowingFileCapture(upload)
+    try:
+        # still being written: the count of the partial file would be wrong
+        assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == 0
+        upload.complete.set()
+        assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == FRAMES
+    finally:
+        cap.release()
+
+def test_stream_rejects_images():
+    from main import app
+
+    client = TestClient(app)
+    response = client.post("/api/v1/ai/process/stream", params={"userId": "u", "exercise_id": "e", "filename": "shot.jpg"}, content=b"")
+    assert response.status_code == 415
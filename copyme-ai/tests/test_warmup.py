@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+import main
+
+class FlakyModel:
+    """Model double whose warm-up fails `failures` times before succeeding."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def warmup(self, iterations: int):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("CUDA out of memory")
+        return {"pose": 0.01}
+
+def make_app(model) -> SimpleNamespace:
+    return SimpleNamespace(yolo=model, ready=False, warmup_timings={}, warmup_error=None)
+
+def test_warmup_retries_until_ready(monkeypatch):
+    monkeypatch.setattr(main.settings, "WARMUP_RETRY_DELAY", 0.01)
+    model = FlakyModel(failures=2)
+    app = make_app(model)
+    asyncio.run(main.warmup_models(app))
+    assert model.calls == 3
+    assert app.ready and app.warmup_error is None
+    assert app.warmup_timings == {"pose": 0.01}
+
+def test_warmup_task_cancelled_at_shutdown(monkeypatch):
+    monkeypatch.setattr(main.settings, "WARMUP_RETRY_DELAY", 60)
+    app = make_app(FlakyModel(failures=1))
+    closed = []
+
+    async def startup(app):
+        pass
+
+    async def shutdown(app):
+        closed.append(app.warmup_task.done())
+
+    monkeypatch.setattr(main, "startup_db_client", startup)
+    monkeypatch.setattr(main, "shutdown_db_client", shutdown)
+
+    async def scenario():
+        async with main.lifespan(app):
+            # let the first attempt fail, the task then waits for its retry
+            while app.warmup_error is None:
+                await asyncio.sleep(0.01)
+        assert app.warmup_task.cancelled()
+
+    asyncio.run(scenario())
+    assert closed == [True]
+    assert not app.ready
@@ -10,6 +10,21 @@ import math
 # Configure logging
 logger = logging.getLogger(__name__)
 
+KEYPOINT_COUNT = 17
+FRAME_CENTER_X = 320  # Assuming 640px width
+SYMMETRY_MAX_DISTANCE = 100  # px, maximum expected left/right difference
+SMOOTHNESS_DISTANCE = 50  # px
+EFFICIENCY_ENERGY = 1000
+ALIGNMENT_DISTANCE = 30  # px
+IDEAL_SHOULDER_ANGLE = 90  # degrees
+IDEAL_HIP_ANGLE = 120  # degrees
+TIMING_PRECISION = 0.7
+TECHNICAL_SCORE_WEIGHTS = {
+    'pose_quality': 0.4,
+    'movement_analysis': 0.3,
+    'technical_precision': 0.3
+}
+
 
 class RecommendationType(Enum):
     """Enumeration for recommendation types."""
@@ -79,13 +94,180 @@ class AdvancedComparison:
             logger.error(f"Error in advanced pose comparison: {e}")
             return self._get_default_result()
 
+    def compare_sequences_advanced(self, current_sequence: Any, reference_sequence: Any) -> List[Dict[str, Any]]:
+        """
+        compare_poses_advanced for every frame of two keypoint sequences.
+
+        Takes (T, 17, 2) arrays, or lists of per-frame keypoints, and computes each
+        metric for all the frames at once. Frames compare_poses_advanced would reject
+        get the default result, the others the same values, bit for bit, except
+        that NaN/inf metrics are replaced by 0 so that the API gets finite values.
+        """
+        current, reference, valid = self._sequence_arrays(current_sequence, reference_sequence)
+        if not valid.any():
+            return [self._get_default_result() for _ in range(len(valid))]
+
+        try:
+            metrics = self._sequence_metrics(current, reference)
+        except Exception as e:
+            logger.error(f"Error in advanced sequence comparison: {e}")
+            return [self._get_default_result() for _ in range(len(valid))]
+
+        # one list of finite floats per metric, the result dicts are then built frame by frame
+        values = {name: np.nan_to_num(metric, nan=0.0, posinf=0.0, neginf=0.0).tolist() for name, metric in metrics.items()}
+        results = []
+        for t, is_valid in enumerate(valid.tolist()):
+            if not is_valid:
+                results.append(self._get_default_result())
+                continue
+            results.append({
+                'pose_quality': {name: values[name][t] for name in ('balance', 'symmetry', 'stability')},
+                'movement_analysis': {name: values[name][t] for name in ('smoothness', 'efficiency', 'consistency')},
+                'technical_precision': {
+                    'alignment': values['alignment'][t],
+                    'timing': TIMING_PRECISION,
+                    'form': values['form'][t]
+                },
+                'technical_score': values['technical_score'][t]
+            })
+        return results
+
+    def _sequence_arrays(self, current_sequence: Any, reference_sequence: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(T, 17, 2) float64 current and reference keypoints, and the (T,) mask of the frames that pass _validate_keypoints."""
+        frame_count = min(len(current_sequence), len(reference_sequence))
+        current = np.zeros((frame_count, KEYPOINT_COUNT, 2))
+        reference = np.zeros((frame_count, KEYPOINT_COUNT, 2))
+        valid = np.zeros(frame_count, dtype=bool)
+
+        if (isinstance(current_sequence, np.ndarray) and isinstance(reference_sequence, np.ndarray)
+                and current_sequence.ndim == 3 and reference_sequence.ndim == 3):
+            # arrays hold numeric points of a fixed size, only their shape can be invalid
+            if (current_sequence.shape[1] == KEYPOINT_COUNT and reference_sequence.shape[1] == KEYPOINT_COUNT
+                    and min(current_sequence.shape[2], reference_sequence.shape[2]) >= 2):
+                current[:] = current_sequence[:frame_count, :, :2]
+                reference[:] = reference_sequence[:frame_count, :, :2]
+                valid[:] = True
+            return current, reference, valid
+
+        for t in range(frame_count):
+            current_keypoints = self._as_point_list(current_sequence[t])
+            reference_keypoints = self._as_point_list(reference_sequence[t])
+            if self._validate_keypoints(current_keypoints, reference_keypoints):
+                current[t] = [point[:2] for point in current_keypoints]
+                reference[t] = [point[:2] for point in reference_keypoints]
+                valid[t] = True
+        return current, reference, valid
+
+    @staticmethod
+    def _as_point_list(keypoints: Any) -> List[List[float]]:
+        return keypoints.tolist() if isinstance(keypoints, np.ndarray) else keypoints
+
+    @staticmethod
+    def _sequential_sum(values: np.ndarray) -> np.ndarray:
+        """Sum of a (T, N) array over N, column after column as the per-frame loops accumulate (np.sum is pairwise)."""
+        total = np.zeros(values.shape[0])
+        for column in range(values.shape[1]):
+            total = total + values[:, column]
+        return total
+
+    @staticmethod
+    def _clamp_score(values: np.ndarray) -> np.ndarray:
+        # min(1.0, max(0.0, max(0, x))): fmax maps NaN to 0 as the builtin max does
+        return np.minimum(1.0, np.fmax(values, 0.0))
+
+    @staticmethod
+    def _sequence_distances(points1: np.ndarray, points2: np.ndarray) -> np.ndarray:
+        diff = points1 - points2
+        return np.sqrt(diff[..., 0] * diff[..., 0] + diff[..., 1] * diff[..., 1])
+
+    @staticmethod
+    def _sequence_angles(point1: np.ndarray, point2: np.ndarray, point3: np.ndarray) -> np.ndarray:
+        """_calculate_angle for (T, 2) points, 0 where one of the vectors is null."""
+        vector1 = point1 - point2
+        vector2 = point3 - point2
+        dot_product = vector1[:, 0] * vector2[:, 0] + vector1[:, 1] * vector2[:, 1]
+        mag1 = np.sqrt(vector1[:, 0] * vector1[:, 0] + vector1[:, 1] * vector1[:, 1])
+        mag2 = np.sqrt(vector2[:, 0] * vector2[:, 0] + vector2[:, 1] * vector2[:, 1])
+        degenerate = (mag1 == 0) | (mag2 == 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos_angle = dot_product / (mag1 * mag2)
+        # max(-1, min(1, cos)): NaN becomes 1 as with the builtins
+        cos_angle = np.fmax(-1.0, np.fmin(1.0, cos_angle))
+        return np.where(degenerate, 0.0, np.degrees(np.arccos(cos_angle)))
+
+    def _sequence_metrics(self, current: np.ndarray, reference: np.ndarray) -> Dict[str, np.ndarray]:
+        """Every metric of compare_poses_advanced as a (T,) array, same operations in the same order."""
+        indices = self.keypoint_indices
+        distances = self._sequence_distances(current, reference)
+        point_count = distances.shape[1]
+        total_distance = self._sequential_sum(distances)
+
+        # Pose quality
+        center_x = self._sequential_sum(current[:, indices['torso'], 0]) / len(indices['torso'])
+        balance = self._clamp_score(1 - np.abs(center_x - FRAME_CENTER_X) / FRAME_CENTER_X)
+
+        limb_symmetry = []
+        for left_limb, right_limb in (('left_arm', 'right_arm'), ('left_leg', 'right_leg')):
+            limb_distances = self._sequence_distances(current[:, indices[left_limb]], current[:, indices[right_limb]])
+            avg_distance = self._sequential_sum(limb_distances) / limb_distances.shape[1]
+            limb_symmetry.append(self._clamp_score(1 - (avg_distance / SYMMETRY_MAX_DISTANCE)))
+        symmetry = self._clamp_score((limb_symmetry[0] + limb_symmetry[1]) / 2)
+
+        shoulder_angle = self._sequence_angles(current[:, 5], current[:, 7], current[:, 9])
+        hip_angle = self._sequence_angles(current[:, 11], current[:, 13], current[:, 15])
+        shoulder_stability = np.fmax(1 - np.abs(shoulder_angle - IDEAL_SHOULDER_ANGLE) / 180, 0.0)
+        hip_stability = np.fmax(1 - np.abs(hip_angle - IDEAL_HIP_ANGLE) / 180, 0.0)
+        stability = (shoulder_stability + hip_stability) / 2
+
+        # Movement analysis
+        smoothness = self._clamp_score(1 - ((total_distance / point_count) / SMOOTHNESS_DISTANCE))
+        total_energy = self._sequential_sum(distances * distances)
+        efficiency = self._clamp_score(1 - ((total_energy / point_count) / EFFICIENCY_ENERGY))
+
+        limb_consistency = []
+        for limb_group in ('left_arm', 'right_arm', 'left_leg', 'right_leg'):
+            limb_distances = distances[:, indices[limb_group]]
+            mean_distance = np.mean(limb_distances, axis=1)
+            std_distance = np.std(limb_distances, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                consistency_score = self._clamp_score(1 - std_distance / mean_distance)
+            limb_consistency.append(np.where(mean_distance == 0, 1.0, consistency_score))
+        consistency = self._sequential_sum(np.stack(limb_consistency, axis=1)) / len(limb_consistency)
+
+        # Technical precision
+        alignment = self._clamp_score(1 - ((total_distance / point_count) / ALIGNMENT_DISTANCE))
+        form_scores = []
+        for left, right in ((5, 6), (11, 12)):
+            curr_width = np.abs(current[:, left, 0] - current[:, right, 0])
+            ref_width = np.abs(reference[:, left, 0] - reference[:, right, 0])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                width_score = np.fmax(1 - np.abs(curr_width / ref_width - 1), 0.0)
+            form_scores.append(np.where(ref_width > 0, width_score, 0.5))
+        form = (form_scores[0] + form_scores[1]) / 2
+
+        # Technical score, as _calculate_technical_score
+        pose_score = (balance + symmetry + stability) / 3
+        movement_score = (smoothness + efficiency + consistency) / 3
+        precision_score = (alignment + TIMING_PRECISION + form) / 3
+        technical_score = (
+            pose_score * TECHNICAL_SCORE_WEIGHTS['pose_quality'] +
+            movement_score * TECHNICAL_SCORE_WEIGHTS['movement_analysis'] +
+            precision_score * TECHNICAL_SCORE_WEIGHTS['technical_precision']
+        ) * 100
+
+        return {
+            'balance': balance, 'symmetry': symmetry, 'stability': stability,
+            'smoothness': smoothness, 'efficiency': efficiency, 'consistency': consistency,
+            'alignment': alignment, 'form': form, 'technical_score': technical_score
+        }
+
     def _validate_keypoints(self, current_keypoints: List[List[float]],
                            reference_keypoints: List[List[float]]) -> bool:
 
         if not current_keypoints or not reference_keypoints:
             return False
 
-        if len(current_keypoints) != 17 or len(reference_keypoints) != 17:
+        if len(current_keypoints) != KEYPOINT_COUNT or len(reference_keypoints) != KEYPOINT_COUNT:
             return False
 
         # Check for valid coordinates
@@ -133,7 +315,7 @@ class AdvancedComparison:
 
             # Calculate balance based on vertical alignment
             # Ideal balance: center should be vertically aligned
-            vertical_deviation = abs(center_x - 320) / 320  # Assuming 640px width
+            vertical_deviation = abs(center_x - FRAME_CENTER_X) / FRAME_CENTER_X
             balance_score = max(0, 1 - vertical_deviation)
 
             return min(1.0, max(0.0, balance_score))
@@ -175,14 +357,13 @@ class AdvancedComparison:
             # Calculate average distance between corresponding points
             total_distance = 0
             for left_point, right_point in zip(left_points, right_points):
-                distance = np.sqrt((left_point[0] - right_point[0])**2 +
-                                 (left_point[1] - right_point[1])**2)
+                distance = self._point_distance(left_point, right_point)
                 total_distance += distance
 
             avg_distance = total_distance / len(left_points)
 
             # Normalize distance (assume 100px is maximum expected difference)
-            symmetry_score = max(0, 1 - (avg_distance / 100))
+            symmetry_score = max(0, 1 - (avg_distance / SYMMETRY_MAX_DISTANCE))
 
             return min(1.0, max(0.0, symmetry_score))
 
@@ -214,8 +395,8 @@ class AdvancedComparison:
             # Calculate stability based on angle consistency
             # Ideal angles for basketball shooting
             ideal_angles = {
-                'shoulder': 90,  # degrees
-                'hip': 120       # degrees
+                'shoulder': IDEAL_SHOULDER_ANGLE,
+                'hip': IDEAL_HIP_ANGLE
             }
 
             stability_scores = []
@@ -235,6 +416,13 @@ class AdvancedComparison:
             logger.error(f"Error calculating stability: {e}")
             return 0.5
 
+    @staticmethod
+    def _point_distance(point1: List[float], point2: List[float]) -> float:
+        # squares by multiplication, exactly as the vectorised path (x ** 2 goes through pow)
+        dx = point1[0] - point2[0]
+        dy = point1[1] - point2[1]
+        return np.sqrt(dx * dx + dy * dy)
+
     def _calculate_angle(self, point1: List[float], point2: List[float],
                         point3: List[float]) -> float:
 
@@ -247,8 +435,8 @@ class AdvancedComparison:
             dot_product = vector1[0] * vector2[0] + vector1[1] * vector2[1]
 
             # Calculate magnitudes
-            mag1 = np.sqrt(vector1[0]**2 + vector1[1]**2)
-            mag2 = np.sqrt(vector2[0]**2 + vector2[1]**2)
+            mag1 = np.sqrt(vector1[0] * vector1[0] + vector1[1] * vector1[1])
+            mag2 = np.sqrt(vector2[0] * vector2[0] + vector2[1] * vector2[1])
 
             if mag1 == 0 or mag2 == 0:
                 return 0
@@ -297,7 +485,7 @@ class AdvancedComparison:
 
             for curr, ref in zip(current_keypoints, reference_keypoints):
                 if len(curr) >= 2 and len(ref) >= 2:
-                    distance = np.sqrt((curr[0] - ref[0])**2 + (curr[1] - ref[1])**2)
+                    distance = self._point_distance(curr, ref)
                     total_distance += distance
                     valid_points += 1
 
@@ -307,7 +495,7 @@ class AdvancedComparison:
             avg_distance = total_distance / valid_points
 
             # Normalize distance (assume 50px is good smoothness threshold)
-            smoothness = max(0, 1 - (avg_distance / 50))
+            smoothness = max(0, 1 - (avg_distance / SMOOTHNESS_DISTANCE))
 
             return min(1.0, max(0.0, smoothness))
 
@@ -325,8 +513,8 @@ class AdvancedComparison:
 
             for curr, ref in zip(current_keypoints, reference_keypoints):
                 if len(curr) >= 2 and len(ref) >= 2:
-                    distance = np.sqrt((curr[0] - ref[0])**2 + (curr[1] - ref[1])**2)
-                    energy = distance ** 2  # Square distance as energy
+                    distance = self._point_distance(curr, ref)
+                    energy = distance * distance  # Square distance as energy
                     total_energy += energy
                     valid_points += 1
 
@@ -336,7 +524,7 @@ class AdvancedComparison:
             avg_energy = total_energy / valid_points
 
             # Normalize energy (assume 1000 is good efficiency threshold)
-            efficiency = max(0, 1 - (avg_energy / 1000))
+            efficiency = max(0, 1 - (avg_energy / EFFICIENCY_ENERGY))
 
             return min(1.0, max(0.0, efficiency))
 
@@ -380,7 +568,7 @@ class AdvancedComparison:
 
                     curr = current_keypoints[idx]
                     ref = reference_keypoints[idx]
-                    distance = np.sqrt((curr[0] - ref[0])**2 + (curr[1] - ref[1])**2)
+                    distance = self._point_distance(curr, ref)
                     distances.append(distance)
 
             if not distances:
@@ -436,7 +624,7 @@ class AdvancedComparison:
 
             for curr, ref in zip(current_keypoints, reference_keypoints):
                 if len(curr) >= 2 and len(ref) >= 2:
-                    error = np.sqrt((curr[0] - ref[0])**2 + (curr[1] - ref[1])**2)
+                    error = self._point_distance(curr, ref)
                     total_error += error
                     valid_points += 1
 
@@ -446,7 +634,7 @@ class AdvancedComparison:
             avg_error = total_error / valid_points
 
             # Normalize error (assume 30px is good alignment threshold)
-            precision = max(0, 1 - (avg_error / 30))
+            precision = max(0, 1 - (avg_error / ALIGNMENT_DISTANCE))
 
             return min(1.0, max(0.0, precision))
 
@@ -456,7 +644,7 @@ class AdvancedComparison:
 
     def _calculate_timing_precision(self, current_keypoints: List[List[float]],
                                   reference_keypoints: List[List[float]]) -> float:
-        return 0.7
+        return TIMING_PRECISION
 
     def _calculate_form_precision(self, current_keypoints: List[List[float]],
                                 reference_keypoints: List[List[float]]) -> float:
@@ -551,11 +739,7 @@ class AdvancedComparison:
 
         try:
             # Weight different components
-            weights = {
-                'pose_quality': 0.4,
-                'movement_analysis': 0.3,
-                'technical_precision': 0.3
-            }
+            weights = TECHNICAL_SCORE_WEIGHTS
 
             # Calculate component scores
             pose_score = sum(pose_quality.values()) / len(pose_quality) if pose_quality else 0.5
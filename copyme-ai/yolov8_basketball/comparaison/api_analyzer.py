@@ -4,6 +4,7 @@ import asyncio
 import logging
 from typing import List, Dict, Optional, Tuple, Any
 import json
+import numpy as np
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
 if ROOT not in sys.path:
@@ -13,8 +14,14 @@ if PARENT not in sys.path:
     sys.path.insert(0, PARENT)
 
 from config.db_models import DatabaseManager
+from config.serializers import encode_value
+from yolov8_basketball.tools.keypoint import empty_keypoints, frame_keypoints
 from .comparaison import Comparaison
 from .advanced_comparison import AdvancedComparison
+from .reference_cache import DEFAULT_REFERENCE_TTL, ReferenceCache, ReferenceSequence
+from .sequence_comparison import SequenceComparison
+from . import feedback_templates
+from .feedback_templates import FEEDBACK_MODE_LLM, FEEDBACK_MODES
 from .visualization_enhancer import VisualizationEnhancer
 from .ui_config import (
     ADVANCED_METRICS_CONFIG,
@@ -30,17 +37,74 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Only the frame fields used by the comparison are read from MongoDB
+ANALYSIS_FRAME_FIELDS = ("class_name", "keypoints", "keypoints_positions", "angles")
+DEFAULT_LLM_CONCURRENCY = 4
+
+PHASE_FEEDBACK_INSTRUCTION = (
+    "You receive the angle corrections needed on several frames of the same basketball shot phase, "
+    "as a list of items with an 'id' and their 'improvements'. "
+    "For each item, write a brief, specific feedback focused on the immediate corrections needed for this moment, "
+    "and 2-3 specific, actionable recommendations. "
+    "Use real angle names (e.g., 'elbow angle', 'knee angle') and be direct. "
+    "Answer only with a JSON object mapping each item id to "
+    "{\"feedback\": \"...\", \"recommendations\": [\"...\", \"...\"]}."
+)
+
+GLOBAL_SUMMARY_INSTRUCTION = (
+    "You receive the angle corrections needed on the user's basketball shot ('improvements') "
+    "and a summary of the analysis ('analysis'). "
+    "Write a brief, direct, and actionable 'feedback' for the user's basketball pose: use the real angle names "
+    "(e.g., 'elbow angle', 'knee angle'), add a short explanation of why each correction helps the shot, "
+    "do not start with phrases like 'Based on feedback' and only end with a short motivating phrase if it is deserved. "
+    "Then write 3-5 specific, actionable 'recommendations' focused on the most important improvements, "
+    "encouraging but realistic, without numbering or bullet points. "
+    "Answer only with a JSON object {\"feedback\": \"...\", \"recommendations\": [\"...\", \"...\"]}."
+)
+
+def improvements_to_dicts(improvements: List) -> List[Dict]:
+    """Improvement objects to JSON-safe dicts for the LLM prompts."""
+    return encode_value([imp.model_dump() if hasattr(imp, 'model_dump') else (imp.dict() if hasattr(imp, 'dict') else dict(imp)) for imp in improvements])
+
+def parse_json_answer(text: str) -> Dict:
+    """JSON object of an LLM answer, ignoring markdown fences or text around it."""
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object in the LLM answer")
+    return json.loads(text[start:end + 1])
+
 class BasketballAPIAnalyzer:
     """
     API for analyzing basketball data without graphical display.
     Returns results as structured data.
     """
 
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager: Optional[DatabaseManager] = None, mistral: Optional[MistralRephraser] = None,
+                 llm_concurrency: int = DEFAULT_LLM_CONCURRENCY, feedback_mode: str = FEEDBACK_MODE_LLM):
+        if feedback_mode not in FEEDBACK_MODES:
+            raise ValueError(f"Unknown feedback mode '{feedback_mode}', expected one of {FEEDBACK_MODES}")
+        # the API builds one analyzer at startup and injects the app's DatabaseManager and Mistral client
+        self.db_manager = db_manager or DatabaseManager()
         self.advanced_comparison = AdvancedComparison()
         self.visualization_enhancer = VisualizationEnhancer()
-        self.mistral = MistralRephraser()
+        self.mistral = mistral or MistralRephraser()
+        # bounds the LLM requests in flight, across every analysis of the process
+        self.llm_semaphore = asyncio.Semaphore(max(1, llm_concurrency))
+        # per-frame texts from local templates or from the LLM, the global feedback always uses the LLM
+        # (one request for the feedback and the recommendations in template mode)
+        self.feedback_mode = feedback_mode
+        self.reference_cache = ReferenceCache(
+            self.load_reference, ttl=COMPARISON_CONFIG.get('reference_cache_ttl', DEFAULT_REFERENCE_TTL)
+        )
+        self.db_manager.add_reference_listener(self.reference_cache.invalidate)
+
+    async def load_reference(self) -> Optional[ReferenceSequence]:
+        """Load the reference document and extract its phase sequence, called by the reference cache."""
+        reference_data = await self.db_manager.get_reference_data(fields=ANALYSIS_FRAME_FIELDS)
+        if not reference_data:
+            return None
+        sequence = self.extract_first_valid_phase_sequence(reference_data.get("frames", []), min_frames_per_phase=3)
+        return ReferenceSequence.from_frames(str(reference_data.get("_id")), sequence)
 
     def extract_first_valid_phase_sequence(self, frames: List[Dict], min_frames_per_phase: int = 3) -> List[Dict]:
         """Extract the first valid phase sequence."""
@@ -96,19 +160,9 @@ class BasketballAPIAnalyzer:
             logger.warning(f"Missing phases: {missing_phases}")
             return []
 
-    def dict_to_list(self, keypoints_dict: Dict) -> List[List[float]]:
-        """Convert keypoints dictionary to list format."""
-        keypoint_order = [
-            'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
-            'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
-            'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
-            'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
-        ]
-
-        return [
-            [keypoints_dict.get(f"{kp}_x", 0.0), keypoints_dict.get(f"{kp}_y", 0.0)]
-            for kp in keypoint_order
-        ]
+    def frame_to_list(self, frame: Dict) -> List[List[float]]:
+        """Keypoints of a stored frame as [[x, y], ...], from the packed array or the legacy dict."""
+        return frame_keypoints(frame)[:, :2].tolist()
 
     def calculate_advanced_metrics(self, user_frames: List[Dict], reference_frames: List[Dict]) -> List[Dict]:
         """Calculate advanced metrics."""
@@ -117,42 +171,51 @@ class BasketballAPIAnalyzer:
             return []
 
         logger.info("Calculating advanced pose analysis metrics...")
-        advanced_results = []
-
+        frame_errors: Dict[int, str] = {}
+        current_sequence, reference_sequence = [], []
         for i, (user_frame, ref_frame) in enumerate(zip(user_frames, reference_frames)):
             try:
-                current_keypoints = self.dict_to_list(user_frame['keypoints_positions'])
-                reference_keypoints = self.dict_to_list(ref_frame['keypoints_positions'])
-
-                # Calculate advanced pose comparison
-                advanced_result = self.advanced_comparison.compare_poses_advanced(
-                    current_keypoints,
-                    reference_keypoints
-                )
-
-                advanced_results.append(advanced_result)
-
-                # Progress logging
-                if (i + 1) % 10 == 0 or i == len(user_frames) - 1:
-                    logger.info(f"     {i + 1}/{len(user_frames)} advanced metrics calculated")
-
+                current_keypoints = frame_keypoints(user_frame)[:, :2]
+                reference_keypoints = frame_keypoints(ref_frame)[:, :2]
             except Exception as e:
                 logger.error(f"Error calculating advanced metrics for frame {i}: {e}")
-                advanced_results.append({})
+                frame_errors[i] = str(e)
+                current_keypoints = reference_keypoints = empty_keypoints()[:, :2]
+            current_sequence.append(current_keypoints)
+            reference_sequence.append(reference_keypoints)
+        if not current_sequence:
+            return []
+
+        # Every metric of the whole (T, 17, 2) sequence in one vectorised pass
+        advanced_results = self.advanced_comparison.compare_sequences_advanced(
+            np.stack(current_sequence),
+            np.stack(reference_sequence)
+        )
+        for i in frame_errors:
+            advanced_results[i] = {}
+        logger.info(f"     {len(advanced_results)}/{len(user_frames)} advanced metrics calculated")
 
         return advanced_results
 
-    def generate_feedback(self, calculated_results: List[Dict], user_frames: List[Dict], reference_frames: List[Dict]) -> str:
+    async def _rephrase(self, payload: Any, instruction: str) -> str:
+        async with self.llm_semaphore:
+            return await self.mistral.rephrase_async(payload, instruction)
+
+    async def _rephrase_json(self, payload: Any, instruction: str) -> Dict:
+        """JSON answer of the LLM, an answer that does not parse is dropped from the LLM cache."""
+        answer = await self._rephrase(payload, instruction)
+        try:
+            return parse_json_answer(answer)
+        except ValueError:
+            if hasattr(self.mistral, 'invalidate'):
+                await self.mistral.invalidate(payload, instruction)
+            raise
+
+    async def generate_feedback(self, calculated_results: List[Dict], user_frames: List[Dict], reference_frames: List[Dict]) -> str:
         """Generate global Mistral feedback based on analysis results."""
         try:
-            all_improvements = []
-            for i, result in enumerate(calculated_results):
-                if i < len(user_frames) and i < len(reference_frames):
-                    improvements = result.get('improvements', [])
-                    if improvements:
-                        # Convert improvements to format expected by Mistral
-                        improvements_dict = [imp.model_dump() if hasattr(imp, 'model_dump') else (imp.dict() if hasattr(imp, 'dict') else dict(imp)) for imp in improvements]
-                        all_improvements.extend(improvements_dict)
+            # improvements in the format expected by Mistral
+            all_improvements = self._collect_improvements(calculated_results, user_frames, reference_frames)
 
             if not all_improvements:
                 return "No specific improvements needed at this time."
@@ -167,66 +230,104 @@ class BasketballAPIAnalyzer:
                 "If encouragement is deserved, add a short, motivating phrase at the end; otherwise, end the feedback directly."
             )
 
-            feedback = self.mistral.rephrase(all_improvements, instruction)
+            feedback = await self._rephrase(all_improvements, instruction)
             return feedback
 
         except Exception as e:
             logger.error(f"Error generating feedback: {e}")
             return "Unable to generate feedback at this time."
 
-    def generate_frame_feedback(self, frame_result: Dict, frame_index: int, phase: str) -> str:
-        """Generate feedback for a specific frame."""
+    def _collect_improvements(self, calculated_results: List[Dict], user_frames: List[Dict], reference_frames: List[Dict]) -> List[Dict]:
+        all_improvements = []
+        for i, result in enumerate(calculated_results):
+            if i < len(user_frames) and i < len(reference_frames):
+                improvements = result.get('improvements', [])
+                if improvements:
+                    all_improvements.extend(improvements_to_dicts(improvements))
+        return all_improvements
+
+    async def generate_global_summary(self, calculated_results: List[Dict], user_frames: List[Dict], reference_frames: List[Dict],
+                                      summary: Dict, advanced_results: List[Dict]) -> Tuple[str, List[str]]:
+        """Global feedback and recommendations from a single LLM request (template mode)."""
+        technical_score = summary["summary"]["average_technical_score"]
+        improvement_types = summary["summary"]["improvement_breakdown"]
+        all_improvements = self._collect_improvements(calculated_results, user_frames, reference_frames)
+        payload = {
+            'improvements': all_improvements,
+            'analysis': {
+                'technical_score': technical_score,
+                'improvement_types': improvement_types,
+                'total_improvements': sum(improvement_types.values()),
+                'performance_level': self._get_performance_rating(technical_score),
+                'pose_quality_summary': self._get_pose_quality_summary(advanced_results)
+            }
+        }
         try:
+            answer = await self._rephrase_json(payload, GLOBAL_SUMMARY_INSTRUCTION)
+        except Exception as e:
+            logger.error(f"Error generating the global summary: {e}")
+            answer = {}
+
+        feedback = answer.get('feedback') if isinstance(answer.get('feedback'), str) else None
+        if not all_improvements:
+            feedback = "No specific improvements needed at this time."
+        recommendations = answer.get('recommendations') if isinstance(answer.get('recommendations'), list) else []
+        recommendations = [str(line).strip() for line in recommendations if str(line).strip()]
+        return (
+            feedback or "Unable to generate feedback at this time.",
+            recommendations[:5] or self._generate_fallback_recommendations(technical_score, improvement_types)
+        )
+
+    def generate_template_feedback(self, phase: str, frame_results: List[Dict]):
+        """Fill frame_feedback and frame_recommendations for the frames of one phase from local templates."""
+        for frame_result in frame_results:
             improvements = frame_result.get('improvements', [])
-            if not improvements:
-                return "Good form for this phase."
-
-            improvements_dict = [imp.model_dump() if hasattr(imp, 'model_dump') else (imp.dict() if hasattr(imp, 'dict') else dict(imp)) for imp in improvements]
-
-            instruction = (
-                f"Generate a brief, specific feedback for frame {frame_index} (phase: {phase}). "
-                "Focus on the immediate corrections needed for this specific moment. "
-                "Use real angle names (e.g., 'elbow angle', 'knee angle') and be specific. "
-                "Keep it concise and actionable. "
-                "If no major issues, provide a brief positive reinforcement."
-            )
-
-            feedback = self.mistral.rephrase(improvements_dict, instruction)
-            return feedback
+            frame_result.update({
+                'frame_feedback': feedback_templates.frame_feedback(improvements, phase),
+                'frame_recommendations': feedback_templates.frame_recommendations(
+                    improvements, phase, frame_result.get('technical_score', 0))
+            })
 
-        except Exception as e:
-            logger.error(f"Error generating frame feedback: {e}")
-            return "Unable to generate frame feedback."
+    async def generate_phase_feedback(self, phase: str, frame_results: List[Dict]):
+        """
+        Fill frame_feedback and frame_recommendations for the frames of one phase.
 
-    def generate_frame_recommendations(self, frame_result: Dict, frame_index: int, phase: str) -> List[str]:
-        """Generate recommendations for a specific frame."""
-        try:
+        All the frames of the phase go in a single LLM request, and frames with
+        the same improvements are sent once and share the answer.
+        """
+        items: Dict[str, Dict] = {}
+        pending = []
+        for frame_result in frame_results:
             improvements = frame_result.get('improvements', [])
-            technical_score = frame_result.get('technical_score', 0)
-
             if not improvements:
-                return ["Maintain your current form for this phase"]
-            recommendation_data = {
-                'frame_index': frame_index,
-                'phase': phase,
-                'technical_score': technical_score,
-                'improvements': [imp.model_dump() if hasattr(imp, 'model_dump') else (imp.dict() if hasattr(imp, 'dict') else dict(imp)) for imp in improvements]
-            }
-
-            instruction = (
-                f"Generate 2-3 specific, actionable recommendations for frame {frame_index} (phase: {phase}). "
-                "Focus =on immediate adjustments needed for this specific moment. "
-                "Use specific angle names and be direct. "
-                "Return as a simple list, one recommendation per line, without numbering."
-            )
-
-            recommendations_text = self.mistral.rephrase(recommendation_data, instruction)
-            recommendations = [line.strip() for line in recommendations_text.split('\n') if line.strip()]
-            return recommendations[:3]  # Limit to 3 recommendations per frame
-
+                frame_result.update({
+                    'frame_feedback': "Good form for this phase.",
+                    'frame_recommendations': ["Maintain your current form for this phase"]
+                })
+                continue
+            improvements_dict = improvements_to_dicts(improvements)
+            key = json.dumps(improvements_dict, sort_keys=True)
+            item = items.setdefault(key, {"id": len(items), "improvements": improvements_dict})
+            pending.append((frame_result, item["id"]))
+
+        if not pending:
+            return
+
+        answers = {}
+        try:
+            answers = await self._rephrase_json({"phase": phase, "items": list(items.values())}, PHASE_FEEDBACK_INSTRUCTION)
         except Exception as e:
-            logger.error(f"Error generating frame recommendations: {e}")
-            return self._generate_fallback_frame_recommendations(improvements, technical_score)
+            logger.error(f"Error generating feedback for phase {phase}: {e}")
+
+        for frame_result, item_id in pending:
+            entry = answers.get(str(item_id))
+            entry = entry if isinstance(entry, dict) else {}
+            recommendations = [str(line).strip() for line in entry.get('recommendations') or [] if str(line).strip()]
+            frame_result.update({
+                'frame_feedback': entry.get('feedback') or "Unable to generate frame feedback.",
+                'frame_recommendations': recommendations[:3] or self._generate_fallback_frame_recommendations(
+                    frame_result.get('improvements', []), frame_result.get('technical_score', 0))
+            })
 
     def _generate_fallback_frame_recommendations(self, improvements: List, technical_score: float) -> List[str]:
         """Generate fallback recommendations for a frame if Mistral fails."""
@@ -293,7 +394,8 @@ class BasketballAPIAnalyzer:
                     "improvement_breakdown": improvement_types
                 },
                 "performance_rating": self._get_performance_rating(avg_technical_score),
-                "recommendations": self._generate_recommendations(avg_technical_score, improvement_types, advanced_results)
+                # filled by _generate_recommendations, run concurrently with the other LLM calls
+                "recommendations": []
             }
 
         except Exception as e:
@@ -313,7 +415,7 @@ class BasketballAPIAnalyzer:
         else:
             return "Needs Improvement"
 
-    def _generate_recommendations(self, technical_score: float, improvement_types: Dict, advanced_results: List[Dict]) -> List[str]:
+    async def _generate_recommendations(self, technical_score: float, improvement_types: Dict, advanced_results: List[Dict]) -> List[str]:
         """Generate personalized recommendations with Mistral based on analysis."""
         try:
             recommendation_data = {
@@ -333,7 +435,7 @@ class BasketballAPIAnalyzer:
                 "Return as a simple list of recommendations, one per line, without numbering or bullet points."
             )
 
-            recommendations_text = self.mistral.rephrase(recommendation_data, instruction)
+            recommendations_text = await self._rephrase(recommendation_data, instruction)
 
             recommendations = [line.strip() for line in recommendations_text.split('\n') if line.strip()]
             return recommendations[:5]
@@ -399,32 +501,30 @@ class BasketballAPIAnalyzer:
             logger.info(f"Analyzing video ID: {video_id}")
 
             # Load user data
-            user_data = await self.db_manager.get_by_id(video_id)
+            user_data = await self.db_manager.get_by_id(video_id, fields=ANALYSIS_FRAME_FIELDS)
             if not user_data:
                 return {"error": f"No data found for video ID: {video_id}"}
 
-            # Load reference data
-            reference_data = await self.db_manager.get_reference_data()
-            if not reference_data:
+            # Load reference data, extracted once and kept in the reference cache
+            reference = await self.reference_cache.get()
+            if reference is None:
                 return {"error": "No reference data found in database"}
 
             # Extract frame data
             user_frames = user_data.get("frames", [])
-            reference_frames = reference_data.get("frames", [])
 
-            if not user_frames or not reference_frames:
+            if not user_frames:
                 return {"error": "Insufficient frame data for analysis"}
 
             user_valid_sequence = self.extract_first_valid_phase_sequence(user_frames, min_frames_per_phase=3)
-            reference_valid_sequence = self.extract_first_valid_phase_sequence(reference_frames, min_frames_per_phase=3)
 
-            if not user_valid_sequence or not reference_valid_sequence:
+            if not user_valid_sequence or not reference.frames:
                 return {"error": "Unable to find complete and ordered phase sequences"}
 
             # Synchronize frame sequences
-            n_frames = min(len(user_valid_sequence), len(reference_valid_sequence))
+            n_frames = min(len(user_valid_sequence), len(reference.frames))
             merged_user_frames = user_valid_sequence[:n_frames]
-            merged_reference_frames = reference_valid_sequence[:n_frames]
+            merged_reference_frames = reference.frames[:n_frames]
 
             logger.info(f"Processing {n_frames} frames...")
 
@@ -435,52 +535,50 @@ class BasketballAPIAnalyzer:
                 use_kalman=COMPARISON_CONFIG.get('kalman_filtering', False)
             )
 
-            calculated_results = []
-            for i in range(n_frames):
+            # Keypoints of every frame, Kalman-filtered frame by frame when enabled (the filter is sequential)
+            frame_errors: Dict[int, str] = {}
+            filtered_current_sequence, filtered_reference_sequence = [], []
+            for i, user_frame in enumerate(merged_user_frames):
                 try:
-                    user_frame = merged_user_frames[i]
-                    ref_frame = merged_reference_frames[i]
-
-                    current_keypoints = self.dict_to_list(user_frame['keypoints_positions'])
-                    reference_keypoints = self.dict_to_list(ref_frame['keypoints_positions'])
-
-                    # Apply Kalman filtering if enabled
-                    filtered_current = (comparison_engine.filter_keypoints(current_keypoints)
-                                      if comparison_engine.use_kalman else current_keypoints)
-                    filtered_reference = (comparison_engine.filter_keypoints(reference_keypoints)
-                                        if comparison_engine.use_kalman else reference_keypoints)
-
-                    # Perform keypoint comparison
-                    comparison_result = comparison_engine.compare_keypoints(filtered_current, filtered_reference)
-
-                    # Calculate angle improvements
-                    improvements = []
-                    if 'angles' in user_frame and 'angles' in ref_frame:
-                        reference_angles = {
-                            str(angle.get('angle_name', ['unknown', 0])[0]): {
-                                "ref": angle.get('angle', 0), "tolerance": 5.0
-                            } for angle in ref_frame['angles']
-                        }
-                        improvements = comparison_engine.compare_angles(user_frame['angles'], reference_angles)
-
-                    calculated_results.append({
-                        'frame_index': i,
-                        'phase': user_frame.get('class_name', 'unknown'),
-                        'filtered_current_keypoints': filtered_current,
-                        'filtered_reference_keypoints': filtered_reference,
-                        'comparison_result': comparison_result,
-                        'improvements': improvements
-                    })
-
+                    current_keypoints = self.frame_to_list(user_frame)
                 except Exception as e:
                     logger.error(f"Error processing frame {i}: {e}")
+                    frame_errors[i] = str(e)
+                    current_keypoints = [[0.0, 0.0]] * len(reference.keypoints[i])
+                reference_keypoints = reference.keypoints[i].tolist()
+                if comparison_engine.use_kalman and i not in frame_errors:
+                    current_keypoints = comparison_engine.filter_keypoints(current_keypoints)
+                    reference_keypoints = comparison_engine.filter_keypoints(reference_keypoints)
+                filtered_current_sequence.append(current_keypoints)
+                filtered_reference_sequence.append(reference_keypoints)
+
+            # Keypoint and angle comparison of the whole (T, 17, 2) sequence in one vectorised pass
+            comparison_results = SequenceComparison.compare_keypoints(filtered_current_sequence, filtered_reference_sequence)
+            angle_improvements = SequenceComparison.compare_angles(
+                [user_frame.get('angles') for user_frame in merged_user_frames],
+                reference.angle_targets[:n_frames]
+            )
+
+            calculated_results = []
+            for i, user_frame in enumerate(merged_user_frames):
+                if i in frame_errors:
                     calculated_results.append({
                         'frame_index': i,
                         'phase': 'error',
-                        'error': str(e)
+                        'error': frame_errors[i]
                     })
+                    continue
+                calculated_results.append({
+                    'frame_index': i,
+                    'phase': user_frame.get('class_name', 'unknown'),
+                    'filtered_current_keypoints': filtered_current_sequence[i],
+                    'filtered_reference_keypoints': filtered_reference_sequence[i],
+                    'comparison_result': comparison_results[i],
+                    'improvements': angle_improvements[i]
+                })
 
             advanced_results = self.calculate_advanced_metrics(merged_user_frames, merged_reference_frames)
+            phase_frames: Dict[str, List[Dict]] = {}
             for i, advanced_result in enumerate(advanced_results):
                 if i < len(calculated_results):
                     frame_result = calculated_results[i]
@@ -492,21 +590,32 @@ class BasketballAPIAnalyzer:
                         'pose_quality': advanced_result.get('pose_quality', {}),
                         'technical_score': advanced_result.get('technical_score', 0)
                     })
-
-                    frame_feedback = self.generate_frame_feedback(frame_result, i, phase)
-                    frame_recommendations = self.generate_frame_recommendations(frame_result, i, phase)
-
-                    frame_result.update({
-                        'frame_feedback': frame_feedback,
-                        'frame_recommendations': frame_recommendations
-                    })
-
-            # Generate global feedback
-            feedback = self.generate_feedback(calculated_results, merged_user_frames, merged_reference_frames)
+                    phase_frames.setdefault(phase, []).append(frame_result)
 
             # Create analysis summary
             summary = self.create_analysis_summary(advanced_results, calculated_results)
 
+            if self.feedback_mode == FEEDBACK_MODE_LLM:
+                # One LLM request per phase plus the global feedback and recommendations, run concurrently
+                llm_calls = [self.generate_feedback(calculated_results, merged_user_frames, merged_reference_frames)]
+                if "summary" in summary:
+                    llm_calls.append(self._generate_recommendations(
+                        summary["summary"]["average_technical_score"], summary["summary"]["improvement_breakdown"], advanced_results))
+                llm_calls.extend(self.generate_phase_feedback(phase, frames) for phase, frames in phase_frames.items())
+                llm_results = await asyncio.gather(*llm_calls)
+                feedback = llm_results[0]
+                if "summary" in summary:
+                    summary["recommendations"] = llm_results[1]
+            else:
+                # per-frame texts from the templates, a single LLM request for the global feedback and recommendations
+                for phase, frames in phase_frames.items():
+                    self.generate_template_feedback(phase, frames)
+                if "summary" in summary:
+                    feedback, summary["recommendations"] = await self.generate_global_summary(
+                        calculated_results, merged_user_frames, merged_reference_frames, summary, advanced_results)
+                else:
+                    feedback = await self.generate_feedback(calculated_results, merged_user_frames, merged_reference_frames)
+
             # Prepare final results
             results = {
                 "success": True,
@@ -7,6 +7,7 @@ import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from mistral.mistral import MistralRephraser
+from yolov8_basketball.tools.keypoint import frame_keypoints
 
 # Import enhanced modules
 from .visualization_enhancer import VisualizationEnhancer
@@ -499,25 +500,8 @@ class Display:
             pygame.draw.rect(screen, self.colors['dark'], visualization_area, 2)
 
             # Convert keypoints
-            def dict_to_list(keypoints_dict: Dict) -> List[List[float]]:
-                """Convert keypoints dictionary to list format."""
-                keypoint_order = [
-                    'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
-                    'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
-                    'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
-                    'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
-                ]
-                keypoints_list = []
-                for keypoint in keypoint_order:
-                    x_key = f"{keypoint}_x"
-                    y_key = f"{keypoint}_y"
-                    x = keypoints_dict.get(x_key, 0.0)
-                    y = keypoints_dict.get(y_key, 0.0)
-                    keypoints_list.append([x, y])
-                return keypoints_list
-
-            current_keypoints = dict_to_list(user_frame['keypoints_positions'])
-            reference_keypoints = dict_to_list(ref_frame['keypoints_positions'])
+            current_keypoints = frame_keypoints(user_frame)[:, :2].tolist()
+            reference_keypoints = frame_keypoints(ref_frame)[:, :2].tolist()
 
             # Use pre-calculated results if available
             frame_results = calculated_results[frame_idx] if frame_idx < len(calculated_results) else {}
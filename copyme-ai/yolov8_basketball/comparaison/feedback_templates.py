@@ -0,0 +1,109 @@
+from typing import Any, Dict, List, Tuple
+
+try:
+    from .enums import Direction, PriorityLevel
+except ImportError:
+    try:
+        from comparaison.enums import Direction, PriorityLevel
+    except ImportError:
+        from enums import Direction, PriorityLevel
+
+# Per-frame feedback is built from these templates (FEEDBACK_MODE=template) or asked to the LLM (llm).
+# The global feedback always goes through the LLM.
+FEEDBACK_MODE_TEMPLATE = "template"
+FEEDBACK_MODE_LLM = "llm"
+FEEDBACK_MODES = (FEEDBACK_MODE_TEMPLATE, FEEDBACK_MODE_LLM)
+
+GOOD_FORM_FEEDBACK = "Good form for this phase."
+GOOD_FORM_RECOMMENDATIONS = ["Maintain your current form for this phase"]
+MAX_RECOMMENDATIONS = 3
+LOW_TECHNICAL_SCORE = 70
+
+# (angle, direction of the correction) -> what the player should do
+ACTIONS: Dict[Tuple[str, Direction], str] = {
+    ("elbow", Direction.INCREASE): "open your elbow angle",
+    ("elbow", Direction.DECREASE): "bend your elbow more",
+    ("knee", Direction.INCREASE): "straighten your knees a little",
+    ("knee", Direction.DECREASE): "bend your knees more",
+    ("hip", Direction.INCREASE): "extend your hips",
+    ("hip", Direction.DECREASE): "flex more at the hips",
+    ("wrist", Direction.INCREASE): "extend your wrist",
+    ("wrist", Direction.DECREASE): "snap your wrist further",
+    ("ankle", Direction.INCREASE): "extend your ankles",
+    ("ankle", Direction.DECREASE): "flex your ankles more",
+}
+
+# why the correction helps, per angle
+REASONS: Dict[str, str] = {
+    "elbow": "to push the ball on a straighter line",
+    "knee": "to get more power from your legs",
+    "hip": "to keep your balance through the shot",
+    "wrist": "to give the ball a cleaner backspin",
+    "ankle": "to stay stable on your base",
+}
+
+PRIORITY_PREFIXES: Dict[PriorityLevel, str] = {
+    PriorityLevel.HIGH: "First, ",
+    PriorityLevel.MEDIUM: "",
+    PriorityLevel.LOW: "If you can, ",
+}
+
+PRIORITY_ORDER = {PriorityLevel.HIGH: 0, PriorityLevel.MEDIUM: 1, PriorityLevel.LOW: 2}
+
+def _field(improvement: Any, name: str, default: Any = None) -> Any:
+    if isinstance(improvement, dict):
+        return improvement.get(name, default)
+    return getattr(improvement, name, default)
+
+def _enum(enum_class, value, default):
+    try:
+        return enum_class(value)
+    except ValueError:
+        return default
+
+def _corrections(improvements: List) -> List[Tuple[str, Direction, PriorityLevel, float]]:
+    """(angle, direction, priority, magnitude) of each distinct correction, most important first."""
+    corrections = {}
+    for improvement in improvements:
+        angle = str(_field(improvement, 'class_name') or "joint").lower()
+        direction = _enum(Direction, _field(improvement, 'direction'), Direction.UNKNOWN)
+        priority = _enum(PriorityLevel, _field(improvement, 'priority'), PriorityLevel.LOW)
+        magnitude = float(_field(improvement, 'magnitude', 0.0) or 0.0)
+        # left and right sides share the angle name, keep the largest gap
+        key = (angle, direction)
+        if key not in corrections or magnitude > corrections[key][3]:
+            corrections[key] = (angle, direction, priority, magnitude)
+    return sorted(corrections.values(), key=lambda c: (PRIORITY_ORDER[c[2]], -c[3]))
+
+def _action(angle: str, direction: Direction) -> str:
+    if (angle, direction) in ACTIONS:
+        return ACTIONS[(angle, direction)]
+    if direction == Direction.UNKNOWN:
+        return f"adjust your {angle} angle"
+    return f"{direction.value} your {angle} angle"
+
+def frame_feedback(improvements: List, phase: str) -> str:
+    """Short feedback for one frame, the template counterpart of the per-frame LLM feedback."""
+    corrections = _corrections(improvements)
+    if not corrections:
+        return GOOD_FORM_FEEDBACK
+    sentences = []
+    for angle, direction, priority, magnitude in corrections:
+        sentence = f"{PRIORITY_PREFIXES[priority]}{_action(angle, direction)} by about {magnitude:.0f}°"
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+    return " ".join(sentences)
+
+def frame_recommendations(improvements: List, phase: str, technical_score: float = 0) -> List[str]:
+    """Up to MAX_RECOMMENDATIONS actionable recommendations for one frame."""
+    corrections = _corrections(improvements)
+    if not corrections:
+        return list(GOOD_FORM_RECOMMENDATIONS)
+    recommendations = []
+    if technical_score < LOW_TECHNICAL_SCORE:
+        recommendations.append(f"Focus on fundamental mechanics during the {phase.replace('_', ' ')}")
+    for angle, direction, _, _ in corrections:
+        action = _action(angle, direction)
+        reason = REASONS.get(angle)
+        recommendation = f"{action[0].upper()}{action[1:]}"
+        recommendations.append(f"{recommendation} {reason}" if reason else recommendation)
+    return recommendations[:MAX_RECOMMENDATIONS]
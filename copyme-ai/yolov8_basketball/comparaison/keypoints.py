@@ -2,6 +2,18 @@ import numpy as np
 from typing import List, Dict, Tuple, Optional
 import cv2
 
+KEYPOINT_LABELS = {
+    0: "Nose", 1: "L eye", 2: "R eye", 3: "L ear", 4: "R ear",
+    5: "L shoulder", 6: "R shoulder",
+    7: "L elbow", 8: "R elbow",
+    9: "L wrist", 10: "R wrist",
+    11: "L hip", 12: "R hip",
+    13: "L knee", 14: "R knee",
+    15: "L ankle", 16: "R ankle"
+}
+KEY_DIFFERENCE_THRESHOLD = 20  # pixels
+DIRECTION_TOLERANCE = 5  # pixels
+
 class KeypointUtils:
     @staticmethod
     def compare_keypoints(current_keypoints: List[List[float]], reference_keypoints: List[List[float]]) -> Dict[str, any]:
@@ -39,15 +51,7 @@ class KeypointUtils:
         valid_points = 0
         total_distance = 0
 
-        keypoint_names = {
-            0: "Nose", 1: "L eye", 2: "R eye", 3: "L ear", 4: "R ear",
-            5: "L shoulder", 6: "R shoulder",
-            7: "L elbow", 8: "R elbow",
-            9: "L wrist", 10: "R wrist",
-            11: "L hip", 12: "R hip",
-            13: "L knee", 14: "R knee",
-            15: "L ankle", 16: "R ankle"
-        }
+        keypoint_names = KEYPOINT_LABELS
 
         for i, (curr, ref) in enumerate(zip(current_keypoints, reference_keypoints)):
             # Check that keypoints are valid
@@ -66,7 +70,7 @@ class KeypointUtils:
                 valid_points += 1
 
                 # Identify significant differences (more than 20 pixels)
-                if distance > 20:
+                if distance > KEY_DIFFERENCE_THRESHOLD:
                     results['key_differences'].append({
                         'keypoint': keypoint_name,
                         'distance': float(distance),
@@ -111,13 +115,13 @@ class KeypointUtils:
         y_diff = reference_pos[1] - current_pos[1]
 
         # Horizontal direction
-        if abs(x_diff) < 5:  # 5 pixel tolerance
+        if abs(x_diff) < DIRECTION_TOLERANCE:
             horizontal = "aligned"
         else:
             horizontal = "right" if x_diff > 0 else "left"
 
         # Vertical direction
-        if abs(y_diff) < 5:  # 5 pixel tolerance
+        if abs(y_diff) < DIRECTION_TOLERANCE:
             vertical = "aligned"
         else:
             vertical = "down" if y_diff > 0 else "up"
@@ -12,6 +12,7 @@ if PARENT not in sys.path:
     sys.path.insert(0, PARENT)
 
 from config.db_models import DatabaseManager
+from yolov8_basketball.tools.keypoint import frame_keypoints
 from display import Display
 from comparaison import Comparaison
 
@@ -94,18 +95,8 @@ class BasketballAnalyzer:
             logger.warning(f"Missing phases: {missing_phases}")
             return []
 
-    def dict_to_list(self, keypoints_dict: Dict) -> List[List[float]]:
-        keypoint_order = [
-            'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
-            'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
-            'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
-            'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
-        ]
-
-        return [
-            [keypoints_dict.get(f"{kp}_x", 0.0), keypoints_dict.get(f"{kp}_y", 0.0)]
-            for kp in keypoint_order
-        ]
+    def frame_to_list(self, frame: Dict) -> List[List[float]]:
+        return frame_keypoints(frame)[:, :2].tolist()
 
     def calculate_advanced_metrics(self, user_frames: List[Dict], reference_frames: List[Dict]) -> List[Dict]:
         if not ADVANCED_METRICS_CONFIG['enable_pose_quality']:
@@ -117,8 +108,8 @@ class BasketballAnalyzer:
 
         for i, (user_frame, ref_frame) in enumerate(zip(user_frames, reference_frames)):
             try:
-                current_keypoints = self.dict_to_list(user_frame['keypoints_positions'])
-                reference_keypoints = self.dict_to_list(ref_frame['keypoints_positions'])
+                current_keypoints = self.frame_to_list(user_frame)
+                reference_keypoints = self.frame_to_list(ref_frame)
 
                 # Calculate advanced pose comparison
                 advanced_result = self.advanced_comparison.compare_poses_advanced(
@@ -231,8 +222,8 @@ class BasketballAnalyzer:
                     user_frame = merged_user_frames[i]
                     ref_frame = merged_reference_frames[i]
 
-                    current_keypoints = self.dict_to_list(user_frame['keypoints_positions'])
-                    reference_keypoints = self.dict_to_list(ref_frame['keypoints_positions'])
+                    current_keypoints = self.frame_to_list(user_frame)
+                    reference_keypoints = self.frame_to_list(ref_frame)
 
                     # Apply Kalman filtering if enabled
                     filtered_current = (comparison_engine.filter_keypoints(current_keypoints)
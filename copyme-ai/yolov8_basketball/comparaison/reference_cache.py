@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+import numpy as np
+from yolov8_basketball.tools.keypoint import frame_keypoints
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFERENCE_TTL = 300.0
+ANGLE_TOLERANCE = 5.0
+
+def reference_angle_targets(frame: Dict) -> Optional[Dict[str, Dict[str, float]]]:
+    """Angle targets of a reference frame in the format expected by AngleUtils.compare_angles."""
+    if 'angles' not in frame:
+        return None
+    return {
+        str(angle.get('angle_name', ['unknown', 0])[0]): {
+            "ref": angle.get('angle', 0), "tolerance": ANGLE_TOLERANCE
+        } for angle in frame['angles']
+    }
+
+@dataclass
+class ReferenceSequence:
+    """The reference phase sequence, extracted and vectorised once."""
+    document_id: str
+    frames: List[Dict]
+    keypoints: np.ndarray  # (T, 17, 2) float32
+    angle_targets: List[Optional[Dict[str, Dict[str, float]]]]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_frames(cls, document_id: str, frames: List[Dict]) -> "ReferenceSequence":
+        keypoints = np.stack([frame_keypoints(frame)[:, :2] for frame in frames]) if frames else np.zeros((0, 17, 2), dtype=np.float32)
+        return cls(
+            document_id=document_id,
+            frames=frames,
+            keypoints=keypoints,
+            angle_targets=[reference_angle_targets(frame) for frame in frames],
+        )
+
+class ReferenceCache:
+    """
+    In-process cache of the reference sequence used by every analysis.
+
+    The entry expires after `ttl` seconds and is dropped by `invalidate()`, which
+    DatabaseManager calls when a new `is_reference` document is inserted. With
+    several worker processes, an insert in one worker reaches the others through the TTL.
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[Optional[ReferenceSequence]]], ttl: float = DEFAULT_REFERENCE_TTL):
+        self.loader = loader
+        self.ttl = ttl
+        self._entry: Optional[ReferenceSequence] = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self) -> bool:
+        return self._entry is not None and time.monotonic() - self._entry.loaded_at < self.ttl
+
+    async def get(self) -> Optional[ReferenceSequence]:
+        if self._fresh():
+            self.hits += 1
+            return self._entry
+        # one load at a time, concurrent analyses wait for it instead of querying MongoDB too
+        async with self._lock:
+            if self._fresh():
+                self.hits += 1
+                return self._entry
+            self.misses += 1
+            self._entry = await self.loader()
+            if self._entry is not None:
+                logger.info(f"Reference {self._entry.document_id} cached ({len(self._entry.frames)} frames)")
+            return self._entry
+
+    def invalidate(self):
+        if self._entry is not None:
+            logger.info(f"Reference {self._entry.document_id} invalidated")
+        self._entry = None
@@ -0,0 +1,177 @@
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .keypoints import DIRECTION_TOLERANCE, KEY_DIFFERENCE_THRESHOLD, KEYPOINT_LABELS
+    from .models import Improvement
+    from .enums import Direction, PriorityLevel
+except ImportError:
+    try:
+        from comparaison.keypoints import DIRECTION_TOLERANCE, KEY_DIFFERENCE_THRESHOLD, KEYPOINT_LABELS
+        from comparaison.models import Improvement
+        from comparaison.enums import Direction, PriorityLevel
+    except ImportError:
+        from keypoints import DIRECTION_TOLERANCE, KEY_DIFFERENCE_THRESHOLD, KEYPOINT_LABELS
+        from models import Improvement
+        from enums import Direction, PriorityLevel
+
+HIGH_PRIORITY_DIFFERENCE = 15
+MEDIUM_PRIORITY_DIFFERENCE = 7
+PRIORITY_ORDER = {PriorityLevel.HIGH: 0, PriorityLevel.MEDIUM: 1, PriorityLevel.LOW: 2}
+
+class SequenceComparison:
+    """
+    Whole-sequence counterparts of KeypointUtils.compare_keypoints and AngleUtils.compare_angles.
+
+    Keypoints come as (T, 17, 2) arrays and every distance, score and direction
+    is computed for all the frames at once; the per-frame results keep the exact
+    structure of the per-frame functions.
+    """
+
+    @staticmethod
+    def valid_mask(current: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        """(T, K) mask of the points detected (x > 0 and y > 0) in both poses."""
+        return np.all(current > 0, axis=-1) & np.all(reference > 0, axis=-1)
+
+    @staticmethod
+    def pose_similarity(current: np.ndarray, reference: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """Correlation of the valid x, y coordinates of each frame, mapped to 0-100 (0 for fewer than 2 points)."""
+        mask = np.repeat(valid[..., None], 2, axis=-1)
+        counts = mask.sum(axis=(1, 2))
+        safe_counts = np.maximum(counts, 1)
+        current_mean = np.where(mask, current, 0.0).sum(axis=(1, 2)) / safe_counts
+        reference_mean = np.where(mask, reference, 0.0).sum(axis=(1, 2)) / safe_counts
+        current_centered = np.where(mask, current - current_mean[:, None, None], 0.0)
+        reference_centered = np.where(mask, reference - reference_mean[:, None, None], 0.0)
+        current_std = np.sqrt((current_centered ** 2).sum(axis=(1, 2)) / safe_counts)
+        reference_std = np.sqrt((reference_centered ** 2).sum(axis=(1, 2)) / safe_counts)
+        defined = (counts >= 4) & (current_std > 0) & (reference_std > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = (current_centered * reference_centered).sum(axis=(1, 2)) / (safe_counts * current_std * reference_std)
+        similarity = np.clip((correlation + 1) * 50, 0, 100)
+        return np.where(defined, similarity, 0.0)
+
+    @staticmethod
+    def compare_keypoints(current_sequence: Any, reference_sequence: Any) -> List[Dict[str, Any]]:
+        """
+        Compare two (T, K, 2) keypoint sequences frame by frame.
+
+        Returns one dict per frame with 'distances', 'max_deviation',
+        'alignment_score', 'pose_similarity' and 'key_differences', as KeypointUtils.compare_keypoints.
+        """
+        # NaN/inf keypoints count as undetected (0), so the metrics sent to the API are finite
+        current = np.nan_to_num(np.asarray(current_sequence, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        reference = np.nan_to_num(np.asarray(reference_sequence, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        frame_count = min(len(current), len(reference))
+        if frame_count == 0:
+            return []
+        point_count = min(current.shape[1], reference.shape[1])
+        current = current[:frame_count, :point_count, :2]
+        reference = reference[:frame_count, :point_count, :2]
+
+        valid = SequenceComparison.valid_mask(current, reference)
+        offsets = reference - current
+        distances = np.sqrt((current[..., 0] - reference[..., 0]) ** 2 + (current[..., 1] - reference[..., 1]) ** 2)
+        masked_distances = np.where(valid, distances, 0.0)
+        max_ids = masked_distances.argmax(axis=1) if point_count else np.zeros(frame_count, dtype=np.int64)
+        similarities = SequenceComparison.pose_similarity(current, reference, valid)
+        horizontal = np.where(np.abs(offsets[..., 0]) < DIRECTION_TOLERANCE, "aligned",
+                              np.where(offsets[..., 0] > 0, "right", "left"))
+        vertical = np.where(np.abs(offsets[..., 1]) < DIRECTION_TOLERANCE, "aligned",
+                            np.where(offsets[..., 1] > 0, "down", "up"))
+        significant = valid & (distances > KEY_DIFFERENCE_THRESHOLD)
+
+        # the metrics are computed above for the whole sequence, only the result dicts are built per frame
+        labels = [KEYPOINT_LABELS.get(i, f"Keypoint {i}") for i in range(point_count)]
+        valid_points, significant_points = valid.tolist(), significant.tolist()
+        distance_rows, max_distances = distances.tolist(), masked_distances.max(axis=1, initial=0.0).tolist()
+        current_rows, reference_rows = current.tolist(), reference.tolist()
+        horizontal_rows, vertical_rows = horizontal.tolist(), vertical.tolist()
+        max_ids, similarities = max_ids.tolist(), similarities.tolist()
+
+        results = []
+        for t in range(frame_count):
+            point_ids = [i for i, is_valid in enumerate(valid_points[t]) if is_valid]
+            frame_distances = [distance_rows[t][i] for i in point_ids]
+            result = {
+                'distances': {labels[i]: d for i, d in zip(point_ids, frame_distances)},
+                'max_deviation': None,
+                'alignment_score': 0,
+                'pose_similarity': 0,
+                'key_differences': [
+                    {
+                        'keypoint': labels[i],
+                        'distance': distance_rows[t][i],
+                        'current_pos': current_rows[t][i],
+                        'reference_pos': reference_rows[t][i],
+                        'direction': {"horizontal": horizontal_rows[t][i], "vertical": vertical_rows[t][i]},
+                    }
+                    for i in point_ids if significant_points[t][i]
+                ],
+            }
+            if max_distances[t] > 0:
+                result['max_deviation'] = {'keypoint': labels[max_ids[t]], 'distance': max_distances[t]}
+            if point_ids:
+                avg_distance = sum(frame_distances) / len(frame_distances)
+                result['alignment_score'] = max(0, min(100, 100 - (avg_distance * 2)))
+                result['pose_similarity'] = similarities[t]
+            results.append(result)
+        return results
+
+    @staticmethod
+    def angle_entries(angles: Any) -> Iterator[Tuple[int, str, float]]:
+        """(index, name, value) of the angles of a frame, in the list or dict forms AngleUtils.compare_angles accepts."""
+        if isinstance(angles, list):
+            for idx, angle_data in enumerate(angles):
+                if not isinstance(angle_data, dict) or 'angle_name' not in angle_data or 'angle' not in angle_data:
+                    continue
+                angle_name = angle_data['angle_name'][0] if isinstance(angle_data['angle_name'], list) else angle_data['angle_name']
+                yield idx, angle_name, angle_data['angle']
+        elif isinstance(angles, dict):
+            for idx, (angle_name, value) in enumerate(angles.items()):
+                yield idx, angle_name, value
+
+    @staticmethod
+    def compare_angles(current_angles_sequence: List[Any],
+                       reference_targets: List[Optional[Dict[str, Dict[str, float]]]]) -> List[List[Improvement]]:
+        """
+        AngleUtils.compare_angles over a sequence: the gaps to the reference angles
+        of every frame are computed in one pass. Each entry is a list of angle dicts or
+        a {name: value} dict, as AngleUtils accepts; any other value gives no improvements.
+        """
+        frame_ids, angle_ids, names, values, targets, tolerances = [], [], [], [], [], []
+        for t, (angles, reference_angles) in enumerate(zip(current_angles_sequence, reference_targets)):
+            if not reference_angles:
+                continue
+            for idx, angle_name, value in SequenceComparison.angle_entries(angles):
+                if angle_name not in reference_angles:
+                    continue
+                frame_ids.append(t)
+                angle_ids.append(idx)
+                names.append(angle_name)
+                values.append(value)
+                targets.append(reference_angles[angle_name]["ref"])
+                tolerances.append(reference_angles[angle_name]["tolerance"])
+
+        improvements: List[List[Improvement]] = [[] for _ in range(len(current_angles_sequence))]
+        if not values:
+            return improvements
+
+        diffs = np.asarray(values, dtype=np.float64) - np.asarray(targets, dtype=np.float64)
+        abs_diffs = np.abs(diffs)
+        for k in np.flatnonzero(abs_diffs > np.asarray(tolerances, dtype=np.float64)).tolist():
+            abs_diff = float(abs_diffs[k])
+            priority = PriorityLevel.HIGH if abs_diff > HIGH_PRIORITY_DIFFERENCE else \
+                      (PriorityLevel.MEDIUM if abs_diff > MEDIUM_PRIORITY_DIFFERENCE else PriorityLevel.LOW)
+            improvements[frame_ids[k]].append(Improvement(
+                angle_index=angle_ids[k],
+                target_angle=targets[k],
+                direction=Direction.DECREASE if diffs[k] > 0 else Direction.INCREASE,
+                magnitude=abs_diff,
+                priority=priority,
+                class_name=names[k]
+            ))
+        # same order as AngleUtils.compare_angles: by priority, then by angle index
+        for frame_improvements in improvements:
+            frame_improvements.sort(key=lambda improvement: PRIORITY_ORDER[improvement.priority])
+        return improvements
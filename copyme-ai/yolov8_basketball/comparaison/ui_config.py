@@ -34,6 +34,7 @@ COMPARISON_CONFIG = {
     'kalman_filtering': False,
     'enable_angle_comparison': True,
     'enable_keypoint_comparison': True,
+    'reference_cache_ttl': 300,         # Seconds before the cached reference sequence is reloaded
 
     # Body part weights for comparison
     'body_part_weights': {
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import os
+from typing import List
+
+BACKEND_TORCH = 'torch'
+BACKEND_ONNX = 'onnx'
+BACKEND_OPENVINO = 'openvino'
+BACKEND_ONNX_INT8 = 'onnx-int8'
+BACKENDS = (BACKEND_TORCH, BACKEND_ONNX, BACKEND_OPENVINO, BACKEND_ONNX_INT8)
+DEFAULT_BACKEND = BACKEND_TORCH
+DEFAULT_IMGSZ = 640
+
+def exported_path(model_path: str, backend: str) -> str:
+    """Return where the artifact of `model_path` for `backend` is cached, next to the weights."""
+    stem, _ = os.path.splitext(model_path)
+    if backend == BACKEND_ONNX:
+        return f"{stem}.onnx"
+    if backend == BACKEND_OPENVINO:
+        return f"{stem}_openvino_model"
+    if backend == BACKEND_ONNX_INT8:
+        return f"{stem}.int8.onnx"
+    return model_path
+
+def quantize_model(onnx_path: str, target: str):
+    """Write an INT8 dynamic-quantised copy of an ONNX model, keeping the Ultralytics metadata."""
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    # uint8 weights are required by the ConvInteger kernels of ONNX Runtime on CPU
+    quantize_dynamic(onnx_path, target, weight_type=QuantType.QUInt8)
+    float_model = onnx.load(onnx_path)
+    quantized_model = onnx.load(target)
+    del quantized_model.metadata_props[:]
+    quantized_model.metadata_props.extend(float_model.metadata_props)
+    onnx.save(quantized_model, target)
+
+def export_model(model_path: str, backend: str, imgsz: int = DEFAULT_IMGSZ, force: bool = False) -> str:
+    """Export `model_path` once for `backend` and return the cached artifact path."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    target = exported_path(model_path, backend)
+    if backend == BACKEND_TORCH:
+        return target
+    if os.path.exists(target) and not force:
+        logging.info(f"Using cached {backend} export: {target}")
+        return target
+
+    if backend == BACKEND_ONNX_INT8:
+        onnx_path = export_model(model_path, BACKEND_ONNX, imgsz=imgsz, force=force)
+        logging.info(f"Quantising {onnx_path} to INT8...")
+        quantize_model(onnx_path, target)
+        logging.info(f"Quantised {model_path} to {target}")
+        return target
+
+    from ultralytics import YOLO
+
+    logging.info(f"Exporting {model_path} to {backend}...")
+    # dynamic axes keep batched inference available on the exported model
+    YOLO(model_path).export(format=backend, imgsz=imgsz, dynamic=True)
+    logging.info(f"Exported {model_path} to {target}")
+    return target
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Export YOLO weights to a faster CPU runtime, cached next to the weights.')
+    parser.add_argument('models', nargs='*', default=['model/v1.1.3.pt', 'model/yolo11l-pose.pt'], help='paths to the .pt weights')
+    parser.add_argument('-b', '--backend', type=str, default=BACKEND_ONNX, choices=[BACKEND_ONNX, BACKEND_OPENVINO, BACKEND_ONNX_INT8], help='target runtime')
+    parser.add_argument('--imgsz', type=int, default=DEFAULT_IMGSZ, help='input image size of the exported model')
+    parser.add_argument('-f', '--force', action='store_true', help='export again even if a cached artifact exists')
+    args = parser.parse_args(argv)
+
+    for model_path in args.models:
+        export_model(model_path, args.backend, imgsz=args.imgsz, force=args.force)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
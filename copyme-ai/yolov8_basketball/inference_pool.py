@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 4
+
+class PoolFullError(Exception):
+    '''
+        thrown when every worker is busy and the waiting queue is full
+    '''
+
+class InferencePool:
+    """
+    Bounded executor that runs blocking inference off the asyncio event loop.
+
+    At most `workers` jobs run at once and `queue_size` more wait for a slot;
+    beyond that `run` raises PoolFullError right away instead of piling work up.
+    Threads are used so that the models loaded in the process stay shared
+    (torch and ONNX Runtime release the GIL during inference).
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.submit(fn, *args, **kwargs)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> asyncio.Future:
+        """Start `fn` in the pool and return an awaitable future, raising PoolFullError right away when full."""
+        if not self._slots.acquire(blocking=False):
+            raise PoolFullError(f"Inference pool full ({self.workers} running, {self.queue_size} queued)")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        # the slot is freed when the job really ends, even if the awaiting request was cancelled
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "queue_size": self.queue_size, "in_flight": self.in_flight}
+
+    def shutdown(self):
+        logging.info("Shutting down the inference pool...")
+        self.executor.shutdown(wait=False, cancel_futures=True)
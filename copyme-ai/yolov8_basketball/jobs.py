@@ -0,0 +1,272 @@
+import asyncio
+from datetime import datetime, timedelta
+from enum import Enum
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+from .inference_pool import PoolFullError
+from .session import DetectionSession
+
+DEFAULT_JOBS_DIR = 'jobs'
+DEFAULT_JOB_QUEUE_SIZE = 32
+POOL_RETRY_INTERVAL = 1.0
+PROGRESS_INTERVAL = 1.0
+DEFAULT_JOB_RETENTION = 24 * 3600
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class JobQueueFullError(Exception):
+    '''
+        thrown when the job queue cannot take another upload
+    '''
+
+def process_owner() -> str:
+    """Identify the process running a job, JOBS_DIR is shared by every worker of the host."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process that owns a job still runs; owners on another host are assumed alive."""
+    host, _, pid = (owner or '').rpartition(':')
+    if not pid.isdigit():
+        return False
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class JobStore:
+    """Job records and results persisted as JSON files in a local directory."""
+
+    def __init__(self, directory: str = DEFAULT_JOBS_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str, suffix: str = 'json') -> str:
+        return os.path.join(self.directory, f"{job_id}.{suffix}")
+
+    def _write(self, path: str, data: Dict):
+        # write then rename, a reader never sees a half written file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _read(self, path: str) -> Optional[Dict]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # purged by another worker in the meantime
+            return None
+
+    def create(self, owner: Optional[str] = None) -> Dict:
+        now = datetime.utcnow().isoformat()
+        record = {
+            "job_id": uuid.uuid4().hex,
+            "owner": owner,
+            "status": JobStatus.QUEUED.value,
+            "created_at": now,
+            "updated_at": now,
+            "frames_processed": 0,
+            "frames_total": 0,
+            "sampling_stats": {},
+            "error": None,
+        }
+        with self._lock:
+            self._write(self._path(record["job_id"]), record)
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        return self._read(self._path(job_id))
+
+    def update(self, job_id: str, **fields) -> Dict:
+        with self._lock:
+            record = self._read(self._path(job_id)) or {"job_id": job_id}
+            record.update(fields, updated_at=datetime.utcnow().isoformat())
+            self._write(self._path(job_id), record)
+        return record
+
+    def save_result(self, job_id: str, result: Dict):
+        self._write(self._path(job_id, 'result.json'), result)
+
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        return self._read(self._path(job_id, 'result.json'))
+
+    def records(self) -> List[Dict]:
+        records = []
+        for name in os.listdir(self.directory):
+            job_id = name[:-len('.json')] if name.endswith('.json') else ''
+            record = self.get(job_id) if JOB_ID_PATTERN.match(job_id) else None
+            if record:
+                records.append(record)
+        return records
+
+    def unfinished(self) -> List[Dict]:
+        return [record for record in self.records() if record.get("status") in (JobStatus.QUEUED.value, JobStatus.RUNNING.value)]
+
+    def delete(self, job_id: str):
+        for path in (self._path(job_id), self._path(job_id, 'result.json')):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def purge(self, max_age: float) -> int:
+        """Delete the finished jobs last updated more than `max_age` seconds ago, with their results."""
+        cutoff = (datetime.utcnow() - timedelta(seconds=max_age)).isoformat()
+        purged = 0
+        for record in self.records():
+            if record.get("status") not in (JobStatus.DONE.value, JobStatus.FAILED.value):
+                continue
+            if record.get("updated_at", "") < cutoff:
+                self.delete(record["job_id"])
+                purged += 1
+        return purged
+
+class JobRunner:
+    """
+    Run submitted analysis jobs in the background, `workers` at a time.
+
+    Jobs wait in a bounded asyncio queue; their state is kept in a JobStore and
+    the progress of a running job is read live from its DetectionSession. The
+    store is shared by the gunicorn workers: each record names the process that
+    owns it, and running jobs write their progress there for the other workers.
+    Results weigh several MB for a long clip, so every store access runs in a
+    thread, off the event loop.
+    """
+
+    def __init__(self, store: JobStore, workers: int = 1, queue_size: int = DEFAULT_JOB_QUEUE_SIZE,
+                 retention: float = DEFAULT_JOB_RETENTION):
+        self.store = store
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.retention = retention
+        self.owner = process_owner()
+        self.sessions: Dict[str, DetectionSession] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        await asyncio.to_thread(self._fail_orphans)
+        await self.purge()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _fail_orphans(self):
+        # jobs of a process that is gone will never complete, the other workers' jobs are left alone
+        for record in self.store.unfinished():
+            if not owner_alive(record.get("owner")):
+                self.store.update(record["job_id"], status=JobStatus.FAILED.value, error="Interrupted by a restart")
+
+    async def purge(self):
+        if self.retention <= 0:
+            return
+        purged = await asyncio.to_thread(self.store.purge, self.retention)
+        if purged:
+            logging.info(f"Purged {purged} finished jobs.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def full(self) -> bool:
+        return self.queue.full()
+
+    async def submit(self, job: Callable[[], Awaitable[Dict]], session: DetectionSession = None) -> str:
+        if self.full():
+            raise JobQueueFullError(f"Job queue full ({self.queue.maxsize} jobs waiting)")
+        job_id = (await asyncio.to_thread(self.store.create, self.owner))["job_id"]
+        try:
+            self.queue.put_nowait((job_id, job))
+        except asyncio.QueueFull:
+            # filled by another request while the record was written
+            await asyncio.to_thread(self.store.delete, job_id)
+            raise JobQueueFullError(f"Job queue full ({self.queue.maxsize} jobs waiting)")
+        if session is not None:
+            self.sessions[job_id] = session
+        return job_id
+
+    def progress(self, job_id: str) -> Dict:
+        session = self.sessions.get(job_id)
+        if session is None:
+            return {}
+        processed = session.frame_count
+        if session.frames_total:
+            processed = min(processed, session.frames_total)
+        # frames the sampler sent to the pose model or skipped so far
+        return {"frames_processed": processed, "frames_total": session.frames_total, "sampling_stats": session.sampler.stats()}
+
+    async def status(self, job_id: str) -> Optional[Dict]:
+        # jobs of another worker report the progress last written to the store
+        record = await asyncio.to_thread(self.store.get, job_id)
+        if record is not None and record["status"] == JobStatus.RUNNING.value:
+            record.update(self.progress(job_id))
+        return record
+
+    async def result(self, job_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self.store.get_result, job_id)
+
+    async def _update(self, job_id: str, **fields):
+        await asyncio.to_thread(self.store.update, job_id, **fields)
+
+    async def _report_progress(self, job_id: str):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            progress = self.progress(job_id)
+            if progress:
+                await self._update(job_id, **progress)
+
+    async def _run(self, job: Callable[[], Awaitable[Dict]]) -> Dict:
+        # the inference pool is shared with synchronous requests, wait for a free slot
+        while True:
+            try:
+                return await job()
+            except PoolFullError:
+                await asyncio.sleep(POOL_RETRY_INTERVAL)
+
+    async def _worker(self):
+        while True:
+            job_id, job = await self.queue.get()
+            await self._update(job_id, status=JobStatus.RUNNING.value)
+            reporter = asyncio.create_task(self._report_progress(job_id))
+            try:
+                try:
+                    result = await self._run(job)
+                finally:
+                    # stopped before the final update so it cannot overwrite it
+                    reporter.cancel()
+                    await asyncio.gather(reporter, return_exceptions=True)
+                await asyncio.to_thread(self.store.save_result, job_id, result)
+                progress = self.progress(job_id)
+                await self._update(job_id, status=JobStatus.DONE.value,
+                                   frames_processed=progress.get("frames_total", 0), frames_total=progress.get("frames_total", 0),
+                                   sampling_stats=progress.get("sampling_stats", {}))
+                logging.info(f"Job {job_id} done.")
+            except Exception as e:
+                logging.error(f"Job {job_id} failed: {e}")
+                await self._update(job_id, status=JobStatus.FAILED.value, error=str(e), **self.progress(job_id))
+            finally:
+                self.sessions.pop(job_id, None)
+                self.queue.task_done()
+            await self.purge()
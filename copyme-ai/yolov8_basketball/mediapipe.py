@@ -1,3 +1,4 @@
+import threading
 import mediapipe as mp
 import cv2
 
@@ -5,9 +6,12 @@ class MediaPipe:
     def __init__(self):
         self.mp_pose = mp.solutions.pose
         self.pose = self.mp_pose.Pose(static_image_mode=True, min_detection_confidence=0.5)
+        # the graph is shared by concurrent runs and does not support parallel calls
+        self.lock = threading.Lock()
 
     def get_keypoints(self, image):
-        results = self.pose.process(image)
+        with self.lock:
+            results = self.pose.process(image)
         if not hasattr(results, 'pose_landmarks') or results.pose_landmarks is None:
             return None
 
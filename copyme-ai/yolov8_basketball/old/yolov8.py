@@ -7,6 +7,7 @@ import cv2
 import os
 from ultralytics import YOLO
 from sys import platform
+from ..registry import registry
 from ..tools.utils import (
     load_labels,
     check_fileType,
@@ -107,6 +108,9 @@ class YOLOv8:
         self.sync = False
         self.model = None  # Initialize model
         self.keypoint_model = None
+        # shared registry entries, their lock serialises the inferences on the same model
+        self.model_entry = None
+        self.keypoint_model_entry = None
         DEBUG.enable(enabled=mode == 'debug')
 
         self.verbose = verbose
@@ -223,25 +227,32 @@ class YOLOv8:
     def load_model(self, model_path=DEFAULT_MODEL_PATH):
         if self.mode == 'debug':
             DEBUG.log(message=f"Loading model: {model_path}")
-        self.model = YOLO(model_path, verbose=self.verbose).to(self.device)
+        self.model_entry = registry.get(model_path, self.device, verbose=self.verbose)
+        self.model = self.model_entry.model
         self.CLASS_NAMES_DICT = self.model.model.names
-        self.model.fuse()
         self.is_model_loaded = self.model is not None
 
     def load_keypoint_model(self, model_path=DEFAULT_KEYPOINT_MODEL_PATH):
-        self.keypoint_model = YOLO(model_path, self.verbose).to(self.device)
-        self.keypoint_model.fuse()
+        self.keypoint_model_entry = registry.get(model_path, self.device, verbose=self.verbose)
+        self.keypoint_model = self.keypoint_model_entry.model
         self.is_keypoint_model_loaded = self.keypoint_model is not None
 
+    @staticmethod
+    def _locked_infer(model_entry, frame):
+        # the models are shared with YOLOBase through the registry, same locking as YOLOBase._infer
+        model_entry.ensure_warm()
+        with model_entry.lock:
+            return model_entry.model(frame)
+
     # function that infer given image of video or camera and return the results
     def infer(self, frame, mode=['pose', 'object']):
         results = []
         if 'object' in mode:
             assert self.is_model_loaded, "Model not loaded"
-            results = self.model(frame)
+            results = self._locked_infer(self.model_entry, frame)
         if 'pose' in mode:
             assert self.is_keypoint_model_loaded, "Keypoint model not loaded"
-            results = self.keypoint_model(frame)
+            results = self._locked_infer(self.keypoint_model_entry, frame)
         return results
 
 
@@ -1,6 +1,9 @@
-from collections import deque
+import heapq
+from queue import Empty, Full, Queue
+import threading
 import csv
-from typing import Any, Dict, Tuple, List
+from typing import Any, Dict, Optional, Tuple, List
+import time
 import uuid
 import cv2
 import numpy as np
@@ -11,7 +14,12 @@ from filterpy.kalman import KalmanFilter
 import hashlib
 from config.db_models import FrameData
 from .yolobase import YOLOBase
+from .registry import WARMUP_FRAME_SHAPE
 from .pose_estimation import PoseEstimation
+from .tools.preprocess import Preprocessor
+from .tools.sampling import UNKNOWN_PHASE, FrameSampler
+from .tools.streaming import GrowingFileCapture, UploadAbortedError
+from .session import DetectionSession
 import supervision as sv
 
 WINDOW_NAME = 'ShootAnalysis'
@@ -20,6 +28,15 @@ DEFAULT_CAPTURE_INDEX = "0"
 DEFAULT_MODEL_PATH = 'model/yolov8m.pt'
 DEFAULT_KEYPOINT_MODEL_PATH = 'model/yolo11l-pose.pt'
 CONFIDENCE_THRESHOLD = 0.35
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_QUEUE_SIZE = 8
+QUEUE_POLL_INTERVAL = 0.1
+END_OF_STREAM = None
+ROI_MARGIN_RATIO = 0.3
+FRAME_STORAGE_MEMORY = 'memory'
+FRAME_STORAGE_DISK = 'disk'
+FRAME_STORAGE_TOP_K = 'top_k'
+DEFAULT_TOP_K = 5
 
 class PhaseDetection(YOLOBase):
     def __init__(self, input: str = DEFAULT_CAPTURE_INDEX,
@@ -31,9 +48,20 @@ class PhaseDetection(YOLOBase):
                  temporal_smoothing: bool = True,
                  conf_threshold: float = CONFIDENCE_THRESHOLD,
                  keypoint_model_path: str = DEFAULT_KEYPOINT_MODEL_PATH,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 pipelined: bool = False,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 pose_roi: bool = False,
+                 roi_margin: float = ROI_MARGIN_RATIO,
+                 frame_stride: int = 1,
+                 motion_threshold: Optional[float] = None,
+                 dense_window: Optional[int] = None,
+                 frame_storage: str = FRAME_STORAGE_MEMORY,
+                 top_k: int = DEFAULT_TOP_K,
+                 backend: str = None,
                  verbose: bool = False):
-        super().__init__(model_path=model_path, verbose=verbose)
-        self.keypoint_model = PoseEstimation(model_path=keypoint_model_path, verbose=verbose)
+        super().__init__(model_path=model_path, verbose=verbose, backend=backend)
+        self.keypoint_model = PoseEstimation(model_path=keypoint_model_path, verbose=verbose, backend=backend)
         self.save_dir = save_dir
         self.metadata = metadata
         self.kalman_filter_enabled = kalman_filter
@@ -41,16 +69,23 @@ class PhaseDetection(YOLOBase):
         self.conf_threshold = conf_threshold
         self.input = input
         self.display = display
-        self.frame_count = 0
+        self.batch_size = max(1, int(batch_size))
+        self.pipelined = pipelined
+        self.queue_size = max(1, int(queue_size))
+        self.pose_roi = pose_roi
+        self.roi_margin = roi_margin
+        self.frame_stride = frame_stride
+        self.motion_threshold = motion_threshold
+        self.dense_window = dense_window
+        if frame_storage not in (FRAME_STORAGE_MEMORY, FRAME_STORAGE_DISK, FRAME_STORAGE_TOP_K):
+            raise ValueError(f"Unknown frame storage '{frame_storage}'")
+        self.frame_storage = frame_storage
+        self.top_k = max(1, int(top_k))
         self.saved_frames_data = {}
         self.sync = False
         self.saved_classes = set()
-        self.history = deque(maxlen=5)
         self.phases = load_phases('config/shoot.csv')
-        self.kalman_filter = self._initialize_kalman_filter()
-        self.last_frame_hash = None
-        self.best_frames = []
-        self.all_frames = []
+        self.warmup_timings: Dict[str, List[float]] = {}
         self._setup_workdir()
 
     # -------------------- Initialization Helpers --------------------
@@ -64,6 +99,32 @@ class PhaseDetection(YOLOBase):
         kf.Q = 0.1
         return kf
 
+    def warmup(self, iterations: int = 1) -> Dict[str, List[float]]:
+        """Run dummy frames through the phase model, the pose model and MediaPipe to pay their lazy initialisation up front."""
+        frame = np.zeros(WARMUP_FRAME_SHAPE, dtype=np.uint8)
+        timings: Dict[str, List[float]] = {"phase_model": [], "pose_model": [], "mediapipe": []}
+        for _ in range(iterations):
+            start = time.perf_counter()
+            self._infer(frame)
+            timings["phase_model"].append(time.perf_counter() - start)
+            for name, elapsed in self.keypoint_model.warmup(frame).items():
+                timings[name].append(elapsed)
+        self.warmup_timings = timings
+        logging.info("Warm-up timings: " + ", ".join(
+            f"{name}={', '.join(f'{t:.3f}s' for t in values)}" for name, values in timings.items()))
+        return timings
+
+    def _create_sampler(self) -> FrameSampler:
+        return FrameSampler(stride=self.frame_stride, motion_threshold=self.motion_threshold, dense_window=self.dense_window)
+
+    def new_session(self, filename: str = None) -> DetectionSession:
+        """Create the per-run state of an analysis of `filename` (the configured input by default)."""
+        return DetectionSession(
+            input=filename if filename else self.input,
+            sampler=self._create_sampler(),
+            kalman_filter=self._initialize_kalman_filter(),
+        )
+
     def _setup_workdir(self):
         if self.verbose:
           logging.debug(f"Setting up workdir: {self.save_dir}")
@@ -84,15 +145,15 @@ class PhaseDetection(YOLOBase):
     def _calculate_frame_hash(self, frame: Any) -> str:
         return hashlib.md5(frame.tobytes()).hexdigest()
 
-    def _save_best_frame(self, frame: Any, result_frame: Dict, current_phase: str, confidence: float, timestamp: float):
+    def _save_best_frame(self, session: DetectionSession, frame: Any, result_frame: Dict, current_phase: str, confidence: float, timestamp: float):
         """Update the best frame for a phase if it has the highest confidence."""
         found = False
-        for bf in self.best_frames:
+        for bf in session.best_frames:
             if bf['phase'] == current_phase:
                 found = True
                 if confidence > bf['confidence']:
                     bf.update({
-                        'frame_number': self.frame_count,
+                        'frame_number': session.frame_count,
                         'timestamp': timestamp,
                         'frame': frame,
                         'results': result_frame,
@@ -101,8 +162,8 @@ class PhaseDetection(YOLOBase):
                     })
                 break
         if not found:
-            self.best_frames.append({
-                'frame_number': self.frame_count,
+            session.best_frames.append({
+                'frame_number': session.frame_count,
                 'timestamp': timestamp,
                 'frame': frame,
                 'results': result_frame,
@@ -112,37 +173,92 @@ class PhaseDetection(YOLOBase):
         if self.verbose:
             logging.debug(f"Updated best frame for phase '{current_phase}' with confidence {confidence:.2f}")
 
-    def _save_all_best_frames(self) -> List[Dict]:
-        all_frames_metadata = []
-        for res in self.all_frames:
-            class_name = res.get('phase', 'unknown')
-            phase_dir = os.path.join(self.save_dir, class_name)
-            filename_save = f"{class_name}_{uuid.uuid4()}.jpg"
-            frame_path = os.path.join(phase_dir, filename_save)
-            cv2.imwrite(frame_path, res['frame'])
-            if self.verbose:
-              logging.debug(f"Saved frame for class '{class_name}' to {frame_path}")
-            res['results']['url_path_frame'] = frame_path
-            all_frames_metadata.append(res['results'])
-        return all_frames_metadata
-
-    def _apply_temporal_smoothing(self, class_id: int) -> int:
-        self.history.append(class_id)
-        smoothed_class_id = int(sum(self.history) / len(self.history))
+    def _write_frame(self, res: Dict) -> Dict:
+        """Write a frame image to its phase directory and return its results with the saved path."""
+        class_name = res.get('phase', 'unknown')
+        phase_dir = os.path.join(self.save_dir, class_name)
+        filename_save = f"{class_name}_{uuid.uuid4()}.jpg"
+        frame_path = os.path.join(phase_dir, filename_save)
+        cv2.imwrite(frame_path, res['frame'])
+        if self.verbose:
+          logging.debug(f"Saved frame for class '{class_name}' to {frame_path}")
+        res['results']['url_path_frame'] = frame_path
+        return res['results']
+
+    def _store_frame(self, session: DetectionSession, res: Dict):
+        """Keep an analysed frame according to the frame storage mode.
+
+        - memory: hold every frame until the end of the run.
+        - disk: write the image right away and only keep its results.
+        - top_k: keep the top_k most confident frames of each phase in a bounded min-heap.
+        """
+        if self.frame_storage == FRAME_STORAGE_DISK:
+            self._write_frame(res)
+            res.pop('frame')
+            session.all_frames.append(res)
+        elif self.frame_storage == FRAME_STORAGE_TOP_K:
+            heap = session.frame_heaps.setdefault(res['phase'], [])
+            entry = (res['confidence'], next(session.frame_sequence), res)
+            if len(heap) < self.top_k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+        else:
+            session.all_frames.append(res)
+
+    def _save_all_best_frames(self, session: DetectionSession) -> List[Dict]:
+        if self.frame_storage == FRAME_STORAGE_DISK:
+            return [res['results'] for res in session.all_frames]
+        if self.frame_storage == FRAME_STORAGE_TOP_K:
+            kept = sorted((entry for heap in session.frame_heaps.values() for entry in heap), key=lambda entry: entry[1])
+            return [self._write_frame(res) for _, _, res in kept]
+        return [self._write_frame(res) for res in session.all_frames]
+
+    def _apply_temporal_smoothing(self, session: DetectionSession, class_id: int) -> int:
+        session.history.append(class_id)
+        smoothed_class_id = int(sum(session.history) / len(session.history))
         if self.verbose:
           logging.debug(f"Smoothed class ID: {smoothed_class_id}")
         return smoothed_class_id
 
-    def _apply_kalman_filter(self, class_id: int) -> int:
-        self.kalman_filter.predict()
-        self.kalman_filter.update(class_id)
-        smoothed_class_id = int(self.kalman_filter.x[0])
+    def _apply_kalman_filter(self, session: DetectionSession, class_id: int) -> int:
+        session.kalman_filter.predict()
+        session.kalman_filter.update(class_id)
+        smoothed_class_id = int(session.kalman_filter.x[0])
         if self.verbose:
           logging.debug(f"Kalman-filtered class ID: {smoothed_class_id}")
         return smoothed_class_id
 
-    def _is_frame_redundant(self, frame_hash: str) -> bool:
-        return frame_hash == self.last_frame_hash
+    def _is_frame_redundant(self, session: DetectionSession, frame_hash: str) -> bool:
+        return frame_hash == session.last_frame_hash
+
+    def _detect(self, result) -> sv.Detections:
+        return sv.Detections.from_ultralytics(result).with_nms(threshold=self.conf_threshold)
+
+    def _select_pose_roi(self, frame, detections: sv.Detections) -> Optional[Tuple[int, int, int, int]]:
+        """Return the crop around the most confident detection, or None to use the full frame."""
+        if not self.pose_roi or not detections:
+            return None
+        best = int(np.argmax(detections.confidence))
+        x1, y1, x2, y2 = Preprocessor.expand_bbox(frame.shape, detections.xyxy[best], self.roi_margin)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2, y2
+
+    def _get_pose(self, session: DetectionSession, frame, keypoints=None, roi=None) -> Tuple[List, np.ndarray]:
+        """Return the pose of the current frame, shared by every detection of that frame.
+
+        The pose model and MediaPipe only run on a cache miss; `keypoints` holds pose
+        results already computed by a batched forward pass, on the `roi` crop if any.
+        """
+        pose = session.pose_cache.get(session.frame_count)
+        if pose is None:
+            if keypoints is None:
+                keypoints = self.keypoint_model._infer(self.keypoint_model.crop_roi(frame, roi))
+            pose = self.keypoint_model.compute_pose(frame, keypoints, roi)
+            session.pose_cache[session.frame_count] = pose
+            session.pose_inference_count += 1
+        return pose
 
     def _get_highest_confidence_detection(self, detections: sv.Detections) -> Tuple[int, float]:
         """Return the class ID and confidence of the detection with the highest confidence."""
@@ -153,7 +269,7 @@ class PhaseDetection(YOLOBase):
         confidence = float(detections.confidence[max_conf_index])
         return class_id, confidence
 
-    def plot_frame(self, boxes, frame, timestamp: float) -> Any:
+    def plot_frame(self, session: DetectionSession, boxes, frame, timestamp: float, keypoints=None, roi=None) -> Any:
         """Plot the detection boxes on the frame and update the keypoints."""
         if not boxes:
             boxes = [None]
@@ -166,10 +282,10 @@ class PhaseDetection(YOLOBase):
             else:
                 confidence = 0.0
                 current_phase = "unknown"
-            keypoints = self.keypoint_model._infer(frame)
-            frame, _, result_frame = self.keypoint_model.pose_detector(frame, keypoints, current_phase, confidence, self.frame_count)
-            self.all_frames.append({
-                'frame_number': self.frame_count,
+            pose = self._get_pose(session, frame, keypoints, roi)
+            frame, _, result_frame = self.keypoint_model.pose_detector(frame, keypoints, current_phase, confidence, session.frame_count, pose=pose)
+            self._store_frame(session, {
+                'frame_number': session.frame_count,
                 'timestamp': timestamp,
                 'frame': frame,
                 'results': result_frame,
@@ -178,65 +294,241 @@ class PhaseDetection(YOLOBase):
             })
         return frame
 
-    def plot_result(self, results, frame, timestamp: float) -> Any:
-        """Process inference results and update the best frame for each phase."""
+    def plot_result(self, session: DetectionSession, results, frame, timestamp: float, keypoints=None) -> Any:
+        """Process inference results and update the best frame for each phase.
+
+        `keypoints` holds pose results already computed for this frame (batched mode);
+        when omitted the pose model is run on the frame, or on the player crop in ROI mode.
+        """
         for result in results:
-            detections = sv.Detections.from_ultralytics(result).with_nms(threshold=self.conf_threshold)
+            detections = self._detect(result)
+            roi = self._select_pose_roi(frame, detections)
             if detections:
                 class_id, confidence = self._get_highest_confidence_detection(detections)
                 if self.kalman_filter_enabled:
-                    class_id = self._apply_kalman_filter(detections.class_id[0])
+                    class_id = self._apply_kalman_filter(session, detections.class_id[0])
                 if self.temporal_smoothing_enabled:
-                    class_id = self._apply_temporal_smoothing(detections.class_id[0])
+                    class_id = self._apply_temporal_smoothing(session, detections.class_id[0])
                 if confidence <= self.conf_threshold:
                     continue
                 current_phase = self.CLASS_NAMES_DICT[class_id]
-                keypoints = self.keypoint_model._infer(frame)
-                frame, _, result_frame = self.keypoint_model.pose_detector(frame, keypoints, current_phase, confidence, self.frame_count)
-                self._save_best_frame(frame, result_frame, current_phase, confidence, timestamp)
-            self.plot_frame(result.boxes.cpu().numpy(), frame, timestamp)
-        self.frame_count += 1
+                pose = self._get_pose(session, frame, keypoints, roi)
+                frame, _, result_frame = self.keypoint_model.pose_detector(frame, keypoints, current_phase, confidence, session.frame_count, pose=pose)
+                self._save_best_frame(session, frame, result_frame, current_phase, confidence, timestamp)
+            self.plot_frame(session, result.boxes.cpu().numpy(), frame, timestamp, keypoints, roi)
+        session.pose_cache.pop(session.frame_count, None)
+        session.frame_count += 1
         return frame
 
     # -------------------- Capture Methods --------------------
-    def __capture_image(self) -> List[FrameData]:
+    def __capture_image(self, session: DetectionSession) -> List[FrameData]:
         results_database: List[FrameData] = []
-        frame = cv2.imread(self.input)
+        frame = cv2.imread(session.input)
+        session.frames_total = 1
         results = self._infer(frame)
-        self.plot_result(results, frame, timestamp=0)
-        results_database.extend(FrameData.model_validate(metadata) for metadata in self._save_all_best_frames())
+        self.plot_result(session, results, frame, timestamp=0)
+        results_database.extend(FrameData.model_validate(metadata) for metadata in self._save_all_best_frames(session))
         return results_database
 
-    def __capture_video(self) -> List[FrameData]:
-        results_database: List[FrameData] = []
-        cap = cv2.VideoCapture(self.input)
+    def _read_frame(self, session: DetectionSession, cap, frame_index: int) -> Optional[Tuple[int, Any, float, float]]:
+        """Decode the next frame as (frame index, frame, timestamp, motion score), or None at the end."""
+        success, frame = cap.read()
+        if not success:
+            return None
+        if session.upload is not None and not session.frames_total:
+            # the frame count of a streamed upload is only known once it is complete
+            session.frames_total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        return frame_index, frame, timestamp, session.sampler.motion_score(frame)
+
+    def _detected_phase(self, detections: sv.Detections) -> str:
+        if not detections:
+            return UNKNOWN_PHASE
+        class_id, confidence = self._get_highest_confidence_detection(detections)
+        # same gate as the frame selection: low-confidence class flicker is not a phase transition
+        if confidence <= self.conf_threshold:
+            return UNKNOWN_PHASE
+        return self.CLASS_NAMES_DICT[class_id]
+
+    def _infer_frames(self, session: DetectionSession, batch: List[Tuple[int, Any, float, float]]) -> List[Tuple[int, Any, float, Any, Any]]:
+        """Run the phase detector on every frame of a batch, then the pose model on the sampled ones.
+
+        Returns one (frame index, frame, timestamp, phase result, pose result) tuple per
+        sampled frame, in input order. The phase of every frame reaches the sampler before
+        its sampling decision, so a transition forces the pose analysis of the frame where it happens.
+        """
+        results = self._infer_batch([frame for _, frame, _, _ in batch])
+        sampled = []
+        for (frame_index, frame, timestamp, motion), result in zip(batch, results):
+            detections = self._detect(result)
+            session.sampler.observe_phase(self._detected_phase(detections))
+            if session.sampler.should_analyse(frame_index, motion):
+                sampled.append((frame_index, frame, timestamp, result, self._select_pose_roi(frame, detections)))
+        if not sampled:
+            return []
+        keypoints = self.keypoint_model._infer_batch([self.keypoint_model.crop_roi(frame, roi) for _, frame, _, _, roi in sampled])
+        return [(frame_index, frame, timestamp, result, frame_keypoints)
+                for (frame_index, frame, timestamp, result, _), frame_keypoints in zip(sampled, keypoints)]
+
+    def _post_process(self, session: DetectionSession, frame_index: int, frame, timestamp: float, result, keypoints) -> bool:
+        """Compute angles and select frames for one inferred frame.
+
+        Returns True when the user asked to stop the capture from the display window.
+        """
+        session.frame_count = frame_index
+        self.plot_result(session, [result], frame, timestamp, keypoints=[keypoints])
+        if self.display:
+            cv2.imshow(WINDOW_NAME, frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                return True
+        return False
+
+    def _process_batch(self, session: DetectionSession, batch: List[Tuple[int, Any, float, float]]) -> bool:
+        """Infer a batch of frames and post-process each frame in order."""
+        for item in self._infer_frames(session, batch):
+            if self._post_process(session, *item):
+                return True
+        return False
+
+    # -------------------- Pipeline Stages --------------------
+    @staticmethod
+    def _queue_put(queue: Queue, item: Any, stop: threading.Event) -> bool:
+        """Block until the item is queued, giving up once the pipeline is stopped."""
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=QUEUE_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    @staticmethod
+    def _queue_get(queue: Queue, stop: threading.Event) -> Any:
+        """Block until an item is available, returning END_OF_STREAM once the pipeline is stopped."""
+        while not stop.is_set():
+            try:
+                return queue.get(timeout=QUEUE_POLL_INTERVAL)
+            except Empty:
+                continue
+        return END_OF_STREAM
+
+    def _decode_stage(self, session: DetectionSession, cap, frame_queue: Queue, stop: threading.Event):
+        """Decoder stage: read frames from the capture into the bounded frame queue."""
+        frame_index = 0
+        try:
+            while cap.isOpened() and not stop.is_set():
+                item = self._read_frame(session, cap, frame_index)
+                if item is None:
+                    break
+                frame_index += 1
+                if not self._queue_put(frame_queue, item, stop):
+                    break
+        except Exception as e:
+            logging.error(f"Decoder stage failed: {e}")
+            self._queue_put(frame_queue, e, stop)
+        finally:
+            self._queue_put(frame_queue, END_OF_STREAM, stop)
+
+    def _inference_stage(self, session: DetectionSession, frame_queue: Queue, result_queue: Queue, stop: threading.Event):
+        """Inference stage: run the phase detector on batches of frames from the frame queue, the pose model on the sampled ones."""
+        batch: List[Tuple[int, Any, float, float]] = []
+        try:
+            while True:
+                item = self._queue_get(frame_queue, stop)
+                if isinstance(item, Exception):
+                    self._queue_put(result_queue, item, stop)
+                    break
+                if item is not END_OF_STREAM:
+                    batch.append(item)
+                if batch and (item is END_OF_STREAM or len(batch) >= self.batch_size):
+                    for inferred in self._infer_frames(session, batch):
+                        if not self._queue_put(result_queue, inferred, stop):
+                            return
+                    batch = []
+                if item is END_OF_STREAM:
+                    break
+        except Exception as e:
+            logging.error(f"Inference stage failed: {e}")
+            self._queue_put(result_queue, e, stop)
+        finally:
+            self._queue_put(result_queue, END_OF_STREAM, stop)
+
+    def _run_pipeline(self, session: DetectionSession, cap):
+        """Overlap decoding, inference and post-processing through bounded queues.
+
+        Each stage runs in a single thread and the queues are FIFO, so frames are
+        post-processed in decode order exactly as in the sequential loop.
+        """
+        frame_queue: Queue = Queue(maxsize=self.queue_size)
+        result_queue: Queue = Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        stages = [
+            threading.Thread(target=self._decode_stage, args=(session, cap, frame_queue, stop), name="phase-decode", daemon=True),
+            threading.Thread(target=self._inference_stage, args=(session, frame_queue, result_queue, stop), name="phase-inference", daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+        try:
+            while True:
+                item = self._queue_get(result_queue, stop)
+                if item is END_OF_STREAM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if self._post_process(session, *item):
+                    break
+        finally:
+            stop.set()
+            for stage in stages:
+                stage.join()
+
+    def _run_sequential(self, session: DetectionSession, cap):
+        """Decode, infer and post-process batches one after the other in the calling thread."""
+        batch: List[Tuple[int, Any, float, float]] = []
+        frame_index = 0
         while cap.isOpened():
-            success, frame = cap.read()
-            if not success:
-                break
-            results = self._infer(frame)
-            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
-            self.plot_result(results, frame, timestamp)
-            if self.display:
-                cv2.imshow(WINDOW_NAME, frame)
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+            item = self._read_frame(session, cap, frame_index)
+            if item is not None:
+                frame_index += 1
+                batch.append(item)
+            if batch and (item is None or len(batch) >= self.batch_size):
+                stopped = self._process_batch(session, batch)
+                batch = []
+                if stopped:
                     break
+            if item is None:
+                break
+
+    def __capture_video(self, session: DetectionSession) -> List[FrameData]:
+        results_database: List[FrameData] = []
+        cap = GrowingFileCapture(session.upload) if session.upload else cv2.VideoCapture(session.input)
+        session.frames_total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if self.pipelined:
+            self._run_pipeline(session, cap)
+        else:
+            self._run_sequential(session, cap)
         cap.release()
-        cv2.destroyAllWindows()
-        results_database.extend(FrameData.model_validate(metadata) for metadata in self._save_all_best_frames())
+        if self.display:
+            cv2.destroyAllWindows()
+        session.sampling_stats = session.sampler.stats()
+        logging.info(f"Frames analysed: {session.sampling_stats['analysed']}, skipped: {session.sampling_stats['skipped']}")
+        logging.info(f"Pose inferences: {session.pose_inference_count} for {session.sampling_stats['analysed']} analysed frames")
+        results_database.extend(FrameData.model_validate(metadata) for metadata in self._save_all_best_frames(session))
         return results_database
 
-    def run(self, filename: str = None) -> List[FrameData]:
-        self.input = filename if filename else self.input
-        # Réinitialiser les listes à chaque appel pour éviter l'accumulation des frames
-        self.all_frames = []
-        self.best_frames = []
-        self.frame_count = 0
+    def run(self, filename: str = None, session: DetectionSession = None) -> List[FrameData]:
+        """Analyse an image or a video. Each call works on its own session, so runs may happen concurrently."""
+        session = session or self.new_session(filename)
 
-        file_type = check_fileType(self.input)
+        file_type = check_fileType(session.input)
         if file_type == FileType.IMAGE:
-            return self.__capture_image()
+            if session.upload is not None:
+                # an image can only be decoded once it is fully written
+                session.upload.complete.wait()
+                if session.upload.failed:
+                    raise UploadAbortedError(f"Upload of {session.upload.path} failed")
+            return self.__capture_image(session)
         elif file_type == FileType.VIDEO:
-            return self.__capture_video()
+            return self.__capture_video(session)
         else:
-            return self.__capture_video()
+            return self.__capture_video(session)
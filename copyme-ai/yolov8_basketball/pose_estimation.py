@@ -1,11 +1,12 @@
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from config.db_models import Direction
 import logging
+import time
 from .yolobase import YOLOBase
 import numpy as np
 from .mediapipe import MediaPipe
 from .tools.utils import calculate_angle
-from .tools.keypoint import Keypoint
+from .tools.keypoint import KEYPOINT_COUNT, Keypoint, empty_keypoints
 
 class PoseEstimation(YOLOBase):
     KEYPOINT_NAMES = {
@@ -31,31 +32,76 @@ class PoseEstimation(YOLOBase):
         (Keypoint.RIGHT_KNEE.value, Keypoint.RIGHT_ANKLE.value, Keypoint.RIGHT_ANKLE.value): ("ankle", Direction.RIGHT),
     }
 
-    def __init__(self, model_path: str, verbose: bool = False):
-        super().__init__(model_path=model_path, verbose=verbose)
+    def __init__(self, model_path: str, verbose: bool = False, backend: str = None):
+        super().__init__(model_path=model_path, verbose=verbose, backend=backend)
         self.mediapipe = MediaPipe()
 
-    def pose_detector(self, frame, results_list, class_name, confidence, frame_number) -> Tuple[Any, List, Dict]:
-        if self.verbose:
-            logging.debug(f"Pose Estimation: {class_name} with confidence {confidence:.2f}")
+    def warmup(self, frame) -> Dict[str, float]:
+        """Run the pose model and the MediaPipe graph once on `frame`, return their timings in seconds."""
+        start = time.perf_counter()
+        self._infer(frame)
+        pose_time = time.perf_counter() - start
+        start = time.perf_counter()
+        self.mediapipe.get_keypoints(frame)
+        return {"pose_model": pose_time, "mediapipe": time.perf_counter() - start}
+
+    @staticmethod
+    def crop_roi(frame, roi: Optional[Tuple[int, int, int, int]]):
+        """Return the (x1, y1, x2, y2) region of the frame, or the whole frame when roi is None."""
+        if roi is None:
+            return frame
+        x1, y1, x2, y2 = roi
+        return np.ascontiguousarray(frame[y1:y2, x1:x2])
+
+    @staticmethod
+    def _roi_to_frame(keypoints: np.ndarray, roi: Tuple[int, int, int, int]) -> np.ndarray:
+        """Shift crop pixel coordinates back to the frame, keeping undetected (0, 0) points as is."""
+        x1, y1, _, _ = roi
+        detected = np.any(keypoints != 0, axis=-1, keepdims=True)
+        return np.where(detected, keypoints + np.array([x1, y1], dtype=keypoints.dtype), keypoints)
+
+    @staticmethod
+    def _roi_to_frame_normalized(mediapipe_kps: Dict, roi: Tuple[int, int, int, int], frame_shape) -> Dict:
+        """Map MediaPipe coordinates normalised to the crop into coordinates normalised to the frame."""
+        x1, y1, x2, y2 = roi
+        h, w = frame_shape[:2]
+        return {
+            idx: ((x * (x2 - x1) + x1) / w, (y * (y2 - y1) + y1) / h, z)
+            for idx, (x, y, z) in mediapipe_kps.items()
+        }
 
+    def compute_pose(self, frame, results_list, roi: Optional[Tuple[int, int, int, int]] = None) -> Tuple[List, np.ndarray]:
+        """Extract keypoint positions and joint angles for a frame, merging MediaPipe extremities.
+
+        This is the expensive part of the pose analysis; it only depends on the frame,
+        so callers can reuse its output for every detection of the same frame.
+        When `roi` is given, `results_list` was inferred on that crop of the frame:
+        MediaPipe runs on the same crop and every keypoint is mapped back to the frame.
+        Keypoints are returned as a (17, 3) float32 array of x, y, confidence.
+        """
         angles_list = []
-        keypoints_positions = {}
-        mediapipe_kps = self.mediapipe.get_keypoints(frame)
+        keypoints_array = empty_keypoints()
+        mediapipe_kps = self.mediapipe.get_keypoints(self.crop_roi(frame, roi))
+        if roi is not None and mediapipe_kps is not None:
+            mediapipe_kps = self._roi_to_frame_normalized(mediapipe_kps, roi, frame.shape)
 
         for results in results_list:
             if not hasattr(results, 'keypoints') or results.keypoints is None:
                 continue
 
             keypoints = results.keypoints.xy.cpu().numpy()
-            for kp in keypoints:
-                if kp.shape[0] < 17:
+            confidences = results.keypoints.conf.cpu().numpy() if results.keypoints.conf is not None else None
+            if roi is not None:
+                keypoints = self._roi_to_frame(keypoints, roi)
+            for person, kp in enumerate(keypoints):
+                if kp.shape[0] < KEYPOINT_COUNT:
                     continue
 
-                for idx, coord in enumerate(kp):
-                    keypoint_name = self.KEYPOINT_NAMES.get(idx, f"keypoint_{idx}")
-                    keypoints_positions[f"{keypoint_name}_x"] = float(coord[0])
-                    keypoints_positions[f"{keypoint_name}_y"] = float(coord[1])
+                keypoints_array[:, :2] = kp[:KEYPOINT_COUNT]
+                if confidences is not None:
+                    keypoints_array[:, 2] = confidences[person][:KEYPOINT_COUNT]
+                else:
+                    keypoints_array[:, 2] = np.any(kp[:KEYPOINT_COUNT] != 0, axis=1)
 
                 for (start, mid, end), (angle_type, direction) in self.ANGLE_DEFS.items():
                     if start >= len(kp) or mid >= len(kp) or end >= len(kp):
@@ -97,10 +143,20 @@ class PoseEstimation(YOLOBase):
                             "angle_name": (angle_type, direction)
                         })
 
+        return angles_list, keypoints_array
+
+    def pose_detector(self, frame, results_list, class_name, confidence, frame_number,
+                      pose: Optional[Tuple[List, np.ndarray]] = None) -> Tuple[Any, List, Dict]:
+        """Build the frame result for a detection; `pose` reuses a previous compute_pose output."""
+        if self.verbose:
+            logging.debug(f"Pose Estimation: {class_name} with confidence {confidence:.2f}")
+
+        angles_list, keypoints = pose if pose is not None else self.compute_pose(frame, results_list)
+
         result_frame = {
             "class_name": class_name,
             "frame_number": frame_number,
-            "keypoints_positions": keypoints_positions,
+            "keypoints": keypoints.copy(),
             "angles": self.convert_numpy_to_python(angles_list),
         }
 
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from config.db_models import FrameData
+from .export import BACKEND_ONNX_INT8, BACKEND_TORCH, BACKENDS, export_model
+from .phase_detection import DEFAULT_KEYPOINT_MODEL_PATH, FRAME_STORAGE_DISK, PhaseDetection
+from .pose_estimation import PoseEstimation
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv')
+DEFAULT_PHASE_MODEL_PATH = 'model/v1.1.3.pt'
+
+def angle_key(angle_type: str, direction) -> str:
+    return f"{angle_type}_{getattr(direction, 'name', direction)}".lower()
+
+ANGLE_KEYS = [angle_key(angle_type, direction) for angle_type, direction in PoseEstimation.ANGLE_DEFS.values()]
+
+def list_clips(folder: str) -> List[str]:
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(VIDEO_EXTENSIONS)
+    )
+
+def run_backend(backend: str, clip: str, model_path: str, keypoint_model_path: str) -> Dict:
+    """Analyse a clip with one backend and return its frames by number and the elapsed time."""
+    with tempfile.TemporaryDirectory() as save_dir:
+        detector = PhaseDetection(
+            model_path=model_path,
+            keypoint_model_path=keypoint_model_path,
+            save_dir=save_dir,
+            frame_storage=FRAME_STORAGE_DISK,
+            backend=backend,
+        )
+        start = time.perf_counter()
+        frames: List[FrameData] = detector.run(clip)
+        elapsed = time.perf_counter() - start
+    by_number = {}
+    for frame in frames:
+        by_number.setdefault(frame.frame_number, frame)
+    return {"frames": by_number, "seconds": elapsed}
+
+def compare_frames(reference: Dict[int, FrameData], candidate: Dict[int, FrameData]) -> Dict:
+    """Phase agreement and absolute angle differences on the frames analysed by both runs."""
+    common = sorted(set(reference) & set(candidate))
+    agreed = sum(reference[n].class_name == candidate[n].class_name for n in common)
+    angle_diffs = defaultdict(list)
+    for n in common:
+        ref_angles = {angle_key(*a.angle_name): a.angle for a in reference[n].angles}
+        cand_angles = {angle_key(*a.angle_name): a.angle for a in candidate[n].angles}
+        for key in ref_angles.keys() & cand_angles.keys():
+            angle_diffs[key].append(abs(ref_angles[key] - cand_angles[key]))
+    return {"frames": len(common), "agreed": agreed, "angle_diffs": angle_diffs}
+
+def build_report(baseline: str, candidate: str, clips: List[str], model_path: str, keypoint_model_path: str) -> Dict:
+    for backend in (baseline, candidate):
+        export_model(model_path, backend)
+        export_model(keypoint_model_path, backend)
+
+    total_frames = total_agreed = 0
+    baseline_seconds = candidate_seconds = 0.0
+    angle_diffs = defaultdict(list)
+    per_clip = []
+    for clip in clips:
+        logging.info(f"Comparing {baseline} and {candidate} on {clip}")
+        reference = run_backend(baseline, clip, model_path, keypoint_model_path)
+        quantized = run_backend(candidate, clip, model_path, keypoint_model_path)
+        comparison = compare_frames(reference["frames"], quantized["frames"])
+
+        total_frames += comparison["frames"]
+        total_agreed += comparison["agreed"]
+        baseline_seconds += reference["seconds"]
+        candidate_seconds += quantized["seconds"]
+        for key, diffs in comparison["angle_diffs"].items():
+            angle_diffs[key].extend(diffs)
+        per_clip.append({
+            "clip": os.path.basename(clip),
+            "frames": comparison["frames"],
+            "phase_agreement": comparison["agreed"] / comparison["frames"] if comparison["frames"] else None,
+            "speedup": reference["seconds"] / quantized["seconds"] if quantized["seconds"] else None,
+        })
+
+    return {
+        "baseline": baseline,
+        "candidate": candidate,
+        "clips": per_clip,
+        "frames": total_frames,
+        "phase_agreement": total_agreed / total_frames if total_frames else None,
+        "mean_angle_difference": {
+            key: float(np.mean(angle_diffs[key])) if angle_diffs[key] else None for key in ANGLE_KEYS
+        },
+        "baseline_seconds": baseline_seconds,
+        "candidate_seconds": candidate_seconds,
+        "speedup": baseline_seconds / candidate_seconds if candidate_seconds else None,
+    }
+
+def print_report(report: Dict):
+    print(f"{report['candidate']} vs {report['baseline']} on {len(report['clips'])} clips, {report['frames']} common frames")
+    for clip in report['clips']:
+        print(f"  {clip['clip']}: agreement={clip['phase_agreement']}, speedup={clip['speedup']}")
+    print(f"Phase agreement: {report['phase_agreement']}")
+    print("Mean angle difference (degrees):")
+    for key, value in report['mean_angle_difference'].items():
+        print(f"  {key}: {value}")
+    print(f"Latency: {report['baseline_seconds']:.2f}s -> {report['candidate_seconds']:.2f}s (speed-up x{report['speedup']})")
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Compare the float and quantised models on a folder of clips.')
+    parser.add_argument('clips', type=str, help='folder containing the video clips')
+    parser.add_argument('-m', '--model', type=str, default=DEFAULT_PHASE_MODEL_PATH, help='phase model weights')
+    parser.add_argument('-k', '--keypoint-model', type=str, default=DEFAULT_KEYPOINT_MODEL_PATH, help='pose model weights')
+    parser.add_argument('--baseline', type=str, default=BACKEND_TORCH, choices=BACKENDS, help='reference runtime')
+    parser.add_argument('-b', '--backend', type=str, default=BACKEND_ONNX_INT8, choices=BACKENDS, help='runtime to evaluate')
+    parser.add_argument('-o', '--output', type=str, default=None, help='write the report as JSON to this path')
+    args = parser.parse_args(argv)
+
+    clips = list_clips(args.clips)
+    if not clips:
+        parser.error(f"No video clips found in {args.clips}")
+
+    report = build_report(args.baseline, args.backend, clips, args.model, args.keypoint_model)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
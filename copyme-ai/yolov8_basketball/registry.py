@@ -0,0 +1,94 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Tuple
+import numpy as np
+from ultralytics import YOLO
+from .export import BACKEND_TORCH
+
+WARMUP_FRAME_SHAPE = (640, 640, 3)
+
+@dataclass
+class ModelEntry:
+    """A loaded model shared by every consumer of the same (path, device, backend)."""
+    model: YOLO
+    path: str
+    device: str
+    backend: str
+    # ultralytics predictors are not thread-safe, consumers serialise their calls on this lock
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    warmed: bool = False
+
+    def ensure_warm(self):
+        """Run one dummy forward pass the first time the model is used in this process."""
+        if self.warmed:
+            return
+        with self.lock:
+            if self.warmed:
+                return
+            self.model(np.zeros(WARMUP_FRAME_SHAPE, dtype=np.uint8), verbose=False)
+            self.warmed = True
+            logging.info(f"Warmed up {self.backend} model {self.path} on {self.device}")
+
+class ModelRegistry:
+    """
+    Process-wide cache of YOLO models keyed by (path, device, backend).
+
+    Models are loaded lazily on the first request and loaded once even when
+    several threads ask for the same key at the same time. Warm-up is deferred
+    to the first inference so that weights preloaded in the gunicorn master are
+    shared copy-on-write by the forked workers without running torch before the fork.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str, str], ModelEntry] = {}
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, device: str, backend: str = BACKEND_TORCH, verbose: bool = False) -> ModelEntry:
+        key = (path, device, backend)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # one lock per key so a slow load does not block the other models
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = ModelEntry(model=self._load(path, device, backend, verbose), path=path, device=device, backend=backend)
+                self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def _load(path: str, device: str, backend: str, verbose: bool) -> YOLO:
+        logging.info(f"Loading {backend} model from {path} on device {device}")
+        if backend == BACKEND_TORCH:
+            model = YOLO(path, verbose=verbose).to(device)
+            model.fuse()
+        else:
+            # exported models run on the CPU through their own runtime
+            model = YOLO(path, verbose=verbose)
+        return model
+
+    def loaded(self) -> Iterable[Tuple[str, str, str]]:
+        return list(self._entries.keys())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+registry = ModelRegistry()
+
+def preload_models(model_paths: Iterable[str], backend: str = None):
+    """Load models into the registry ahead of time, e.g. in the gunicorn master before the workers fork."""
+    import torch
+    from .yolobase import YOLOBase
+
+    if torch.cuda.is_available():
+        # a CUDA context does not survive fork, let each worker load its own models
+        logging.warning("CUDA is available, skipping model preloading before fork.")
+        return
+    for model_path in model_paths:
+        YOLOBase(model_path=model_path, backend=backend)
@@ -0,0 +1,36 @@
+from collections import deque
+from dataclasses import dataclass, field
+import itertools
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from filterpy.kalman import KalmanFilter
+import numpy as np
+from .tools.sampling import FrameSampler
+from .tools.streaming import StreamingUpload
+
+HISTORY_SIZE = 5
+
+@dataclass
+class DetectionSession:
+    """
+    Mutable state of a single PhaseDetection run.
+
+    The models held by PhaseDetection are shared and stateless, everything that
+    changes while a video is analysed lives here, so concurrent runs on the same
+    PhaseDetection instance do not see each other's frames.
+    """
+    input: str
+    sampler: FrameSampler
+    kalman_filter: KalmanFilter
+    # set when the input is still being uploaded, decoding then follows the growing file
+    upload: Optional[StreamingUpload] = None
+    history: Deque[int] = field(default_factory=lambda: deque(maxlen=HISTORY_SIZE))
+    frame_count: int = 0
+    frames_total: int = 0
+    all_frames: List[Dict] = field(default_factory=list)
+    best_frames: List[Dict] = field(default_factory=list)
+    frame_heaps: Dict[str, List] = field(default_factory=dict)
+    frame_sequence: Iterator[int] = field(default_factory=itertools.count)
+    pose_cache: Dict[int, Tuple[List, np.ndarray]] = field(default_factory=dict)
+    pose_inference_count: int = 0
+    sampling_stats: Dict[str, int] = field(default_factory=dict)
+    last_frame_hash: Optional[str] = None
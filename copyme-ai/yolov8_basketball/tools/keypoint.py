@@ -1,4 +1,6 @@
 from enum import Enum
+from typing import Dict
+import numpy as np
 
 class Keypoint(Enum):
     NOSE = 0
@@ -22,3 +24,60 @@ class Keypoint(Enum):
     RIGHT_INDEX = 21
     LEFT_FOOT_INDEX = 31
     RIGHT_FOOT_INDEX = 32
+
+# Compact keypoints: a (17, 3) float32 array of x, y, confidence in COCO order,
+# stored in MongoDB as its raw little-endian bytes (204 bytes per frame) instead
+# of a dict of 34 string keys.
+KEYPOINT_COUNT = 17
+KEYPOINT_ORDER = [keypoint.name.lower() for keypoint in Keypoint if keypoint.value < KEYPOINT_COUNT]
+KEYPOINT_DTYPE = np.dtype('<f4')
+KEYPOINT_SHAPE = (KEYPOINT_COUNT, 3)
+
+def empty_keypoints() -> np.ndarray:
+    return np.zeros(KEYPOINT_SHAPE, dtype=KEYPOINT_DTYPE)
+
+def as_keypoint_array(keypoints) -> np.ndarray:
+    """(17, 2) or (17, 3) array-like to a (17, 3) float32 array; missing confidences are 1 for detected points."""
+    points = np.asarray(keypoints, dtype=KEYPOINT_DTYPE)
+    if points.shape == KEYPOINT_SHAPE:
+        return points
+    if points.ndim != 2 or points.shape[1] < 2:
+        raise ValueError(f"Expected keypoints of shape (17, 2) or (17, 3), got {points.shape}")
+    array = empty_keypoints()
+    count = min(len(points), KEYPOINT_COUNT)
+    array[:count, :2] = points[:count, :2]
+    array[:count, 2] = np.any(points[:count, :2] != 0, axis=1)
+    return array
+
+def keypoints_from_dict(positions: Dict[str, float]) -> np.ndarray:
+    """Legacy {'nose_x': .., 'nose_y': ..} dict to the compact array."""
+    array = empty_keypoints()
+    for index, name in enumerate(KEYPOINT_ORDER):
+        array[index, 0] = positions.get(f"{name}_x", 0.0)
+        array[index, 1] = positions.get(f"{name}_y", 0.0)
+    # the dict format has no confidence, points that were detected count as certain
+    array[:, 2] = np.any(array[:, :2] != 0, axis=1)
+    return array
+
+def keypoints_to_dict(keypoints: np.ndarray) -> Dict[str, float]:
+    """Compact array to the legacy dict format, still used by the HTTP responses."""
+    positions = {}
+    for name, (x, y) in zip(KEYPOINT_ORDER, keypoints[:, :2].tolist()):
+        positions[f"{name}_x"] = x
+        positions[f"{name}_y"] = y
+    return positions
+
+def pack_keypoints(keypoints: np.ndarray) -> bytes:
+    return np.ascontiguousarray(keypoints, dtype=KEYPOINT_DTYPE).tobytes()
+
+def unpack_keypoints(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=KEYPOINT_DTYPE).reshape(KEYPOINT_SHAPE)
+
+def frame_keypoints(frame: Dict) -> np.ndarray:
+    """(17, 3) keypoints of a stored frame, from the packed `keypoints` field or the legacy dict."""
+    keypoints = frame.get('keypoints')
+    if isinstance(keypoints, (bytes, bytearray)):
+        return unpack_keypoints(bytes(keypoints))
+    if keypoints is not None:
+        return as_keypoint_array(keypoints)
+    return keypoints_from_dict(frame.get('keypoints_positions') or {})
@@ -5,12 +5,12 @@ class Preprocessor:
     def __init__(self, target_person_ratio=(0.4, 0.6)):
         self.min_ratio, self.max_ratio = target_person_ratio
 
-    def process_frame(self, frame, bbox, margin_ratio=0.3):
-        h, w, _ = frame.shape
-        x1, y1, x2, y2 = bbox
+    @staticmethod
+    def expand_bbox(frame_shape, bbox, margin_ratio=0.3):
+        h, w = frame_shape[:2]
+        x1, y1, x2, y2 = (int(v) for v in bbox)
         person_height = y2 - y1
         person_width = x2 - x1
-        aspect_ratio = w / h
 
         margin_h = int(person_height * margin_ratio)
         margin_w = int(person_width * margin_ratio)
@@ -23,10 +23,17 @@ class Preprocessor:
         margin_w = min(margin_w, max_margin_left, max_margin_right)
         margin_h = min(margin_h, max_margin_top, max_margin_bottom)
 
-        new_x1 = x1 - margin_w
-        new_y1 = y1 - margin_h
-        new_x2 = x2 + margin_w
-        new_y2 = y2 + margin_h
+        new_x1 = max(0, x1 - margin_w)
+        new_y1 = max(0, y1 - margin_h)
+        new_x2 = min(w, x2 + margin_w)
+        new_y2 = min(h, y2 + margin_h)
+        return new_x1, new_y1, new_x2, new_y2
+
+    def process_frame(self, frame, bbox, margin_ratio=0.3):
+        h, w, _ = frame.shape
+        aspect_ratio = w / h
+
+        new_x1, new_y1, new_x2, new_y2 = self.expand_bbox(frame.shape, bbox, margin_ratio)
 
         crop_cx = (new_x1 + new_x2) // 2
         crop_cy = (new_y1 + new_y2) // 2
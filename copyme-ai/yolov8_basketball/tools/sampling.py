@@ -0,0 +1,62 @@
+from typing import Dict, Optional
+import cv2
+import numpy as np
+
+MOTION_FRAME_SIZE = (64, 36)
+# phase of a frame without a confident detection, never a transition
+UNKNOWN_PHASE = "unknown"
+
+class FrameSampler:
+    """
+    Decide which decoded frames get the pose analysis, the phase detector runs on every frame.
+
+    Every `stride`-th frame is analysed. Sampling switches to every frame for
+    `dense_window` frames from the one where the phase detector reports a phase transition,
+    and any frame whose motion score (mean absolute difference with the previous
+    frame, downscaled to grayscale, in [0, 1]) exceeds `motion_threshold` is analysed too.
+    """
+
+    def __init__(self, stride: int = 1, motion_threshold: Optional[float] = None, dense_window: Optional[int] = None):
+        self.stride = max(1, int(stride))
+        self.motion_threshold = motion_threshold
+        self.dense_window = dense_window if dense_window is not None else 2 * self.stride
+        self.previous_frame = None
+        self.last_phase = None
+        self.dense_remaining = 0
+        self.analysed = 0
+        self.skipped = 0
+
+    def motion_score(self, frame) -> float:
+        """Return how much the frame changed since the previous call (0 when motion gating is off)."""
+        if self.motion_threshold is None:
+            return 0.0
+        small = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), MOTION_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+        score = 0.0 if self.previous_frame is None else float(np.mean(cv2.absdiff(small, self.previous_frame))) / 255.0
+        self.previous_frame = small
+        return score
+
+    def should_analyse(self, frame_index: int, motion: float = 0.0) -> bool:
+        analyse = (
+            frame_index % self.stride == 0
+            or self.dense_remaining > 0
+            or (self.motion_threshold is not None and motion > self.motion_threshold)
+        )
+        if self.dense_remaining > 0:
+            self.dense_remaining -= 1
+        if analyse:
+            self.analysed += 1
+        else:
+            self.skipped += 1
+        return analyse
+
+    def observe_phase(self, phase: str):
+        """Switch to dense sampling when the detected phase changes, frames without a confident phase are ignored."""
+        if phase == UNKNOWN_PHASE:
+            return
+        if self.last_phase is not None and phase != self.last_phase:
+            # at least the frame of the transition itself
+            self.dense_remaining = max(1, self.dense_window)
+        self.last_phase = phase
+
+    def stats(self) -> Dict[str, int]:
+        return {"analysed": self.analysed, "skipped": self.skipped}
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import AsyncIterator, Optional, Tuple
+import cv2
+
+CHUNK_SIZE = 1024 * 1024
+MIN_OPEN_BYTES = 256 * 1024
+POLL_INTERVAL = 0.2
+
+class UploadTooLargeError(Exception):
+    '''
+        thrown when an upload goes over the size limit
+    '''
+
+class UploadAbortedError(Exception):
+    '''
+        thrown to the decoder when the upload it reads from failed
+    '''
+
+class StreamingUpload:
+    """
+    A file written chunk by chunk from an upload stream, readable while it grows.
+
+    Chunks are written from a thread so the event loop is never blocked on disk,
+    and the upload is aborted as soon as it exceeds `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+        self.complete = threading.Event()
+        self.failed = False
+        # the file exists from the start so the decoder can poll it
+        open(self.path, 'wb').close()
+
+    @staticmethod
+    def _write(f, chunk: bytes):
+        f.write(chunk)
+        f.flush()
+
+    async def write_from(self, chunks: AsyncIterator[bytes]):
+        try:
+            with open(self.path, 'ab') as f:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    self.bytes_written += len(chunk)
+                    if self.max_bytes is not None and self.bytes_written > self.max_bytes:
+                        raise UploadTooLargeError(f"Upload exceeds {self.max_bytes} bytes")
+                    await asyncio.to_thread(self._write, f, chunk)
+        except BaseException:
+            self.failed = True
+            raise
+        finally:
+            self.complete.set()
+        logging.info(f"Upload of {self.path} complete: {self.bytes_written} bytes")
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def wait_for_growth(self, size: int):
+        """Block until the file is bigger than `size` or the upload ended."""
+        while not self.complete.is_set() and self.size() <= size:
+            time.sleep(POLL_INTERVAL)
+
+class GrowingFileCapture:
+    """
+    cv2.VideoCapture over a StreamingUpload.
+
+    Decoding starts as soon as OpenCV can open the partial file. When the reader
+    catches up with the writer, it waits for more data then reopens the file and
+    seeks back to the next frame. Containers whose index is written at the end
+    (non fast-start MP4) can only be opened once the upload is complete.
+    """
+
+    def __init__(self, upload: StreamingUpload):
+        self.upload = upload
+        self.cap = None
+        self.frames_read = 0
+        self.opened_size = 0
+        self.frame_count = 0
+        self._open()
+
+    def _check_upload(self):
+        if self.upload.failed:
+            raise UploadAbortedError(f"Upload of {self.upload.path} failed")
+
+    def _open(self) -> bool:
+        while True:
+            self._check_upload()
+            complete = self.upload.complete.is_set()
+            size = self.upload.size()
+            if size >= MIN_OPEN_BYTES or complete:
+                cap = cv2.VideoCapture(self.upload.path)
+                if cap.isOpened():
+                    if self.frames_read:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, self.frames_read)
+                    self.cap = cap
+                    self.opened_size = size
+                    return True
+                cap.release()
+                if complete:
+                    return False
+            self.upload.wait_for_growth(size)
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self) -> Tuple[bool, Optional[object]]:
+        while self.cap is not None:
+            self._check_upload()
+            success, frame = self.cap.read()
+            if success:
+                self.frames_read += 1
+                return success, frame
+            if self.upload.complete.is_set() and self.opened_size == self.upload.size():
+                return False, None
+            # end of the data written so far: wait for more and reopen at the current frame
+            self.upload.wait_for_growth(self.opened_size)
+            self.cap.release()
+            self.cap = None
+            self._open()
+        return False, None
+
+    def _total_frames(self) -> int:
+        """Frame count of the complete upload, 0 while it is still being written (the partial file's count is wrong)."""
+        if not self.frame_count and self.upload.complete.is_set() and not self.upload.failed:
+            cap = cv2.VideoCapture(self.upload.path)
+            self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+            cap.release()
+        return self.frame_count
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self._total_frames())
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
@@ -6,13 +6,16 @@ from enum import Enum
 from fastapi import UploadFile, Request
 from config.db_models import DatabaseManager
 from pathlib import Path
-import shutil
 import uuid
+from .streaming import CHUNK_SIZE, UploadTooLargeError
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from..phase_detection import PhaseDetection
+    from ..inference_pool import InferencePool
+    from ..jobs import JobRunner
+    from ..comparaison import BasketballAPIAnalyzer
 #----------------------------------------------------------
 
 def calculate_angle(a, b, c):
@@ -65,20 +68,40 @@ def get_database(request: Request) -> DatabaseManager:
 def get_yolomodel(request: Request) -> PhaseDetection:
     return request.app.yolo
 
-def save_uploaded_file(upload_file: UploadFile, destination: str, add_uuid: bool = False) -> Path:
+def get_inference_pool(request: Request) -> InferencePool:
+    return request.app.inference_pool
+
+def get_job_runner(request: Request) -> JobRunner:
+    return request.app.job_runner
+
+def get_analyzer(request: Request) -> BasketballAPIAnalyzer:
+    return request.app.analyzer
+
+def upload_destination(filename: str, destination: str, add_uuid: bool = False) -> Path:
     destination_folder_path = Path(destination)
     destination_folder_path.mkdir(parents=True, exist_ok=True)
 
-    filename = upload_file.filename
+    # only keep the file name, never a client supplied directory
+    filename = Path(filename).name
     if add_uuid:
         file_stem = Path(filename).stem
         file_ext = Path(filename).suffix
         filename = f"{file_stem}_{uuid.uuid4().hex}{file_ext}"
 
-    destination_path = destination_folder_path / filename
+    return destination_folder_path / filename
+
+def save_uploaded_file(upload_file: UploadFile, destination: str, add_uuid: bool = False, max_bytes: Optional[int] = None) -> Path:
+    destination_path = upload_destination(upload_file.filename, destination, add_uuid)
 
+    written = 0
     with destination_path.open("wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
+        while chunk := upload_file.file.read(CHUNK_SIZE):
+            written += len(chunk)
+            if max_bytes is not None and written > max_bytes:
+                buffer.close()
+                destination_path.unlink(missing_ok=True)
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+            buffer.write(chunk)
 
     return destination_path
 
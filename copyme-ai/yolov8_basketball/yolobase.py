@@ -1,19 +1,27 @@
 import json
+import os
 import cv2
 import numpy as np
 from enum import Enum
+from typing import Any, List
 import torch
 from ultralytics import YOLO
 from sys import platform
 from .tools.utils import calculate_angle
+from .export import BACKEND_TORCH, BACKENDS, DEFAULT_BACKEND, exported_path
+from .registry import registry
 import logging
 
 class YOLOBase:
-    def __init__(self, model_path: str, verbose: bool = False):
+    def __init__(self, model_path: str, verbose: bool = False, backend: str = None):
         self.model_path = model_path
         self.verbose = verbose
+        self.backend = backend or os.getenv("MODEL_BACKEND", DEFAULT_BACKEND)
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown model backend '{self.backend}', expected one of {BACKENDS}")
         self.device = self.__device()
         self.model = None
+        self.model_entry = None
         self.is_model_loaded = False
         self.version = 1
         self._load_model()
@@ -30,26 +38,47 @@ class YOLOBase:
             "device": self.device,
             "verbose": self.verbose,
             "model_path": self.model_path,
+            "backend": self.backend,
             "version": self.version,
         }
         return json.dumps(data, indent=4)
 
     # -------------------- Model Loading --------------------
+    def _resolve_backend(self) -> str:
+        """Return the backend to load, falling back to PyTorch when no exported artifact exists."""
+        if self.backend != BACKEND_TORCH and not os.path.exists(exported_path(self.model_path, self.backend)):
+            logging.warning(f"No {self.backend} export found for {self.model_path}, "
+                            f"run `python -m yolov8_basketball.export -b {self.backend}`. Falling back to PyTorch.")
+            return BACKEND_TORCH
+        return self.backend
+
     def _load_model(self):
-        """Load the YOLO model."""
+        """Get the YOLO model for the configured runtime (PyTorch, ONNX Runtime or OpenVINO) from the shared registry."""
+        self.backend = self._resolve_backend()
+        path = exported_path(self.model_path, self.backend)
         if self.verbose:
-          logging.debug(f"Loading model from {self.model_path} on device {self.device}")
-        self.model = YOLO(self.model_path, verbose=self.verbose).to(self.device)
-        self.model.fuse()
+          logging.debug(f"Loading {self.backend} model from {path} on device {self.device}")
+        self.model_entry = registry.get(path, self.device, self.backend, verbose=self.verbose)
+        self.model = self.model_entry.model
         self.is_model_loaded = self.model is not None
-        self.CLASS_NAMES_DICT = self.model.model.names
+        self.CLASS_NAMES_DICT = self.model.names
 
     # -------------------- Inference --------------------
     def _infer(self, frame) -> YOLO:
         """Run inference on the given frame."""
         if not self.is_model_loaded:
             raise RuntimeError("Model not loaded. Please load the model before inference.")
-        return self.model(frame)
+        self.model_entry.ensure_warm()
+        with self.model_entry.lock:
+            return self.model(frame)
+
+    def _infer_batch(self, frames: List[Any]) -> List[Any]:
+        """Run a single forward pass on several frames, one result per frame."""
+        if not self.is_model_loaded:
+            raise RuntimeError("Model not loaded. Please load the model before inference.")
+        self.model_entry.ensure_warm()
+        with self.model_entry.lock:
+            return self.model(list(frames))
 
     # -------------------- Data Conversion --------------------
     def convert_numpy_to_python(self, data):